@@ -1,5 +1,6 @@
 # debug_urls.py
 # Script pour diagnostiquer les problèmes d'URLs Django
+# Bilan complet (URLs, requêtes, index, configuration) : python manage.py perfcheck
 
 import os
 import sys
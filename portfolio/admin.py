@@ -1,18 +1,90 @@
 # portfolio/admin.py
 # Configuration de l'interface d'administration Django
 
-from django.contrib import admin
-from django.utils.html import format_html
-from django.urls import reverse
+from django.contrib import admin, messages
+from django.utils.html import format_html, escape
+from django.urls import path, reverse
 from django.utils.safestring import mark_safe
-from .models import Profile, Competence, Projet, Experience, Contact
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from .models import (Profile, Competence, Projet, Experience, Contact, ContactArchive,
+                     ContactHistorique, StatistiqueVues, CompteurPortfolio, Modification, ProfilRequete, Tache)
+from .pagination import EstimatedCountPaginator, KeysetChangeList
+from .bulk import chunked_update
+from .cache import bump_content_version
+from .archive import archive_contacts, restore_contacts, iter_jsonl
+from .counters import reconcile_counters
+from .events import record_changes
+from .profiling import summarize
+from .querybudget import query_budget
+
+class QueryBudgetAdminMixin:
+    """Budget de requêtes SQL de la page de liste (vérifié par QueryBudgetMiddleware)
+
+    Affichage seulement : les actions groupées (POST) traitent leurs sélections par lots.
+    """
+    
+    # Nombre maximal de requêtes par page de liste, quel que soit le volume
+    changelist_query_budget = 12
+    
+    def get_urls(self):
+        urls = super().get_urls()
+        changelist = '%s_%s_changelist' % (self.opts.app_label, self.opts.model_name)
+        for pattern in urls:
+            if pattern.name == changelist:
+                query_budget(self.changelist_query_budget, methods=('GET', 'HEAD'))(pattern.callback)
+        return urls
+
+class BulkActionAdminMixin:
+    """Actions groupées par lots (voir bulk.chunked_update), avancement affiché dans l'administration"""
+    
+    def chunked_update(self, request, queryset, **values):
+        """Applique `values` à la sélection par lots ; un message par lot si la sélection en compte plusieurs"""
+        lots = []
+        count = chunked_update(queryset, progress=lambda updated, chunks: lots.append(updated), **values)
+        if len(lots) > 1:
+            for numero, updated in enumerate(lots, 1):
+                self.message_user(request, f"Lot {numero}/{len(lots)} : {updated} ligne(s) mise(s) à jour.",
+                                  messages.INFO)
+        return count
+
+class PerformanceAdminMixin:
+    """Mode performance des listes d'administration (settings.ADMIN_PERFORMANCE_MODE)
+
+    - nombre de lignes estimé au lieu du COUNT(*) complet
+    - pas de second COUNT(*) pour le total non filtré
+    - pas de navigation par date (requête DISTINCT sur toute la table)
+    - pagination par curseur si `keyset_field` est défini
+    """
+    
+    # Champ de tri utilisé pour la pagination par curseur (ex: '-envoye_le')
+    keyset_field = None
+    
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        if settings.ADMIN_PERFORMANCE_MODE:
+            return EstimatedCountPaginator(queryset, per_page, orphans, allow_empty_first_page)
+        return super().get_paginator(request, queryset, per_page, orphans, allow_empty_first_page)
+    
+    def get_changelist(self, request, **kwargs):
+        if settings.ADMIN_PERFORMANCE_MODE and self.keyset_field:
+            return KeysetChangeList
+        return super().get_changelist(request, **kwargs)
+    
+    def get_changelist_instance(self, request):
+        changelist = super().get_changelist_instance(request)
+        if settings.ADMIN_PERFORMANCE_MODE:
+            changelist.show_full_result_count = False
+            changelist.date_hierarchy = None
+        return changelist
 
 @admin.register(Profile)
-class ProfileAdmin(admin.ModelAdmin):
+class ProfileAdmin(QueryBudgetAdminMixin, admin.ModelAdmin):
     """Configuration admin pour le modèle Profile"""
     
     # Champs affichés dans la liste
-    list_display = ['nom', 'titre', 'email', 'ville', 'actif', 'modifie_le']
+    list_display = ['nom', 'titre', 'slug', 'domaine', 'email', 'actif', 'modifie_le']
     
     # Champs modifiables directement dans la liste
     list_editable = ['actif']
@@ -21,13 +93,18 @@ class ProfileAdmin(admin.ModelAdmin):
     list_filter = ['actif', 'ville', 'pays', 'cree_le']
     
     # Champ de recherche
-    search_fields = ['nom', 'email', 'titre', 'bio']
+    search_fields = ['nom', 'email', 'titre', 'slug', 'domaine']
+    
+    prepopulated_fields = {'slug': ('nom',)}
     
     # Organisation des champs dans le formulaire
     fieldsets = (
         ('Informations personnelles', {
             'fields': ('nom', 'titre', 'email', 'telephone')
         }),
+        ('Adresse du portfolio', {
+            'fields': ('slug', 'domaine')
+        }),
         ('Localisation', {
             'fields': ('ville', 'pays')
         }),
@@ -35,7 +112,7 @@ class ProfileAdmin(admin.ModelAdmin):
             'fields': ('bio', 'description_longue')
         }),
         ('Fichiers', {
-            'fields': ('photo', 'cv')
+            'fields': ('photo', 'cv', 'telechargements_cv')
         }),
         ('Réseaux sociaux', {
             'fields': ('linkedin', 'github', 'twitter', 'website'),
@@ -48,28 +125,22 @@ class ProfileAdmin(admin.ModelAdmin):
     )
     
     # Champs en lecture seule
-    readonly_fields = ['cree_le', 'modifie_le']
-    
-    def has_add_permission(self, request):
-        """Limite à un seul profil"""
-        if Profile.objects.exists():
-            return False
-        return super().has_add_permission(request)
+    readonly_fields = ['cree_le', 'modifie_le', 'telechargements_cv']
 
 @admin.register(Competence)
-class CompetenceAdmin(admin.ModelAdmin):
+class CompetenceAdmin(QueryBudgetAdminMixin, admin.ModelAdmin):
     """Configuration admin pour le modèle Competence"""
     
-    list_display = ['nom', 'categorie', 'niveau', 'colored_bar', 'ordre', 'actif']
+    list_display = ['nom', 'categorie', 'niveau', 'colored_bar', 'mois_experience', 'ordre', 'actif']
     list_editable = ['niveau', 'ordre', 'actif']
-    list_filter = ['categorie', 'actif']
+    list_filter = ['profile', 'categorie', 'actif']
     search_fields = ['nom']
     ordering = ['ordre', 'nom']
     
     # Organisation par onglets
     fieldsets = (
         ('Informations de base', {
-            'fields': ('nom', 'categorie', 'niveau')
+            'fields': ('profile', 'nom', 'categorie', 'niveau')
         }),
         ('Apparence', {
             'fields': ('icone', 'couleur', 'ordre')
@@ -79,24 +150,26 @@ class CompetenceAdmin(admin.ModelAdmin):
         })
     )
     
+    # Gabarit de la barre de niveau (formaté directement, sans format_html)
+    COLORED_BAR_HTML = (
+        '<div style="width: 100px; background-color: #f0f0f0; border-radius: 3px;">'
+        '<div style="width: %d%%; height: 20px; background-color: %s; border-radius: 3px; text-align: center; color: white; font-size: 12px; line-height: 20px;">'
+        '%d%%</div></div>'
+    )
+    
     def colored_bar(self, obj):
         """Affiche une barre de progression colorée pour le niveau"""
-        return format_html(
-            '<div style="width: 100px; background-color: #f0f0f0; border-radius: 3px;">'
-            '<div style="width: {}%; height: 20px; background-color: {}; border-radius: 3px; text-align: center; color: white; font-size: 12px; line-height: 20px;">'
-            '{}%</div></div>',
-            obj.niveau, obj.couleur, obj.niveau
-        )
+        return mark_safe(self.COLORED_BAR_HTML % (obj.niveau, escape(obj.couleur), obj.niveau))
     colored_bar.short_description = 'Niveau'
     colored_bar.admin_order_field = 'niveau'
 
 @admin.register(Projet)
-class ProjetAdmin(admin.ModelAdmin):
+class ProjetAdmin(QueryBudgetAdminMixin, BulkActionAdminMixin, PerformanceAdminMixin, admin.ModelAdmin):
     """Configuration admin pour le modèle Projet"""
     
-    list_display = ['titre', 'statut', 'featured', 'date_debut', 'vues', 'actif']
+    list_display = ['titre', 'statut', 'featured', 'date_debut', 'duree_mois', 'vues', 'actif']
     list_editable = ['statut', 'featured', 'actif']
-    list_filter = ['statut', 'featured', 'actif', 'date_debut', 'technologies']
+    list_filter = ['profile', 'statut', 'featured', 'actif', 'date_debut', 'technologies']
     search_fields = ['titre', 'description_courte', 'description_longue']
     date_hierarchy = 'date_debut'  # Navigation par date
     ordering = ['-featured', 'ordre', '-date_debut']
@@ -106,7 +179,7 @@ class ProjetAdmin(admin.ModelAdmin):
     
     fieldsets = (
         ('Informations principales', {
-            'fields': ('titre', 'description_courte', 'description_longue')
+            'fields': ('profile', 'titre', 'description_courte', 'description_longue')
         }),
         ('Images', {
             'fields': ('image_principale', 'image_2', 'image_3')
@@ -136,29 +209,44 @@ class ProjetAdmin(admin.ModelAdmin):
     # Actions personnalisées
     actions = ['mark_as_featured', 'mark_as_not_featured', 'mark_as_finished']
     
+    def update_projets(self, request, queryset, **values):
+        """Mise à jour par lots puis invalidation des caches du contenu public"""
+        # Sélection relevée avant la mise à jour, qui peut la modifier (filtres)
+        by_tenant = {}
+        for pk, tenant_id in queryset.values_list('pk', 'profile_id'):
+            by_tenant.setdefault(tenant_id, []).append(pk)
+        count = self.chunked_update(request, queryset, **values)
+        if count:
+            # update() n'émet pas de signal : caches, journal et compteurs mis à jour ici
+            for tenant_id, pks in by_tenant.items():
+                bump_content_version(tenant_id)
+                record_changes(tenant_id, Modification.PROJET, pks)
+            reconcile_counters(['total_projets', 'projets_featured', 'total_vues_projets'], by_tenant)
+        return count
+    
     def mark_as_featured(self, request, queryset):
         """Action pour marquer comme featured"""
-        queryset.update(featured=True)
-        self.message_user(request, f"{queryset.count()} projet(s) marqué(s) comme mis en avant.")
+        count = self.update_projets(request, queryset, featured=True)
+        self.message_user(request, f"{count} projet(s) marqué(s) comme mis en avant.")
     mark_as_featured.short_description = "Marquer comme mis en avant"
     
     def mark_as_not_featured(self, request, queryset):
-        queryset.update(featured=False)
-        self.message_user(request, f"{queryset.count()} projet(s) retiré(s) de la mise en avant.")
+        count = self.update_projets(request, queryset, featured=False)
+        self.message_user(request, f"{count} projet(s) retiré(s) de la mise en avant.")
     mark_as_not_featured.short_description = "Retirer de la mise en avant"
     
     def mark_as_finished(self, request, queryset):
-        queryset.update(statut='termine')
-        self.message_user(request, f"{queryset.count()} projet(s) marqué(s) comme terminé(s).")
+        count = self.update_projets(request, queryset, statut='termine')
+        self.message_user(request, f"{count} projet(s) marqué(s) comme terminé(s).")
     mark_as_finished.short_description = "Marquer comme terminé"
 
 @admin.register(Experience)
-class ExperienceAdmin(admin.ModelAdmin):
+class ExperienceAdmin(QueryBudgetAdminMixin, PerformanceAdminMixin, admin.ModelAdmin):
     """Configuration admin pour le modèle Experience"""
     
-    list_display = ['titre', 'entreprise', 'type_experience', 'date_debut', 'est_en_cours_display', 'actif']
+    list_display = ['titre', 'entreprise', 'type_experience', 'date_debut', 'duree_mois', 'est_en_cours_display', 'actif']
     list_editable = ['actif']
-    list_filter = ['type_experience', 'actif', 'date_debut']
+    list_filter = ['profile', 'type_experience', 'actif', 'date_debut']
     search_fields = ['titre', 'entreprise', 'description']
     date_hierarchy = 'date_debut'
     ordering = ['-date_debut']
@@ -167,7 +255,7 @@ class ExperienceAdmin(admin.ModelAdmin):
     
     fieldsets = (
         ('Informations principales', {
-            'fields': ('type_experience', 'titre', 'entreprise', 'lieu')
+            'fields': ('profile', 'type_experience', 'titre', 'entreprise', 'lieu')
         }),
         ('Période', {
             'fields': ('date_debut', 'date_fin')
@@ -191,24 +279,31 @@ class ExperienceAdmin(admin.ModelAdmin):
         return format_html('<span style="color: red;">✗ Terminée</span>')
     est_en_cours_display.short_description = 'Statut'
     est_en_cours_display.admin_order_field = 'date_fin'
+    
+    def get_queryset(self, request):
+        """Optimise les requêtes avec prefetch_related"""
+        return super().get_queryset(request).prefetch_related('competences_acquises')
 
 @admin.register(Contact)
-class ContactAdmin(admin.ModelAdmin):
+class ContactAdmin(QueryBudgetAdminMixin, BulkActionAdminMixin, PerformanceAdminMixin, admin.ModelAdmin):
     """Configuration admin pour le modèle Contact"""
     
     list_display = ['nom', 'email', 'sujet', 'envoye_le', 'lu', 'repondu']
     list_editable = ['lu', 'repondu']
-    list_filter = ['lu', 'repondu', 'envoye_le']
+    list_filter = ['profile', 'lu', 'repondu', 'envoye_le']
     search_fields = ['nom', 'email', 'sujet', 'message']
     date_hierarchy = 'envoye_le'
     ordering = ['-envoye_le']
     
+    # Pagination par curseur en mode performance (table en croissance continue)
+    keyset_field = '-envoye_le'
+    
     # Champs en lecture seule (ne pas modifier les messages reçus)
-    readonly_fields = ['nom', 'email', 'sujet', 'message', 'envoye_le']
+    readonly_fields = ['profile', 'nom', 'email', 'sujet', 'message', 'envoye_le']
     
     fieldsets = (
         ('Informations du contact', {
-            'fields': ('nom', 'email', 'envoye_le')
+            'fields': ('profile', 'nom', 'email', 'envoye_le')
         }),
         ('Message', {
             'fields': ('sujet', 'message')
@@ -219,23 +314,37 @@ class ContactAdmin(admin.ModelAdmin):
     )
     
     # Actions personnalisées
-    actions = ['mark_as_read', 'mark_as_unread', 'mark_as_replied']
+    actions = ['mark_as_read', 'mark_as_unread', 'mark_as_replied', 'archive_selected']
+    
+    def update_messages(self, request, queryset, **values):
+        """Mise à jour par lots puis recalcul du compteur de messages non lus"""
+        tenant_ids = set(queryset.values_list('profile_id', flat=True).order_by().distinct())
+        count = self.chunked_update(request, queryset, **values)
+        if count:
+            reconcile_counters(['messages_non_lus'], tenant_ids)
+        return count
     
     def mark_as_read(self, request, queryset):
-        queryset.update(lu=True)
-        self.message_user(request, f"{queryset.count()} message(s) marqué(s) comme lu(s).")
+        count = self.update_messages(request, queryset, lu=True)
+        self.message_user(request, f"{count} message(s) marqué(s) comme lu(s).")
     mark_as_read.short_description = "Marquer comme lu"
     
     def mark_as_unread(self, request, queryset):
-        queryset.update(lu=False)
-        self.message_user(request, f"{queryset.count()} message(s) marqué(s) comme non lu(s).")
+        count = self.update_messages(request, queryset, lu=False)
+        self.message_user(request, f"{count} message(s) marqué(s) comme non lu(s).")
     mark_as_unread.short_description = "Marquer comme non lu"
     
     def mark_as_replied(self, request, queryset):
-        queryset.update(repondu=True, lu=True)
-        self.message_user(request, f"{queryset.count()} message(s) marqué(s) comme répondu(s).")
+        count = self.update_messages(request, queryset, repondu=True, lu=True)
+        self.message_user(request, f"{count} message(s) marqué(s) comme répondu(s).")
     mark_as_replied.short_description = "Marquer comme répondu"
     
+    def archive_selected(self, request, queryset):
+        """Archive immédiatement les messages sélectionnés déjà lus et répondus"""
+        count = archive_contacts(days=0, queryset=queryset)
+        self.message_user(request, f"{count} message(s) archivé(s).")
+    archive_selected.short_description = "Archiver (messages lus et répondus)"
+    
     def has_add_permission(self, request):
         """Empêche l'ajout manuel de messages de contact"""
         return False
@@ -244,6 +353,162 @@ class ContactAdmin(admin.ModelAdmin):
         """Empêche la suppression des messages (pour archivage)"""
         return False
 
+def export_jsonl(modeladmin, request, queryset):
+    """Exporte les messages sélectionnés en JSON Lines compressé (flux)"""
+    filename = f"{queryset.model._meta.model_name}-{timezone.now():%Y%m%d-%H%M%S}.jsonl.gz"
+    response = StreamingHttpResponse(iter_jsonl(queryset, compress=True),
+                                     content_type='application/gzip')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+export_jsonl.short_description = "Exporter en JSONL compressé"
+
+class ReadOnlyContactAdminMixin:
+    """Consultation seule des messages archivés ou de l'historique"""
+    
+    list_display = ['nom', 'email', 'sujet', 'envoye_le', 'lu', 'repondu']
+    search_fields = ['nom', 'email', 'sujet', 'message']
+    ordering = ['-envoye_le']
+    keyset_field = '-envoye_le'
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+@admin.register(ContactArchive)
+class ContactArchiveAdmin(QueryBudgetAdminMixin, ReadOnlyContactAdminMixin, PerformanceAdminMixin, admin.ModelAdmin):
+    """Configuration admin pour les messages archivés"""
+    
+    list_display = ReadOnlyContactAdminMixin.list_display + ['archive_le']
+    list_filter = ['profile', 'envoye_le', 'archive_le']
+    actions = [export_jsonl, 'restore_selected']
+    
+    def restore_selected(self, request, queryset):
+        count = restore_contacts(queryset)
+        self.message_user(request, f"{count} message(s) restauré(s).")
+    restore_selected.short_description = "Restaurer dans les messages de contact"
+    restore_selected.allowed_permissions = ('restore',)
+    
+    def has_restore_permission(self, request):
+        """La restauration demande le droit de modifier les messages de contact"""
+        return request.user.has_perm('portfolio.change_contact')
+
+@admin.register(ContactHistorique)
+class ContactHistoriqueAdmin(QueryBudgetAdminMixin, ReadOnlyContactAdminMixin, PerformanceAdminMixin, admin.ModelAdmin):
+    """Messages récents et archivés réunis (vue SQL)"""
+    
+    list_display = ReadOnlyContactAdminMixin.list_display + ['archive']
+    list_filter = ['profile', 'archive', 'lu', 'repondu', 'envoye_le']
+    actions = [export_jsonl]
+
+@admin.register(StatistiqueVues)
+class StatistiqueVuesAdmin(QueryBudgetAdminMixin, PerformanceAdminMixin, admin.ModelAdmin):
+    """Agrégats de vues par projet (alimentés par la commande compact_vues)"""
+    
+    list_display = ['projet', 'periode', 'debut', 'vues']
+    list_filter = ['periode', 'projet']
+    list_select_related = ['projet']
+    date_hierarchy = 'debut'
+    ordering = ['-debut']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(CompteurPortfolio)
+class CompteurPortfolioAdmin(QueryBudgetAdminMixin, admin.ModelAdmin):
+    """Compteurs des statistiques (lecture seule, recalculés par reconcile_compteurs)"""
+    
+    list_display = ['profile', 'nom', 'valeur']
+    list_filter = ['nom']
+    list_select_related = ['profile']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+@admin.register(ProfilRequete)
+class ProfilRequeteAdmin(QueryBudgetAdminMixin, admin.ModelAdmin):
+    """Derniers profils de requêtes (lecture seule, téléchargeables en pstats ou collapsed stacks)"""
+    
+    list_display = ['cree_le', 'methode', 'chemin', 'statut', 'duree_ms', 'requetes_sql', 'mode', 'echantillonne']
+    list_filter = ['mode', 'echantillonne', 'statut']
+    search_fields = ['chemin']
+    ordering = ['-cree_le']
+    fields = ['cree_le', 'methode', 'chemin', 'statut', 'duree_ms', 'requetes_sql', 'mode', 'echantillonne',
+              'telecharger', 'resume']
+    readonly_fields = fields
+    
+    def get_queryset(self, request):
+        """Données du profil lues seulement sur la page de détail"""
+        return super().get_queryset(request).defer('donnees')
+    
+    def get_urls(self):
+        urls = [
+            path('<int:pk>/telecharger/', self.admin_site.admin_view(self.download_view),
+                 name='portfolio_profilrequete_download'),
+        ]
+        return urls + super().get_urls()
+    
+    def download_view(self, request, pk):
+        if not self.has_view_permission(request):
+            return HttpResponse(status=403)
+        profil = get_object_or_404(ProfilRequete, pk=pk)
+        response = HttpResponse(bytes(profil.donnees), content_type='application/octet-stream')
+        response['Content-Disposition'] = f'attachment; filename="profil-{profil.pk}.{profil.extension}"'
+        return response
+    
+    def telecharger(self, obj):
+        url = reverse('admin:portfolio_profilrequete_download', args=[obj.pk])
+        return format_html('<a href="{}">profil-{}.{}</a>', url, obj.pk, obj.extension)
+    telecharger.short_description = 'Fichier'
+    
+    def resume(self, obj):
+        return format_html('<pre style="font-size: 12px;">{}</pre>', summarize(obj))
+    resume.short_description = 'Résumé'
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(Tache)
+class TacheAdmin(QueryBudgetAdminMixin, admin.ModelAdmin):
+    """Tâches de fond : file d'attente, erreurs et nouvelles tentatives"""
+    
+    list_display = ['nom', 'etat', 'tentatives', 'executer_apres', 'termine_le', 'duree_ms', 'travailleur']
+    list_filter = ['etat', 'nom']
+    search_fields = ['nom', 'cle']
+    ordering = ['-id']
+    readonly_fields = ['nom', 'arguments', 'etat', 'cle', 'executer_apres', 'tentatives', 'max_tentatives',
+                       'travailleur', 'debut', 'termine_le', 'duree_ms', 'derniere_erreur', 'cree_le']
+    actions = ['relancer']
+    
+    def relancer(self, request, queryset):
+        """Remet en attente les tâches en échec, pour une exécution immédiate"""
+        count = queryset.filter(etat=Tache.ECHEC).update(
+            etat=Tache.EN_ATTENTE, tentatives=0, executer_apres=timezone.now(), termine_le=None)
+        self.message_user(request, f"{count} tâche(s) remise(s) en attente.")
+    relancer.short_description = "Relancer les tâches en échec"
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
 # Personnalisation globale de l'admin
 admin.site.site_header = "Portfolio - Administration"
 admin.site.site_title = "Portfolio Admin"
@@ -0,0 +1,121 @@
+# portfolio/analytics.py
+# Statistiques de vues des projets : le journal VueProjet est compacté en
+# agrégats horaires et journaliers (StatistiqueVues), d'où est dérivé Projet.vues
+
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce, TruncDay, TruncHour
+from django.utils import timezone
+
+from .cache import STATS_VERSION_KEY, bump_version, get_content_version, get_version
+from .counters import reconcile_counters
+from .models import Projet, StatistiqueVues, VueProjet
+
+# Durée de vie (secondes) des séries mises en cache
+STATS_CACHE_TIMEOUT = 300
+
+# Fonctions de troncature par période d'agrégation
+TRONCATURES = {
+    'heure': TruncHour,
+    'jour': TruncDay,
+}
+
+
+def _merge_buckets(journal, periode):
+    """Ajoute les vues du journal aux agrégats existants de la période"""
+    counts = {
+        (row['projet_id'], row['debut']): row['n']
+        for row in journal.annotate(debut=TRONCATURES[periode]('vue_le'))
+        .values('projet_id', 'debut').annotate(n=Count('id')).order_by()
+    }
+    if not counts:
+        return
+    existing = StatistiqueVues.objects.filter(
+        periode=periode,
+        projet_id__in={projet_id for projet_id, _ in counts},
+        debut__in={debut for _, debut in counts},
+    )
+    to_update = []
+    for stat in existing:
+        n = counts.pop((stat.projet_id, stat.debut), None)
+        if n is not None:
+            stat.vues += n
+            to_update.append(stat)
+    StatistiqueVues.objects.bulk_update(to_update, ['vues'], batch_size=500)
+    StatistiqueVues.objects.bulk_create(
+        [StatistiqueVues(projet_id=projet_id, periode=periode, debut=debut, vues=n)
+         for (projet_id, debut), n in counts.items()],
+        batch_size=500,
+    )
+
+
+def refresh_project_views(projet_ids=None):
+    """Recalcule Projet.vues comme la somme des agrégats journaliers"""
+    total = (
+        StatistiqueVues.objects.filter(projet=OuterRef('pk'), periode='jour')
+        .values('projet').annotate(total=Sum('vues')).values('total')
+    )
+    projets = Projet.objects.all() if projet_ids is None else Projet.objects.filter(pk__in=projet_ids)
+    updated = projets.update(vues=Coalesce(Subquery(total), 0))
+    # update() n'émet pas de signal : les compteurs des portfolios concernés sont recalculés
+    tenant_ids = None if projet_ids is None else set(projets.values_list('profile_id', flat=True))
+    reconcile_counters(['total_vues_projets'], tenant_ids)
+    return updated
+
+
+def compact_views(keep_hours_days=90):
+    """Compacte le journal des vues ; retourne le nombre de vues traitées
+
+    Les agrégats horaires plus anciens que `keep_hours_days` jours sont
+    supprimés (les agrégats journaliers sont conservés).
+    """
+    limite = VueProjet.objects.aggregate(m=Max('id'))['m']
+    if limite is None:
+        return 0
+    with transaction.atomic():
+        journal = VueProjet.objects.filter(id__lte=limite)
+        # Verrou sur les lignes du journal : une compaction concurrente (commande et tâche
+        # périodique) attend la validation de celle-ci, puis ne retrouve que les lignes restantes
+        if not list(journal.select_for_update().values_list('id', flat=True)):
+            return 0
+        projet_ids = set(journal.values_list('projet_id', flat=True).distinct())
+        for periode in TRONCATURES:
+            _merge_buckets(journal, periode)
+        compacted, _ = journal.delete()
+        refresh_project_views(projet_ids)
+        if keep_hours_days is not None:
+            StatistiqueVues.objects.filter(
+                periode='heure', debut__lt=timezone.now() - timedelta(days=keep_hours_days)
+            ).delete()
+    bump_version(STATS_VERSION_KEY)
+    return compacted
+
+
+def get_view_stats(tenant_id=None, periode='jour', jours=30, projet_id=None):
+    """Séries de vues par projet d'un portfolio, servies depuis le cache entre deux compactions"""
+    key = 'portfolio:stats:vues:%s:%s:%s:%s:%s:%s' % (
+        tenant_id, get_version(STATS_VERSION_KEY), get_content_version(tenant_id), periode, jours, projet_id
+    )
+    stats = cache.get(key)
+    if stats is not None:
+        return stats
+    depuis = timezone.now() - timedelta(days=jours)
+    rows = StatistiqueVues.objects.filter(periode=periode, debut__gte=depuis, projet__profile_id=tenant_id)
+    if projet_id is not None:
+        rows = rows.filter(projet_id=projet_id)
+    series = {}
+    for pk, debut, vues in rows.order_by('debut').values_list('projet_id', 'debut', 'vues'):
+        series.setdefault(pk, []).append([debut.isoformat(), vues])
+    projets = Projet.objects.for_tenant(tenant_id).filter(actif=True)
+    if projet_id is not None:
+        projets = projets.filter(pk=projet_id)
+    stats = [
+        {'id': pk, 'titre': titre, 'vues': vues, 'serie': series.get(pk, [])}
+        for pk, titre, vues in projets.values_list('pk', 'titre', 'vues')
+    ]
+    # Expiration courte : la fenêtre glissante avance même sans compaction
+    cache.set(key, stats, STATS_CACHE_TIMEOUT)
+    return stats
@@ -0,0 +1,258 @@
+# portfolio/antispam.py
+# Filtrage des messages de contact avant enregistrement : doublons exacts
+# (filtre de Bloom glissant), quasi-doublons (MinHash / LSH) et heuristiques
+# de spam. Tout est en mémoire, de taille bornée, avec expiration temporelle.
+# Les messages sont comparés à ceux du même portfolio seulement.
+# Un message n'est mémorisé qu'une fois enregistré : un envoi en échec peut
+# être renvoyé.
+
+import hashlib
+import random
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict, namedtuple
+
+from django.conf import settings
+
+Verdict = namedtuple('Verdict', ['accepte', 'raison', 'score'])
+
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+URL_RE = re.compile(r'https?://|www\.', re.IGNORECASE)
+REPEAT_RE = re.compile(r'(.)\1{5,}')
+
+# Mots fréquents dans les messages indésirables (forme normalisée, sans accents) ;
+# pas de mots courants du français ou des affaires (prêt, investissement, SEO...)
+SPAM_KEYWORDS = {
+    'viagra', 'casino', 'loan', 'backlinks', 'porn', 'forex', 'winner',
+}
+
+
+def normalize(text):
+    """Minuscules, sans accents ni ponctuation, espaces réduits"""
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(WORD_RE.findall(text.lower()))
+
+
+class RollingBloomFilter:
+    """Filtre de Bloom à deux générations, renouvelé toutes les `window` secondes
+
+    Une clé reste connue entre `window` et 2 x `window` secondes ; la mémoire
+    est fixe (2 x `size_bits` bits).
+    """
+
+    def __init__(self, size_bits=1 << 20, hashes=7, window=3600):
+        self.size_bits = size_bits
+        self.hashes = hashes
+        self.window = window
+        self.current = bytearray(size_bits // 8)
+        self.previous = bytearray(size_bits // 8)
+        self.rotated_at = time.monotonic()
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size_bits for i in range(self.hashes)]
+
+    def _rotate(self, now):
+        if now - self.rotated_at >= self.window:
+            self.previous = self.current if now - self.rotated_at < 2 * self.window else bytearray(len(self.current))
+            self.current = bytearray(len(self.current))
+            self.rotated_at = now
+
+    @staticmethod
+    def _contains(bits, positions):
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in positions)
+
+    def contains(self, key, now=None):
+        """True si la clé a (probablement) été ajoutée dans la fenêtre"""
+        self._rotate(time.monotonic() if now is None else now)
+        positions = self._positions(key)
+        return self._contains(self.current, positions) or self._contains(self.previous, positions)
+
+    def add(self, key, now=None):
+        self._rotate(time.monotonic() if now is None else now)
+        for p in self._positions(key):
+            self.current[p >> 3] |= 1 << (p & 7)
+
+    def check_and_add(self, key, now=None):
+        """Ajoute la clé ; retourne True si elle était (probablement) déjà présente"""
+        seen = self.contains(key, now)
+        self.add(key, now)
+        return seen
+
+
+class MinHashLSH:
+    """Index MinHash / LSH des messages récents pour détecter les quasi-doublons"""
+
+    # Nombre premier de Mersenne pour les permutations universelles
+    PRIME = (1 << 61) - 1
+
+    def __init__(self, permutations=32, bands=8, threshold=0.8, max_entries=10000, window=3600):
+        self.permutations = permutations
+        self.bands = bands
+        self.rows = permutations // bands
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.window = window
+        rng = random.Random(0x5EED)
+        self.coefficients = [
+            (rng.randrange(1, self.PRIME), rng.randrange(0, self.PRIME))
+            for _ in range(permutations)
+        ]
+        # id -> (horodatage, espace, signature), du plus ancien au plus récent
+        self.entries = OrderedDict()
+        self.buckets = {}
+        self.next_id = 0
+
+    @staticmethod
+    def shingles(text, size=3):
+        words = text.split()
+        if len(words) < size:
+            return {text} if text else set()
+        return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+    def signature(self, text):
+        hashes = [
+            int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=8).digest(), 'little')
+            for s in self.shingles(text)
+        ]
+        if not hashes:
+            return None
+        prime = self.PRIME
+        return tuple(min((a * h + b) % prime for h in hashes) for a, b in self.coefficients)
+
+    def _band_keys(self, signature, namespace):
+        return [(namespace, i, signature[i * self.rows:(i + 1) * self.rows]) for i in range(self.bands)]
+
+    def _evict(self, now):
+        while self.entries:
+            entry_id, (added, namespace, signature) = next(iter(self.entries.items()))
+            if len(self.entries) <= self.max_entries and now - added < self.window:
+                break
+            del self.entries[entry_id]
+            for key in self._band_keys(signature, namespace):
+                bucket = self.buckets.get(key)
+                if bucket is not None:
+                    bucket.discard(entry_id)
+                    if not bucket:
+                        del self.buckets[key]
+
+    def similarity(self, text, now=None, namespace=None):
+        """Similarité maximale du texte avec un message récent du même espace"""
+        self._evict(time.monotonic() if now is None else now)
+        signature = self.signature(text)
+        if signature is None:
+            return 0.0
+        candidates = set()
+        for key in self._band_keys(signature, namespace):
+            candidates.update(self.buckets.get(key, ()))
+        best = 0.0
+        for entry_id in candidates:
+            other = self.entries[entry_id][2]
+            best = max(best, sum(a == b for a, b in zip(signature, other)) / self.permutations)
+        return best
+
+    def add(self, text, now=None, namespace=None):
+        """Indexe le texte dans l'espace `namespace`"""
+        now = time.monotonic() if now is None else now
+        self._evict(now)
+        signature = self.signature(text)
+        if signature is None:
+            return
+        entry_id = self.next_id
+        self.next_id += 1
+        self.entries[entry_id] = (now, namespace, signature)
+        for key in self._band_keys(signature, namespace):
+            self.buckets.setdefault(key, set()).add(entry_id)
+
+
+def spam_score(nom, email, sujet, message):
+    """Score heuristique de spam (0 = sain) ; seuil : settings.CONTACT_SPAM_THRESHOLD"""
+    score = 0
+    texte = f"{sujet} {message}"
+    liens = len(URL_RE.findall(texte))
+    score += 2 * max(liens - 1, 0)
+    if URL_RE.search(nom or ''):
+        score += 3
+    lettres = [c for c in texte if c.isalpha()]
+    if len(lettres) > 20 and sum(c.isupper() for c in lettres) / len(lettres) > 0.6:
+        score += 2
+    if REPEAT_RE.search(texte):
+        score += 1
+    mots = set(normalize(texte).split())
+    score += 2 * len(mots & SPAM_KEYWORDS)
+    if len((message or '').strip()) < 10:
+        score += 1
+    return score
+
+
+class ContactFilter:
+    """Étape de filtrage exécutée avant l'enregistrement d'un message"""
+
+    def __init__(self, window=None, threshold=None):
+        window = window or settings.CONTACT_DEDUP_WINDOW
+        self.threshold = settings.CONTACT_SPAM_THRESHOLD if threshold is None else threshold
+        self.exact = RollingBloomFilter(window=window)
+        self.near = MinHashLSH(window=window)
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _keys(tenant_id, email, sujet, message):
+        """(clé expéditeur + sujet, clé du corps, corps normalisé), propres au portfolio"""
+        corps = normalize(message)
+        return ('e:%s:%s:%s' % (tenant_id, (email or '').strip().lower(), normalize(sujet)),
+                'm:%s:%s' % (tenant_id, corps), corps)
+
+    def check(self, nom, email, sujet, message, tenant_id=None):
+        """Verdict sans rien mémoriser (voir `record`, après l'enregistrement)"""
+        expediteur, cle_corps, corps = self._keys(tenant_id, email, sujet, message)
+        score = spam_score(nom, email, sujet, message)
+        with self.lock:
+            # Même expéditeur et même sujet dans la fenêtre : rafale probable
+            if self.exact.contains(expediteur):
+                score += 2
+            if score >= self.threshold:
+                return Verdict(False, 'spam', score)
+            if self.exact.contains(cle_corps):
+                return Verdict(False, 'doublon', score)
+            if self.near.similarity(corps, namespace=tenant_id) >= self.near.threshold:
+                return Verdict(False, 'quasi-doublon', score)
+        return Verdict(True, None, score)
+
+    def record(self, email, sujet, message, tenant_id=None):
+        """Mémorise un message enregistré : ses renvois au même portfolio seront des doublons"""
+        expediteur, cle_corps, corps = self._keys(tenant_id, email, sujet, message)
+        with self.lock:
+            self.exact.add(expediteur)
+            self.exact.add(cle_corps)
+            self.near.add(corps, namespace=tenant_id)
+
+
+_filter = None
+_filter_lock = threading.Lock()
+
+
+def get_contact_filter():
+    """Filtre partagé par le processus (créé à la première utilisation)"""
+    global _filter
+    if _filter is None:
+        with _filter_lock:
+            if _filter is None:
+                _filter = ContactFilter()
+    return _filter
+
+
+def check_contact(nom, email, sujet, message, tenant_id=None):
+    """Retourne le verdict du filtre pour un message de contact adressé au portfolio"""
+    if not settings.CONTACT_SPAM_FILTER:
+        return Verdict(True, None, 0)
+    return get_contact_filter().check(nom, email, sujet, message, tenant_id)
+
+
+def record_contact(email, sujet, message, tenant_id=None):
+    """Mémorise un message accepté, une fois enregistré en base"""
+    if settings.CONTACT_SPAM_FILTER:
+        get_contact_filter().record(email, sujet, message, tenant_id)
@@ -0,0 +1,96 @@
+# portfolio/archive.py
+# Archivage des messages de contact : la table Contact ne garde que les
+# messages récents ou à traiter, les autres passent dans ContactArchive
+
+import gzip
+import json
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Contact, ContactArchive
+
+logger = logging.getLogger(__name__)
+
+# Champs recopiés entre la table des messages et l'archive
+ARCHIVE_FIELDS = ['id', 'profile_id', 'nom', 'email', 'sujet', 'message', 'envoye_le', 'lu', 'repondu']
+
+
+def _move_rows(source, target_model, chunk_size, progress=None):
+    """Déplace les lignes de `source` vers `target_model` par lots transactionnels"""
+    chunk_size = chunk_size or settings.ADMIN_BULK_CHUNK_SIZE
+    pending = source.order_by('pk').values(*ARCHIVE_FIELDS)
+    moved = 0
+    last_pk = None
+    while True:
+        window = pending if last_pk is None else pending.filter(pk__gt=last_pk)
+        rows = list(window[:chunk_size])
+        if not rows:
+            break
+        pks = [row['id'] for row in rows]
+        with transaction.atomic():
+            target_model.objects.bulk_create(
+                [target_model(**row) for row in rows], ignore_conflicts=True
+            )
+            if target_model is Contact:
+                # auto_now_add écrase la date d'envoi à l'insertion : on la rétablit (une requête par lot)
+                Contact.objects.bulk_update(
+                    [Contact(pk=row['id'], envoye_le=row['envoye_le']) for row in rows],
+                    ['envoye_le'], batch_size=chunk_size,
+                )
+            source.model.objects.filter(pk__in=pks).delete()
+        moved += len(rows)
+        last_pk = pks[-1]
+        if progress is not None:
+            progress(moved)
+        if len(rows) < chunk_size:
+            break
+    return moved
+
+
+def archivable_contacts(days=None):
+    """Messages lus et répondus, envoyés il y a plus de `days` jours"""
+    if days is None:
+        days = settings.CONTACT_ARCHIVE_DAYS
+    limite = timezone.now() - timedelta(days=days)
+    return Contact.objects.filter(lu=True, repondu=True, envoye_le__lt=limite)
+
+
+def archive_contacts(days=None, chunk_size=None, progress=None, queryset=None):
+    """Archive les anciens messages traités ; retourne le nombre de messages déplacés
+
+    `queryset` restreint l'archivage à une sélection (action d'administration).
+    """
+    candidates = archivable_contacts(days)
+    if queryset is not None:
+        candidates = candidates.filter(pk__in=queryset.values('pk'))
+    moved = _move_rows(candidates, ContactArchive, chunk_size, progress)
+    logger.info("%d message(s) de contact archivé(s)", moved)
+    return moved
+
+
+def restore_contacts(queryset, chunk_size=None):
+    """Replace des messages archivés dans la table des messages"""
+    return _move_rows(queryset, Contact, chunk_size)
+
+
+def iter_jsonl(queryset, compress=False):
+    """Exporte un queryset de messages en JSON Lines (gzip si `compress`), en flux"""
+    rows = queryset.order_by('pk').values(*ARCHIVE_FIELDS).iterator(chunk_size=2000)
+    if not compress:
+        for row in rows:
+            yield json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+        return
+    # Compression incrémentale : un membre gzip par lot de lignes
+    batch = []
+    for row in rows:
+        batch.append(json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n')
+        if len(batch) >= 2000:
+            yield gzip.compress(''.join(batch).encode('utf-8'))
+            batch = []
+    if batch:
+        yield gzip.compress(''.join(batch).encode('utf-8'))
@@ -0,0 +1,42 @@
+# portfolio/bulk.py
+# Mises à jour en masse par lots (actions d'administration sur de grandes sélections)
+
+import logging
+
+from django.conf import settings
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+def chunked_update(queryset, chunk_size=None, progress=None, **values):
+    """Applique `queryset.update(**values)` par lots de clés primaires
+
+    Chaque lot est une transaction courte : sous SQLite, le verrou d'écriture
+    est relâché entre deux lots et les lectures ne sont pas bloquées.
+    Retourne le nombre de lignes modifiées (valeur renvoyée par update()).
+    `progress(lignes_modifiees, lots)` est appelé après chaque lot.
+    """
+    chunk_size = chunk_size or settings.ADMIN_BULK_CHUNK_SIZE
+    manager = queryset.model._default_manager.using(queryset.db)
+    # Parcours par clé primaire croissante : les lignes déjà modifiées ne
+    # sont jamais relues, même si la mise à jour change le filtre appliqué
+    pending = queryset.order_by('pk').values_list('pk', flat=True)
+    updated = chunks = 0
+    last_pk = None
+    while True:
+        window = pending if last_pk is None else pending.filter(pk__gt=last_pk)
+        pks = list(window[:chunk_size])
+        if not pks:
+            break
+        with transaction.atomic(using=queryset.db):
+            updated += manager.filter(pk__in=pks).update(**values)
+        chunks += 1
+        last_pk = pks[-1]
+        logger.info("%s : %d ligne(s) mise(s) à jour (lot %d)",
+                    queryset.model._meta.verbose_name_plural, updated, chunks)
+        if progress is not None:
+            progress(updated, chunks)
+        if len(pks) < chunk_size:
+            break
+    return updated
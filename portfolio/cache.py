@@ -0,0 +1,94 @@
+# portfolio/cache.py
+# Gestion des versions de données (contenu, statistiques), utilisées comme
+# clés des caches : incrémenter une version invalide tout ce qui en dépend.
+# La version du contenu est propre à chaque portfolio, et doit être lue dans
+# un cache partagé par tous les workers.
+
+import time
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from django.db import transaction
+from django.dispatch import Signal
+
+# Clé du cache partagé contenant la version courante du contenu (suffixée par le portfolio)
+CONTENT_VERSION_KEY = 'portfolio:content_version'
+# Version des agrégats de vues (incrémentée à chaque compaction)
+STATS_VERSION_KEY = 'portfolio:stats_version'
+# Version de la table des portfolios (résolution hôte -> portfolio)
+TENANTS_VERSION_KEY = 'portfolio:tenants_version'
+
+# Émis (arguments tenant_id, version, after_commit) à chaque incrément de la version du contenu
+# d'un portfolio ; after_commit distingue l'incrément répété après la validation d'une transaction
+content_version_changed = Signal()
+
+
+def get_version(key):
+    """Retourne la version courante associée à `key`"""
+    version = cache.get(key)
+    if version is None:
+        # Initialisation avec un horodatage : une clé évincée du cache ne
+        # peut pas retomber sur une ancienne version encore en cache
+        cache.add(key, int(time.time() * 1000), None)
+        version = cache.get(key, int(time.time() * 1000))
+    return version
+
+
+def bump_version(key):
+    """Incrémente la version associée à `key` (invalide les caches dépendants)"""
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Clé absente : on repart d'une nouvelle version
+        get_version(key)
+        return cache.incr(key)
+
+
+def content_version_key(tenant_id=None):
+    """Clé de la version du contenu d'un portfolio"""
+    return '%s:%s' % (CONTENT_VERSION_KEY, tenant_id)
+
+
+def get_content_version(tenant_id=None):
+    """Retourne la version courante du contenu du portfolio"""
+    return get_version(content_version_key(tenant_id))
+
+
+def _bump_content_version(tenant_id, after_commit=False):
+    version = bump_version(content_version_key(tenant_id))
+    content_version_changed.send(sender=None, tenant_id=tenant_id, version=version, after_commit=after_commit)
+    return version
+
+
+def bump_content_version(tenant_id=None):
+    """Incrémente la version du contenu (invalide les fragments de ce portfolio)
+
+    Dans une transaction, la version est incrémentée une seconde fois après la validation :
+    une requête servie entre-temps a pu mettre en cache l'ancien contenu sous la nouvelle version.
+    """
+    version = _bump_content_version(tenant_id)
+    connection = transaction.get_connection()
+    if connection.in_atomic_block:
+        # Un seul incrément par portfolio à la validation, quel que soit le nombre d'objets modifiés
+        pending = connection.__dict__.setdefault('_versions_a_incrementer', set())
+        pending.add(tenant_id)
+
+        def bump_after_commit():
+            if tenant_id in pending:
+                pending.discard(tenant_id)
+                _bump_content_version(tenant_id, after_commit=True)
+        transaction.on_commit(bump_after_commit)
+    return version
+
+
+@checks.register(checks.Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """Hors DEBUG, un cache local à chaque processus ne propage pas les invalidations"""
+    if settings.DEBUG or not settings.CACHES['default']['BACKEND'].endswith('LocMemCache'):
+        return []
+    return [checks.Error(
+        "Cache local à chaque processus (LocMemCache) : une modification n'invalide que le worker qui l'a reçue.",
+        hint="Configurer CACHE_BACKEND avec un cache partagé (fichier, Redis, Memcached).",
+        id='portfolio.E001',
+    )]
@@ -0,0 +1,132 @@
+# portfolio/counters.py
+# Statistiques du portfolio maintenues de façon incrémentale : chaque
+# enregistrement ou suppression ajuste les compteurs concernés, et la
+# réconciliation périodique corrige les écarts (mises à jour en masse, etc.).
+# Chaque portfolio (profil) a ses propres compteurs.
+# Les messages de contact (insertions publiques) n'ajustent leur compteur
+# qu'après la validation, sans lecture préalable (voir signals.py).
+
+from django.db.models import Count, F, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from .models import CompteurPortfolio, Competence, Contact, Experience, Profile, Projet
+
+# Contribution d'un objet à chaque compteur, d'après ses valeurs de champs
+CONTRIBUTIONS = {
+    Projet: lambda v: {
+        'total_projets': int(v['actif']),
+        'projets_featured': int(v['actif'] and v['featured']),
+        'total_vues_projets': v['vues'] if v['actif'] else 0,
+    },
+    Competence: lambda v: {'total_competences': int(v['actif'])},
+    Experience: lambda v: {'total_experiences': int(v['actif'])},
+    Contact: lambda v: {'messages_non_lus': int(not v['lu'])},
+}
+
+# Champs lus pour calculer les contributions
+FIELDS = {
+    Projet: ['actif', 'featured', 'vues'],
+    Competence: ['actif'],
+    Experience: ['actif'],
+    Contact: ['lu'],
+}
+
+# Calcul exact de chaque compteur : (modèle, filtre, agrégat), groupé par portfolio
+AGGREGATES = {
+    'total_projets': (Projet, Q(actif=True), Count('pk')),
+    'projets_featured': (Projet, Q(actif=True, featured=True), Count('pk')),
+    'total_vues_projets': (Projet, Q(actif=True), Sum('vues')),
+    'total_competences': (Competence, Q(actif=True), Count('pk')),
+    'total_experiences': (Experience, Q(actif=True), Count('pk')),
+    'messages_non_lus': (Contact, Q(lu=False), Count('pk')),
+}
+
+COUNTER_NAMES = list(AGGREGATES)
+
+
+def contributions(instance):
+    """Contribution d'une instance (valeurs en mémoire) aux compteurs"""
+    model = type(instance)
+    return CONTRIBUTIONS[model]({f: getattr(instance, f) for f in FIELDS[model]})
+
+
+def stored_contributions(model, pk):
+    """Portfolio et contribution de la version enregistrée en base d'un objet"""
+    values = model._base_manager.filter(pk=pk).values('profile_id', *FIELDS[model]).first()
+    if values is None:
+        return None, {}
+    return values['profile_id'], CONTRIBUTIONS[model](values)
+
+
+def _tenant_filter(tenant_ids):
+    """Filtre sur une liste de portfolios (None désigne les objets sans profil)"""
+    ids = [pk for pk in tenant_ids if pk is not None]
+    condition = Q(profile_id__in=ids)
+    if len(ids) < len(tenant_ids):
+        condition |= Q(profile__isnull=True)
+    return condition
+
+
+def apply_deltas(tenant_id, deltas):
+    """Ajoute les écarts non nuls aux compteurs du portfolio (une requête UPDATE par compteur)
+    
+    Les compteurs d'un portfolio sont créés avec son profil (voir create_counters).
+    """
+    for nom, delta in deltas.items():
+        if delta:
+            CompteurPortfolio.objects.for_tenant(tenant_id).filter(nom=nom).update(
+                valeur=F('valeur') + delta)
+
+
+def recount(tenant_id, nom):
+    """Recalcule un compteur du portfolio en une seule requête UPDATE (sans lecture préalable)"""
+    model, condition, aggregate = AGGREGATES[nom]
+    exact = (model.objects.for_tenant(tenant_id).filter(condition)
+             .values('profile').annotate(v=aggregate).values('v').order_by())
+    CompteurPortfolio.objects.for_tenant(tenant_id).filter(nom=nom).update(valeur=Coalesce(Subquery(exact), 0))
+
+
+def create_counters(tenant_id):
+    """Crée (à leur valeur exacte) les compteurs d'un nouveau portfolio"""
+    return reconcile_counters(tenant_ids=[tenant_id])
+
+
+def get_counters(tenant_id=None):
+    """Valeurs des compteurs du portfolio, en une seule requête"""
+    values = dict.fromkeys(COUNTER_NAMES, 0)
+    values.update(CompteurPortfolio.objects.for_tenant(tenant_id).values_list('nom', 'valeur'))
+    return values
+
+
+def exact_counter(nom, tenant_ids=None):
+    """Valeur exacte d'un compteur, par portfolio (une requête groupée)"""
+    model, condition, aggregate = AGGREGATES[nom]
+    rows = model.objects.filter(condition)
+    if tenant_ids is not None:
+        rows = rows.filter(_tenant_filter(tenant_ids))
+    return dict(rows.values('profile').annotate(v=aggregate).values_list('profile', 'v').order_by())
+
+
+def reconcile_counters(names=None, tenant_ids=None):
+    """Recalcule les compteurs depuis les tables (tous les portfolios par défaut)
+    
+    Retourne les écarts corrigés : {(id du portfolio, compteur): écart}.
+    """
+    if tenant_ids is None:
+        tenant_ids = [None] + list(Profile.objects.values_list('pk', flat=True))
+    tenant_ids = list(dict.fromkeys(tenant_ids))
+    drift = {}
+    for nom in names or COUNTER_NAMES:
+        exact = exact_counter(nom, tenant_ids)
+        stored = dict(CompteurPortfolio.objects.filter(_tenant_filter(tenant_ids), nom=nom)
+                      .values_list('profile', 'valeur'))
+        missing = []
+        for tenant_id in tenant_ids:
+            valeur = exact.get(tenant_id) or 0
+            if tenant_id not in stored:
+                missing.append(CompteurPortfolio(profile_id=tenant_id, nom=nom, valeur=valeur))
+            elif stored[tenant_id] != valeur:
+                drift[tenant_id, nom] = valeur - stored[tenant_id]
+                CompteurPortfolio.objects.for_tenant(tenant_id).filter(nom=nom).update(valeur=valeur)
+        CompteurPortfolio.objects.bulk_create(missing, batch_size=500, ignore_conflicts=True)
+    return drift
@@ -0,0 +1,80 @@
+# portfolio/durations.py
+# Durées précalculées à l'enregistrement, pour trier et filtrer en base et
+# sérialiser sans calcul : durée en mois des projets terminés et des
+# expériences (jusqu'à aujourd'hui si en cours, d'où le rafraîchissement
+# quotidien par la commande refresh_durees), et mois d'expérience cumulés
+# par compétence (somme des durées des expériences actives qui l'ont apportée).
+
+from datetime import date
+
+from django.conf import settings
+from django.db.models import OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .counters import _tenant_filter
+from .models import Competence, Experience, Projet
+
+
+def duree_en_mois(debut, fin):
+    """Durée approximative en mois (mois de 30 jours)"""
+    return max(round((fin - debut).days / 30), 0)
+
+
+def libelle_duree(mois):
+    """Durée lisible : « 8 mois », « 2 ans », « 1 an et 3 mois »"""
+    if mois < 12:
+        return f"{mois} mois"
+    annees, mois_restants = divmod(mois, 12)
+    libelle = f"{annees} an{'s' if annees > 1 else ''}"
+    return f"{libelle} et {mois_restants} mois" if mois_restants else libelle
+
+
+def duree_calculee(instance, today=None):
+    """Durée d'un projet (None s'il n'est pas fini) ou d'une expérience (en cours : jusqu'à aujourd'hui)"""
+    if instance.date_fin is None:
+        if isinstance(instance, Projet):
+            return None
+        return duree_en_mois(instance.date_debut, today or date.today())
+    return duree_en_mois(instance.date_debut, instance.date_fin)
+
+
+def update_skill_experience(tenant_ids=None):
+    """Recalcule les mois d'expérience des compétences (de tous les portfolios si None), en une requête"""
+    through = Experience.competences_acquises.through
+    total = (through.objects.filter(competence_id=OuterRef('pk'), experience__actif=True)
+             .values('competence_id').annotate(total=Sum('experience__duree_mois')).values('total'))
+    competences = Competence.objects.all()
+    if tenant_ids is not None:
+        competences = competences.filter(_tenant_filter(list(tenant_ids)))
+    return competences.update(mois_experience=Coalesce(Subquery(total), Value(0)))
+
+
+def refresh_durations(tenant_ids=None, en_cours=True, today=None):
+    """Recalcule les durées enregistrées (expériences en cours seulement, ou tout) puis les cumuls
+
+    Retourne le nombre d'objets dont la durée a changé.
+    """
+    changed = 0
+    tenants = set()
+    for model in (Experience, Projet):
+        objects = model.objects.all()
+        if tenant_ids is not None:
+            objects = objects.filter(_tenant_filter(list(tenant_ids)))
+        if en_cours:
+            if model is Projet:
+                # Durée d'un projet en cours : non définie, inchangée d'un jour à l'autre
+                continue
+            objects = objects.filter(date_fin__isnull=True)
+        # Regroupement par nouvelle durée : une requête UPDATE par valeur distincte
+        by_duration = {}
+        for row in objects.values('pk', 'profile_id', 'date_debut', 'date_fin', 'duree_mois').iterator():
+            duree = duree_calculee(model(**row), today)
+            if duree != row['duree_mois']:
+                by_duration.setdefault(duree, []).append(row['pk'])
+                tenants.add(row['profile_id'])
+        size = settings.ADMIN_BULK_CHUNK_SIZE
+        for duree, pks in by_duration.items():
+            for start in range(0, len(pks), size):
+                changed += model.objects.filter(pk__in=pks[start:start + size]).update(duree_mois=duree)
+    update_skill_experience(tenant_ids if tenant_ids is not None else (tenants if en_cours else None))
+    return changed
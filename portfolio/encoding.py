@@ -0,0 +1,81 @@
+# portfolio/encoding.py
+# Encodage des réponses de l'API : JSON rapide (orjson si installé, sinon
+# json de la bibliothèque standard) et MessagePack (si msgpack est installé)
+
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dépend de l'environnement
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - dépend de l'environnement
+    msgpack = None
+
+JSON_CONTENT_TYPE = 'application/json'
+MSGPACK_CONTENT_TYPE = 'application/msgpack'
+
+# Types MIME acceptés pour MessagePack (plusieurs variantes circulent)
+MSGPACK_MEDIA_TYPES = ('application/msgpack', 'application/x-msgpack', 'application/vnd.msgpack')
+
+
+def _default(obj):
+    """Types non natifs (dates, Decimal...), délégués à l'encodeur de Django"""
+    return DjangoJSONEncoder().default(obj)
+
+
+def json_dumps(data):
+    """Encode en JSON compact (octets UTF-8)"""
+    if orjson is not None:
+        return orjson.dumps(data, default=_default)
+    return json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False,
+                      separators=(',', ':')).encode('utf-8')
+
+
+def msgpack_dumps(data):
+    """Encode en MessagePack ; lève RuntimeError si msgpack n'est pas installé"""
+    if msgpack is None:
+        raise RuntimeError("Le paquet msgpack n'est pas installé")
+    return msgpack.packb(data, default=_default, use_bin_type=True)
+
+
+# Encodeurs disponibles : format -> (fonction, type MIME)
+ENCODERS = {'json': (json_dumps, JSON_CONTENT_TYPE)}
+if msgpack is not None:
+    ENCODERS['msgpack'] = (msgpack_dumps, MSGPACK_CONTENT_TYPE)
+
+
+def negotiate_format(request):
+    """Format de réponse demandé (?format=, sinon en-tête Accept) ; None si indisponible"""
+    requested = request.GET.get('format')
+    if requested:
+        return requested if requested in ENCODERS else None
+    accept = request.headers.get('Accept', '')
+    if any(media_type in accept for media_type in MSGPACK_MEDIA_TYPES):
+        # Repli sur JSON si le client accepte aussi JSON
+        if 'msgpack' in ENCODERS:
+            return 'msgpack'
+        return 'json' if JSON_CONTENT_TYPE in accept or '*/*' in accept else None
+    return 'json'
+
+
+def encode(data, fmt='json'):
+    """Encode les données dans le format négocié (octets)"""
+    return ENCODERS[fmt][0](data)
+
+
+def bytes_response(body, fmt='json', status=200):
+    """Réponse HTTP pour un contenu déjà encodé dans le format négocié"""
+    response = HttpResponse(body, content_type=ENCODERS[fmt][1], status=status)
+    response['Vary'] = 'Accept'
+    return response
+
+
+def encoded_response(data, fmt='json', status=200):
+    """Réponse HTTP encodée dans le format négocié"""
+    return bytes_response(encode(data, fmt), fmt, status)
@@ -0,0 +1,245 @@
+# portfolio/events.py
+# Notifications temps réel des modifications du contenu (Server-Sent Events) :
+# diffusion publication / abonnement dans le processus, mémoire bornée par
+# connexion, et variante lisant le journal des modifications (multi-processus).
+# Chaque connexion ne reçoit que les modifications de son portfolio.
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import deque, namedtuple
+from functools import partial
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, transaction
+
+from .models import Modification
+
+logger = logging.getLogger(__name__)
+
+Event = namedtuple('Event', ['profile_id', 'type_objet', 'objet_id', 'version'])
+
+
+class Subscription:
+    """Abonnement d'une connexion : notifications en attente, en nombre borné"""
+
+    __slots__ = ('loop', 'tenant_id', 'pending', 'wakeup', 'overflow')
+
+    def __init__(self, loop, tenant_id, size):
+        self.loop = loop
+        self.tenant_id = tenant_id
+        self.pending = deque(maxlen=size)
+        self.wakeup = asyncio.Event()
+        self.overflow = False
+
+    def push(self, events):
+        """Ajoute des notifications (dans la boucle de la connexion)"""
+        # File pleine : les plus anciennes sont perdues, le client resynchronise
+        if len(self.pending) + len(events) > self.pending.maxlen:
+            self.overflow = True
+        self.pending.extend(events)
+        self.wakeup.set()
+
+    async def get(self, timeout):
+        """Attend des notifications ; retourne (notifications, débordement)"""
+        if not self.pending and not self.overflow:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        self.wakeup.clear()
+        events, overflow = list(self.pending), self.overflow
+        self.pending.clear()
+        self.overflow = False
+        return events, overflow
+
+
+class Broker:
+    """Diffusion dans le processus : un appel par boucle d'événements, quel que
+    soit le nombre de connexions qu'elle sert, et seulement aux connexions du
+    portfolio concerné"""
+
+    def __init__(self, queue_size=None):
+        self.queue_size = queue_size or settings.EVENTS_QUEUE_SIZE
+        self.lock = threading.Lock()
+        # boucle d'événements -> portfolio -> abonnements
+        self.loops = {}
+        # Fonctions prévenues de toutes les notifications (caches locaux...)
+        self.listeners = []
+
+    def __len__(self):
+        with self.lock:
+            return sum(len(subscriptions) for tenants in self.loops.values()
+                       for subscriptions in tenants.values())
+
+    def subscribe(self, tenant_id=None):
+        """Nouvel abonnement (à appeler depuis la boucle de la connexion)"""
+        subscription = Subscription(asyncio.get_running_loop(), tenant_id, self.queue_size)
+        with self.lock:
+            tenants = self.loops.setdefault(subscription.loop, {})
+            tenants.setdefault(tenant_id, set()).add(subscription)
+        return subscription
+
+    def add_listener(self, callback):
+        """Ajoute une fonction appelée avec chaque lot de notifications (depuis le thread de diffusion)"""
+        with self.lock:
+            self.listeners.append(callback)
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            tenants = self.loops.get(subscription.loop, {})
+            subscriptions = tenants.get(subscription.tenant_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del tenants[subscription.tenant_id]
+                if not tenants:
+                    del self.loops[subscription.loop]
+
+    def publish(self, events):
+        """Diffuse des notifications aux abonnés concernés (depuis n'importe quel thread)"""
+        by_tenant = {}
+        for event in events:
+            by_tenant.setdefault(event.profile_id, []).append(event)
+        with self.lock:
+            targets = []
+            for loop, tenants in self.loops.items():
+                batches = [(tuple(tenants[tenant_id]), tenant_events)
+                           for tenant_id, tenant_events in by_tenant.items() if tenant_id in tenants]
+                if batches:
+                    targets.append((loop, batches))
+            listeners = list(self.listeners)
+        self._call_listeners(listeners, events)
+        for loop, batches in targets:
+            try:
+                loop.call_soon_threadsafe(self._deliver, batches)
+            except RuntimeError:
+                # Boucle fermée : ses abonnements sont abandonnés
+                with self.lock:
+                    self.loops.pop(loop, None)
+
+    @staticmethod
+    def _call_listeners(listeners, events):
+        for listener in listeners:
+            try:
+                listener(events)
+            except Exception:
+                logger.exception("Échec d'une fonction prévenue des notifications")
+
+    @staticmethod
+    def _deliver(batches):
+        for subscriptions, events in batches:
+            for subscription in subscriptions:
+                subscription.push(events)
+
+    def notify(self, events):
+        """Point d'entrée des signaux : diffusion directe"""
+        self.publish(events)
+
+
+class DatabaseBroker(Broker):
+    """Diffusion entre processus : chaque processus lit périodiquement le
+    journal des modifications (un seul thread, démarré au premier abonnement)"""
+
+    def __init__(self, interval=None, **kwargs):
+        super().__init__(**kwargs)
+        self.interval = interval or settings.EVENTS_POLL_INTERVAL
+        self.thread = None
+
+    def _start(self):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._poll, name='portfolio-events', daemon=True)
+                self.thread.start()
+
+    def subscribe(self, tenant_id=None):
+        subscription = super().subscribe(tenant_id)
+        self._start()
+        return subscription
+
+    def add_listener(self, callback):
+        super().add_listener(callback)
+        self._start()
+
+    def _poll(self):
+        last = None
+        while True:
+            try:
+                if last is None:
+                    last = Modification.latest_sequence()
+                elif len(self) or self.listeners:
+                    rows = list(Modification.objects.filter(id__gt=last).order_by('id')
+                                .values_list('id', 'profile_id', 'type_objet', 'objet_id')[:500])
+                    if rows:
+                        last = rows[-1][0]
+                        self.publish([Event(profile_id, type_objet, objet_id, version)
+                                      for version, profile_id, type_objet, objet_id in rows])
+            except DatabaseError:
+                logger.exception("Lecture du journal des modifications impossible")
+            finally:
+                close_old_connections()
+            time.sleep(self.interval)
+
+    def notify(self, events):
+        """Les abonnés sont prévenus par le journal ; les fonctions du processus, tout de suite"""
+        with self.lock:
+            listeners = list(self.listeners)
+        self._call_listeners(listeners, events)
+
+
+BROKERS = {
+    'local': Broker,
+    'database': DatabaseBroker,
+}
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """Broker partagé par le processus (créé à la première utilisation)"""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = BROKERS[settings.EVENTS_BROKER]()
+    return _broker
+
+
+def record_changes(tenant_id, type_objet, ids):
+    """Journalise des modifications d'un portfolio et les notifie une fois la transaction validée"""
+    modifications = Modification.record(tenant_id, type_objet, ids)
+    events = [Event(tenant_id, type_objet, m.objet_id, m.pk) for m in modifications]
+    if events:
+        transaction.on_commit(partial(get_broker().notify, events))
+    return modifications
+
+
+def format_event(event):
+    """Notification au format Server-Sent Events"""
+    data = {'type_objet': event.type_objet, 'objet_id': event.objet_id, 'version': event.version}
+    return 'id: %s\nevent: modification\ndata: %s\n\n' % (
+        event.version, json.dumps(data, separators=(',', ':')))
+
+
+async def event_stream(broker, tenant_id=None, resync=False):
+    """Flux SSE d'une connexion, fermé après EVENTS_MAX_DURATION (le client se reconnecte)"""
+    subscription = broker.subscribe(tenant_id)
+    fin = time.monotonic() + settings.EVENTS_MAX_DURATION
+    try:
+        yield 'retry: 5000\n\n'
+        if resync:
+            # Reconnexion : des notifications ont pu être manquées
+            yield 'event: resync\ndata: {}\n\n'
+        while time.monotonic() < fin:
+            events, overflow = await subscription.get(settings.EVENTS_HEARTBEAT)
+            if overflow:
+                yield 'event: resync\ndata: {}\n\n'
+            elif events:
+                yield ''.join(format_event(event) for event in events)
+            else:
+                yield ': ping\n\n'
+    finally:
+        broker.unsubscribe(subscription)
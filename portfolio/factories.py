@@ -0,0 +1,80 @@
+# portfolio/factories.py
+# Fabriques d'objets pour les tests : valeurs par défaut valides, surchargées
+# par mots-clés. Les images sont générées en mémoire (une seule fois par
+# taille et format) ; avec le stockage en mémoire des tests, aucun fichier
+# n'est écrit sur disque.
+
+import io
+import itertools
+from datetime import date
+from functools import lru_cache
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+
+from .models import Competence, Contact, Experience, Profile, Projet
+
+# Numéros uniques (slugs, titres) ; propres à chaque processus de test
+_sequence = itertools.count(1)
+
+
+@lru_cache(maxsize=None)
+def _image_bytes(size, color, fmt):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, fmt)
+    return buffer.getvalue()
+
+
+def image_file(name='image.png', size=(8, 8), color='#007bff'):
+    """Image valide construite en mémoire, au format indiqué par l'extension (PNG ou JPEG)"""
+    fmt = 'JPEG' if name.lower().endswith(('.jpg', '.jpeg')) else 'PNG'
+    return SimpleUploadedFile(name, _image_bytes(size, color, fmt), content_type=f'image/{fmt.lower()}')
+
+
+def make_profile(**values):
+    n = next(_sequence)
+    defaults = {
+        'nom': f'Portfolio {n}', 'slug': f'portfolio-{n}', 'email': f'portfolio{n}@example.com',
+        'bio': 'Bio', 'description_longue': 'Description',
+    }
+    return Profile.objects.create(**{**defaults, **values})
+
+
+def make_competence(**values):
+    defaults = {'nom': f'Compétence {next(_sequence)}', 'categorie': 'backend'}
+    return Competence.objects.create(**{**defaults, **values})
+
+
+def make_projet(technologies=(), images=1, **values):
+    """Projet avec `images` images (1 à 3) et les compétences `technologies`"""
+    n = next(_sequence)
+    defaults = {
+        'titre': f'Projet {n}', 'description_courte': 'Court', 'description_longue': 'Long',
+        'date_debut': date(2024, 1, 1),
+    }
+    for field in ('image_principale', 'image_2', 'image_3')[:images]:
+        defaults[field] = image_file(f'projet-{n}-{field}.png')
+    projet = Projet.objects.create(**{**defaults, **values})
+    if technologies:
+        projet.technologies.set(technologies)
+    return projet
+
+
+def make_experience(competences=(), **values):
+    defaults = {
+        'type_experience': 'travail', 'titre': f'Poste {next(_sequence)}', 'entreprise': 'Entreprise',
+        'date_debut': date(2023, 1, 1), 'description': 'Description',
+    }
+    experience = Experience.objects.create(**{**defaults, **values})
+    if competences:
+        experience.competences_acquises.set(competences)
+    return experience
+
+
+def make_contact(**values):
+    n = next(_sequence)
+    defaults = {
+        'nom': f'Visiteur {n}', 'email': f'visiteur{n}@example.com',
+        'sujet': 'Sujet', 'message': 'Message de test',
+    }
+    return Contact.objects.create(**{**defaults, **values})
@@ -0,0 +1,404 @@
+# portfolio/loadtest.py
+# Tests de charge en boucle ouverte : les requêtes partent à des instants tirés
+# d'un processus de Poisson (débit cible), indépendamment des réponses. La
+# latence est mesurée depuis l'instant prévu (attente comprise), ce qui évite
+# de masquer la saturation (« coordinated omission »). Cibles : application
+# WSGI ou ASGI dans le processus, ou serveur local par HTTP. Latences gardées
+# dans des histogrammes à précision relative bornée (type HDR), et rapports
+# JSON comparables d'un commit à l'autre.
+
+import asyncio
+import http.client
+import itertools
+import json
+import queue
+import random
+import subprocess
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import connections
+from django.test import AsyncClient, Client
+from django.urls import reverse
+
+# Mélange par défaut (poids relatifs), proche du trafic d'un portfolio
+DEFAULT_MIX = {'index': 10, 'portfolio': 70, 'vues': 15, 'contact': 5}
+
+
+class Histogram:
+    """Histogramme de valeurs entières (µs) à précision relative bornée, à la manière de HdrHistogram
+
+    Chaque valeur est rangée avec ses `bits` bits de poids fort : erreur relative
+    inférieure à 2^(1-bits) (moins de 1 % avec 7 bits), mémoire logarithmique.
+    """
+
+    def __init__(self, bits=7):
+        self.bits = bits
+        # (décalage, mantisse) -> nombre ; l'ordre des clés est celui des valeurs
+        self.counts = Counter()
+        self.total = 0
+        self.max = 0
+
+    def record(self, value):
+        value = max(int(value), 0)
+        shift = max(value.bit_length() - self.bits, 0)
+        self.counts[shift, value >> shift] += 1
+        self.total += 1
+        self.max = max(self.max, value)
+
+    def merge(self, other):
+        self.counts.update(other.counts)
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, p):
+        """Valeur au centile `p` (milieu de la classe), 0 si l'histogramme est vide"""
+        if not self.total:
+            return 0
+        rank = max(1, round(self.total * p / 100))
+        seen = 0
+        for (shift, mantissa), count in sorted(self.counts.items()):
+            seen += count
+            if seen >= rank:
+                return min((mantissa << shift) + ((1 << shift) >> 1), self.max)
+        return self.max
+
+    def summary(self):
+        """Centiles usuels, en millisecondes"""
+        points = {'p50': 50, 'p90': 90, 'p99': 99, 'p99.9': 99.9}
+        values = {name: round(self.percentile(p) / 1000, 3) for name, p in points.items()}
+        values.update(count=self.total, max=round(self.max / 1000, 3))
+        return values
+
+    def to_dict(self):
+        return {'bits': self.bits, 'max': self.max,
+                'counts': [[shift, mantissa, count] for (shift, mantissa), count in sorted(self.counts.items())]}
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls(data['bits'])
+        for shift, mantissa, count in data['counts']:
+            histogram.counts[shift, mantissa] = count
+            histogram.total += count
+        histogram.max = data['max']
+        return histogram
+
+
+class Operations:
+    """Requêtes du mélange : nom -> (méthode, chemin, corps JSON)"""
+
+    def __init__(self, projet_ids=(), seed=None):
+        self.projet_ids = list(projet_ids)
+        self.random = random.Random(seed)
+        self.sequence = itertools.count(1)
+
+    def build(self, name):
+        if name == 'index':
+            return 'GET', reverse('index'), None
+        if name == 'portfolio':
+            return 'GET', reverse('api_portfolio_data'), None
+        if name == 'vues':
+            if not self.projet_ids:
+                return 'GET', reverse('api_portfolio_data'), None
+            return 'POST', reverse('increment_project_views', args=[self.random.choice(self.projet_ids)]), None
+        if name == 'contact':
+            # Messages distincts : le filtre anti-doublons ne court-circuite pas l'écriture
+            n = next(self.sequence)
+            return 'POST', reverse('api_contact'), {
+                'nom': f'Charge {n}', 'email': f'charge{n}@example.com', 'sujet': 'Test de charge',
+                'message': f'Message de test de charge numéro {n}, merci de ne pas répondre.',
+            }
+        raise ValueError(f"Opération inconnue : {name}")
+
+
+class Replay:
+    """Requêtes enregistrées (JSONL : method, path, body), rejouées dans l'ordre et en boucle"""
+
+    def __init__(self, path):
+        with open(path, encoding='utf-8') as source:
+            self.records = [json.loads(line) for line in source if line.strip()]
+        if not self.records:
+            raise ValueError(f"Aucune requête dans {path}")
+        self.cursor = itertools.cycle(self.records)
+
+    def next(self):
+        record = next(self.cursor)
+        return record.get('name') or record['path'], (record.get('method', 'GET'), record['path'], record.get('body'))
+
+
+class WSGITarget:
+    """Application Django appelée dans le processus (client de test, un par thread)"""
+
+    def __init__(self, host='localhost'):
+        self.host = host
+        self.local = threading.local()
+
+    def request(self, method, path, body=None):
+        client = getattr(self.local, 'client', None)
+        if client is None:
+            client = self.local.client = Client(HTTP_HOST=self.host, raise_request_exception=False)
+        data = json.dumps(body) if body is not None else ''
+        return client.generic(method, path, data, content_type='application/json').status_code
+
+    def close(self):
+        connections.close_all()
+
+
+class ASGITarget:
+    """Application ASGI dans le processus (client asynchrone, voir ASGILoadTest)"""
+
+    def __init__(self, host='localhost'):
+        self.host = host
+
+
+class HTTPTarget:
+    """Serveur HTTP local (connexion persistante par thread)"""
+
+    def __init__(self, base_url, timeout=30):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.timeout = timeout
+        self.local = threading.local()
+
+    def request(self, method, path, body=None):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = self.local.connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        payload = json.dumps(body).encode() if body is not None else None
+        headers = {'Content-Type': 'application/json'} if payload is not None else {}
+        try:
+            connection.request(method, path, payload, headers)
+            response = connection.getresponse()
+            response.read()
+            return response.status
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            self.local.connection = None
+            return 0
+
+    def close(self):
+        pass
+
+
+def load_projet_ids(target):
+    """Projets publiés, lus dans l'API (cible quelconque)"""
+    if isinstance(target, HTTPTarget):
+        connection = http.client.HTTPConnection(target.host, target.port, timeout=target.timeout)
+        connection.request('GET', reverse('api_portfolio_data'))
+        data = json.loads(connection.getresponse().read())
+        connection.close()
+    else:
+        client = Client(HTTP_HOST=target.host)
+        data = client.get(reverse('api_portfolio_data')).json()
+    return [projet['id'] for projet in data.get('projets', [])]
+
+
+class StepResult:
+    """Mesures d'un palier (débit offert constant)"""
+
+    def __init__(self, rate, duration):
+        self.rate = rate
+        self.duration = duration
+        self.lock = threading.Lock()
+        # Latence depuis l'instant prévu, par opération (et toutes confondues)
+        self.latency = {}
+        # Temps de traitement seul, sans l'attente
+        self.service = Histogram()
+        self.statuses = Counter()
+        self.sent = 0
+        self.elapsed = 0.0
+
+    def record(self, name, latency_us, service_us, status):
+        with self.lock:
+            self.latency.setdefault(name, Histogram()).record(latency_us)
+            self.service.record(service_us)
+            self.statuses[status] += 1
+
+    @property
+    def completed(self):
+        return sum(self.statuses.values())
+
+    @property
+    def errors(self):
+        return sum(count for status, count in self.statuses.items() if not 200 <= status < 400)
+
+    def overall(self):
+        histogram = Histogram()
+        for part in self.latency.values():
+            histogram.merge(part)
+        return histogram
+
+    def to_dict(self):
+        return {
+            'rate': self.rate,
+            'duration': self.duration,
+            'sent': self.sent,
+            'completed': self.completed,
+            'errors': self.errors,
+            'statuses': {str(status): count for status, count in sorted(self.statuses.items())},
+            'throughput': round(self.completed / self.elapsed, 2) if self.elapsed else 0,
+            'latency': self.overall().summary(),
+            'service': self.service.summary(),
+            'operations': {name: {**histogram.summary(), 'histogram': histogram.to_dict()}
+                           for name, histogram in sorted(self.latency.items())},
+        }
+
+
+class LoadTest:
+    """Boucle ouverte : un ordonnanceur émet les requêtes, `concurrency` exécutants les traitent"""
+
+    def __init__(self, target, mix=None, replay=None, concurrency=8, seed=None, projet_ids=()):
+        self.target = target
+        self.mix = mix or DEFAULT_MIX
+        self.replay = replay
+        self.concurrency = concurrency
+        self.random = random.Random(seed)
+        self.operations = Operations(projet_ids, seed)
+
+    def next_request(self):
+        if self.replay is not None:
+            return self.replay.next()
+        name = self.random.choices(list(self.mix), weights=list(self.mix.values()))[0]
+        return name, self.operations.build(name)
+
+    def schedule(self, rate, duration):
+        """Instants d'émission (secondes depuis le début) : arrivées de Poisson au débit `rate`"""
+        moment = 0.0
+        while True:
+            moment += self.random.expovariate(rate)
+            if moment >= duration:
+                return
+            yield moment
+
+    def run_step(self, rate, duration, drain_timeout=30):
+        result = StepResult(rate, duration)
+        pending = queue.Queue()
+
+        def work():
+            try:
+                while True:
+                    item = pending.get()
+                    if item is None:
+                        return
+                    name, request, planned = item
+                    started = time.perf_counter()
+                    status = self.target.request(*request)
+                    done = time.perf_counter()
+                    result.record(name, (done - planned) * 1e6, (done - started) * 1e6, status)
+            finally:
+                self.target.close()
+
+        workers = [threading.Thread(target=work, daemon=True) for _ in range(self.concurrency)]
+        for worker in workers:
+            worker.start()
+        start = time.perf_counter()
+        for moment in self.schedule(rate, duration):
+            delay = start + moment - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            name, request = self.next_request()
+            pending.put((name, request, start + moment))
+            result.sent += 1
+        for _ in workers:
+            pending.put(None)
+        deadline = time.perf_counter() + drain_timeout
+        for worker in workers:
+            worker.join(max(deadline - time.perf_counter(), 0))
+        result.elapsed = time.perf_counter() - start
+        return result
+
+
+class ASGILoadTest(LoadTest):
+    """Boucle ouverte sur l'application ASGI dans le processus (une tâche par requête)"""
+
+    def run_step(self, rate, duration, drain_timeout=30):
+        return asyncio.run(self._run_step(rate, duration, drain_timeout))
+
+    async def _run_step(self, rate, duration, drain_timeout):
+        result = StepResult(rate, duration)
+        client = AsyncClient(HTTP_HOST=self.target.host, raise_request_exception=False)
+        limit = asyncio.Semaphore(self.concurrency)
+        loop = asyncio.get_running_loop()
+
+        async def send(name, method, path, body, planned):
+            async with limit:
+                started = loop.time()
+                data = json.dumps(body) if body is not None else ''
+                response = await client.generic(method, path, data, content_type='application/json')
+                done = loop.time()
+            result.record(name, (done - planned) * 1e6, (done - started) * 1e6, response.status_code)
+
+        tasks = []
+        start = loop.time()
+        for moment in self.schedule(rate, duration):
+            delay = start + moment - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            name, request = self.next_request()
+            tasks.append(asyncio.ensure_future(send(name, *request, start + moment)))
+            result.sent += 1
+        if tasks:
+            await asyncio.wait(tasks, timeout=drain_timeout)
+        result.elapsed = loop.time() - start
+        return result
+
+
+def saturated(step, slo_ms):
+    """Palier saturé : débit atteint inférieur à 90 % du débit offert, ou p99 au-delà de l'objectif"""
+    data = step.to_dict() if isinstance(step, StepResult) else step
+    if data['throughput'] < 0.9 * data['rate']:
+        return True
+    return slo_ms is not None and data['latency']['p99'] > slo_ms
+
+
+def current_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+                               capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def deployment_profile(target_name):
+    """Paramètres qui déterminent les performances, pour comparer des rapports comparables"""
+    return {
+        'target': target_name,
+        'database': settings.DATABASES['default']['ENGINE'].rsplit('.', 1)[-1],
+        'replicas': len(settings.DATABASES) - 1,
+        'cache': settings.CACHES['default']['BACKEND'].rsplit('.', 1)[-1],
+        'local_cache_bytes': settings.LOCAL_CACHE_MAX_BYTES,
+        'debug': settings.DEBUG,
+    }
+
+
+def build_report(steps, target_name, mix, concurrency, slo_ms):
+    data = [step.to_dict() for step in steps]
+    saturation = next((step['rate'] for step in data if saturated(step, slo_ms)), None)
+    return {
+        'version': 1,
+        'commit': current_commit(),
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'profile': deployment_profile(target_name),
+        'mix': mix,
+        'concurrency': concurrency,
+        'slo_ms': slo_ms,
+        'steps': data,
+        'saturation_rate': saturation,
+    }
+
+
+def compare_reports(old, new):
+    """Écarts par palier commun : (débit, débit atteint, p50, p99 anciens et nouveaux)"""
+    old_steps = {step['rate']: step for step in old['steps']}
+    rows = []
+    for step in new['steps']:
+        before = old_steps.get(step['rate'])
+        if before is not None:
+            rows.append((step['rate'],
+                         before['throughput'], step['throughput'],
+                         before['latency']['p50'], step['latency']['p50'],
+                         before['latency']['p99'], step['latency']['p99']))
+    return rows
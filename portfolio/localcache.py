@@ -0,0 +1,168 @@
+# portfolio/localcache.py
+# Cache à deux niveaux pour les clés très demandées : un LRU en mémoire du
+# processus (borné en octets, durée de vie courte) devant le cache partagé de
+# Django. Chaque entrée garde la version du contenu dont elle est issue : à
+# expiration, seule cette version (un entier) est relue dans le cache partagé.
+# Invalidation : immédiate dans le processus qui incrémente la version, et par
+# le broker des notifications (events.py) dans les autres processus.
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .cache import content_version_changed, content_version_key, get_version
+from .events import get_broker
+
+
+class Entry:
+    """Entrée du cache local"""
+
+    __slots__ = ('value', 'size', 'version', 'tenant_id', 'expires')
+
+    def __init__(self, value, version, tenant_id, expires):
+        self.value = value
+        self.size = len(value)
+        self.version = version
+        self.tenant_id = tenant_id
+        self.expires = expires
+
+
+class LocalLRUCache:
+    """LRU du processus, borné en nombre d'entrées et en octets, avec durée de vie
+
+    Les valeurs sont des octets (réponses déjà encodées) : leur taille est exacte.
+    """
+
+    COUNTERS = ('hits', 'revalidations', 'misses', 'evictions', 'invalidations')
+
+    def __init__(self, max_bytes=None, max_entries=None, ttl=None):
+        self.max_bytes = settings.LOCAL_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self.max_entries = settings.LOCAL_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        self.ttl = settings.LOCAL_CACHE_TTL if ttl is None else ttl
+        self.lock = threading.Lock()
+        # clé -> entrée, de la moins à la plus récemment utilisée
+        self.entries = OrderedDict()
+        self.size = 0
+        self.counters = dict.fromkeys(self.COUNTERS, 0)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _remove(self, key):
+        entry = self.entries.pop(key)
+        self.size -= entry.size
+
+    def get(self, key, revalidate, now=None):
+        """Valeur de `key` ou None ; une entrée expirée est prolongée si `revalidate(version)` est vrai"""
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry.expires > now:
+                self.entries.move_to_end(key)
+                self.counters['hits'] += 1
+                return entry.value
+        # Lecture de la version hors du verrou (accès au cache partagé)
+        if entry is not None and revalidate(entry.version):
+            with self.lock:
+                if self.entries.get(key) is entry:
+                    entry.expires = now + self.ttl
+                    self.entries.move_to_end(key)
+                self.counters['revalidations'] += 1
+            return entry.value
+        with self.lock:
+            if entry is not None and self.entries.get(key) is entry:
+                self._remove(key)
+            self.counters['misses'] += 1
+        return None
+
+    def set(self, key, value, version, tenant_id=None, now=None):
+        """Enregistre `value` ; les entrées les moins récemment utilisées sont évincées"""
+        if len(value) > self.max_bytes or self.max_entries <= 0:
+            return
+        now = time.monotonic() if now is None else now
+        entry = Entry(value, version, tenant_id, now + self.ttl)
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = entry
+            self.size += entry.size
+            while self.size > self.max_bytes or len(self.entries) > self.max_entries:
+                oldest = next(iter(self.entries))
+                self._remove(oldest)
+                self.counters['evictions'] += 1
+
+    def invalidate(self, tenant_ids):
+        """Supprime les entrées des portfolios donnés"""
+        with self.lock:
+            keys = [key for key, entry in self.entries.items() if entry.tenant_id in tenant_ids]
+            for key in keys:
+                self._remove(key)
+            self.counters['invalidations'] += len(keys)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def stats(self):
+        """Compteurs d'utilisation, pour le réglage des limites"""
+        with self.lock:
+            stats = dict(self.counters)
+            stats.update(entries=len(self.entries), bytes=self.size,
+                         max_entries=self.max_entries, max_bytes=self.max_bytes, ttl=self.ttl)
+        lookups = stats['hits'] + stats['revalidations'] + stats['misses']
+        stats['hit_ratio'] = round((stats['hits'] + stats['revalidations']) / lookups, 4) if lookups else None
+        return stats
+
+
+class TwoTierCache:
+    """Cache local du processus, puis cache partagé, puis calcul de la valeur"""
+
+    def __init__(self, local=None, timeout=None):
+        self.local = local or LocalLRUCache()
+        self.timeout = settings.SHARED_CACHE_TIMEOUT if timeout is None else timeout
+
+    def get_or_set(self, key, tenant_id, build):
+        """Octets de `key` pour un portfolio ; retourne (valeur, 'local' | 'shared' | 'miss')"""
+        version_key = content_version_key(tenant_id)
+        value = self.local.get(key, lambda version: get_version(version_key) == version)
+        if value is not None:
+            return value, 'local'
+        version = get_version(version_key)
+        shared_key = '%s:%s' % (key, version)
+        value = cache.get(shared_key)
+        source = 'shared'
+        if value is None:
+            value = build()
+            cache.set(shared_key, value, self.timeout)
+            source = 'miss'
+        self.local.set(key, value, version, tenant_id)
+        return value, source
+
+    def content_changed(self, sender, tenant_id=None, **kwargs):
+        """Version du contenu incrémentée dans ce processus"""
+        self.local.invalidate({tenant_id})
+
+    def events_received(self, events):
+        """Modifications notifiées par le broker (éventuellement d'un autre processus)"""
+        self.local.invalidate({event.profile_id for event in events})
+
+
+_hot_cache = None
+_hot_cache_lock = threading.Lock()
+
+
+def get_hot_cache():
+    """Cache à deux niveaux partagé par le processus (créé à la première utilisation)"""
+    global _hot_cache
+    if _hot_cache is None:
+        with _hot_cache_lock:
+            if _hot_cache is None:
+                hot_cache = TwoTierCache()
+                content_version_changed.connect(hot_cache.content_changed, weak=False)
+                get_broker().add_listener(hot_cache.events_received)
+                _hot_cache = hot_cache
+    return _hot_cache
@@ -0,0 +1,43 @@
+# portfolio/management/commands/archive_contacts.py
+# Commande d'archivage des anciens messages de contact (à planifier, ex: cron quotidien)
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from portfolio.archive import archive_contacts, iter_jsonl
+from portfolio.models import ContactArchive
+
+
+class Command(BaseCommand):
+    help = "Déplace les messages lus et répondus anciens vers l'archive"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.CONTACT_ARCHIVE_DAYS,
+            help="Âge minimal des messages à archiver, en jours (défaut : %(default)s)",
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=settings.ADMIN_BULK_CHUNK_SIZE,
+            help="Nombre de messages déplacés par transaction (défaut : %(default)s)",
+        )
+        parser.add_argument(
+            '--export', metavar='FICHIER',
+            help="Exporte ensuite toute l'archive en JSON Lines (compressé si le nom finit par .gz)",
+        )
+
+    def handle(self, *args, **options):
+        def progress(moved):
+            if options['verbosity'] > 1:
+                self.stdout.write(f"  {moved} message(s) archivé(s)...")
+
+        moved = archive_contacts(options['days'], options['chunk_size'], progress)
+        self.stdout.write(self.style.SUCCESS(f"{moved} message(s) archivé(s)."))
+
+        if options['export']:
+            path = options['export']
+            compress = path.endswith('.gz')
+            mode, encoding = ('wb', None) if compress else ('w', 'utf-8')
+            with open(path, mode, encoding=encoding) as f:
+                for chunk in iter_jsonl(ContactArchive.objects.all(), compress=compress):
+                    f.write(chunk)
+            self.stdout.write(self.style.SUCCESS(f"Archive exportée dans {path}."))
@@ -0,0 +1,50 @@
+# portfolio/management/commands/bench_formats.py
+# Mesure de la taille et du temps d'encodage des formats de l'API portfolio
+
+import gzip
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+
+from portfolio.encoding import ENCODERS
+from portfolio.payload import build_portfolio_data
+
+
+def stdlib_json(data):
+    """Encodage de référence (celui de JsonResponse)"""
+    return json.dumps(data, cls=DjangoJSONEncoder).encode('utf-8')
+
+
+class Command(BaseCommand):
+    help = "Compare les formats de l'API portfolio : octets (bruts / gzip) et temps d'encodage"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations', type=int, default=200,
+            help="Nombre d'encodages mesurés par format (défaut : %(default)s)",
+        )
+        parser.add_argument(
+            '--portfolio', type=int, default=None,
+            help="Id du profil dont les données sont encodées (défaut : objets sans profil)",
+        )
+
+    def handle(self, *args, **options):
+        encoders = {'json (stdlib)': stdlib_json}
+        encoders.update({fmt: encode for fmt, (encode, _) in ENCODERS.items()})
+        self.stdout.write(f"{'format':<28}{'octets':>10}{'gzip':>10}{'encodage (µs)':>16}")
+        for forme, normalized in (('imbriquee', False), ('normalisee', True)):
+            data = build_portfolio_data(options['portfolio'], normalized=normalized)
+            for nom, encode in encoders.items():
+                payload = encode(data)
+                durees = []
+                for _ in range(options['iterations']):
+                    debut = time.perf_counter()
+                    encode(data)
+                    durees.append(time.perf_counter() - debut)
+                self.stdout.write(
+                    f"{nom + ' / ' + forme:<28}{len(payload):>10}"
+                    f"{len(gzip.compress(payload)):>10}{statistics.median(durees) * 1e6:>16.1f}"
+                )
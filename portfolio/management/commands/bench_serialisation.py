@@ -0,0 +1,151 @@
+# portfolio/management/commands/bench_serialisation.py
+# Compare la sérialisation des projets et expériences : instances de modèles
+# (prefetch_related), sérialiseurs DRF et lignes légères (records.py). Mesure
+# la durée et le pic de mémoire résidente (Linux) ; avec --allocations, les
+# allocations Python (tracemalloc). Avec --lignes, les données sont générées
+# dans une transaction annulée.
+
+import gc
+import resource
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from portfolio.models import Competence, Experience, Profile, Projet
+from portfolio.payload import (experience_records, projet_records, published_experiences, published_projets,
+                               serialize_experience, serialize_experience_row, serialize_projet,
+                               serialize_projet_row)
+from portfolio.serializers import ExperienceSerializer, ProjetSerializer
+
+BATCH_SIZE = 2000
+
+
+def by_instances(tenant_id):
+    return ([serialize_projet(p) for p in published_projets(tenant_id)],
+            [serialize_experience(e) for e in published_experiences(tenant_id)])
+
+
+def by_drf(tenant_id):
+    return (ProjetSerializer(published_projets(tenant_id), many=True).data,
+            ExperienceSerializer(published_experiences(tenant_id), many=True).data)
+
+
+def by_records(tenant_id):
+    return ([serialize_projet_row(*record) for record in projet_records(published_projets(tenant_id))],
+            [serialize_experience_row(*record) for record in experience_records(published_experiences(tenant_id))])
+
+
+# Les lignes d'abord : la mémoire libérée par un chemin reste allouée au processus et masque
+# le pic des chemins suivants (un seul chemin par exécution pour une mesure isolée)
+PATHS = {'lignes': by_records, 'instances': by_instances, 'drf': by_drf}
+
+
+def reset_peak_rss():
+    """Remet à zéro le pic de mémoire résidente du processus (Linux) ; False si impossible"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as clear_refs:
+            clear_refs.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_kib():
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def generate(rows, skills_per_row=3):
+    """Portfolio de `rows` projets et `rows` expériences (insertion en masse, sans signaux)"""
+    profile = Profile.objects.create(nom='Benchmark', slug='benchmark-serialisation', email='bench@example.com',
+                                     bio='Bio', description_longue='Description')
+    skills = Competence.objects.bulk_create(
+        Competence(profile=profile, nom=f'Compétence {i}', categorie='backend', ordre=i) for i in range(50))
+    debut = date(2020, 1, 1)
+    for model, relation, values in (
+        (Projet, 'technologies', lambda i: {
+            'titre': f'Projet {i}', 'description_courte': 'Description courte ' * 3,
+            'description_longue': 'Description longue du projet. ' * 20, 'image_principale': f'projects/{i}.jpg',
+            'date_debut': debut + timedelta(days=i % 1500), 'featured': i % 50 == 0, 'ordre': i % 100,
+        }),
+        (Experience, 'competences_acquises', lambda i: {
+            'type_experience': 'travail', 'titre': f'Poste {i}', 'entreprise': 'Entreprise',
+            'date_debut': debut + timedelta(days=i % 1500), 'description': "Description de l'expérience. " * 10,
+        }),
+    ):
+        through = getattr(model, relation).through
+        source, target = (model._meta.get_field(relation).m2m_field_name() + '_id',
+                          model._meta.get_field(relation).m2m_reverse_field_name() + '_id')
+        for start in range(0, rows, BATCH_SIZE):
+            created = model.objects.bulk_create(model(profile=profile, **values(i))
+                                                for i in range(start, min(start + BATCH_SIZE, rows)))
+            through.objects.bulk_create(
+                through(**{source: obj.pk, target: skills[(obj.pk + k) % len(skills)].pk})
+                for obj in created for k in range(skills_per_row))
+    return profile.pk
+
+
+class Command(BaseCommand):
+    help = "Compare la mémoire et la durée de sérialisation : instances, DRF, lignes légères"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lignes', type=int, default=None,
+                            help="Génère N projets et N expériences (transaction annulée à la fin)")
+        parser.add_argument('--portfolio', type=int, default=None,
+                            help="Id du profil sérialisé, sans --lignes (défaut : objets sans profil)")
+        parser.add_argument('--chemins', default=','.join(PATHS),
+                            help="Chemins mesurés (défaut : %(default)s)")
+        parser.add_argument('--allocations', action='store_true',
+                            help="Seconde passe sous tracemalloc (pic alloué, blocs vivants ; beaucoup plus lente)")
+
+    def handle(self, *args, **options):
+        paths = [name.strip() for name in options['chemins'].split(',')]
+        unknown = [name for name in paths if name not in PATHS]
+        if unknown:
+            raise CommandError(f"Chemin(s) inconnu(s) : {', '.join(unknown)}")
+        with transaction.atomic():
+            tenant_id = generate(options['lignes']) if options['lignes'] else options['portfolio']
+            header = f"{'chemin':<12}{'objets':>9}{'durée (s)':>11}{'pic RSS (Mio)':>15}{'gc gén. 0':>11}"
+            if options['allocations']:
+                header += f"{'pic alloué (Mio)':>18}{'blocs vivants':>15}"
+            self.stdout.write(header)
+            for name in paths:
+                self.stdout.write(self.measure(name, PATHS[name], tenant_id, options['allocations']))
+            transaction.set_rollback(True)
+
+    def measure(self, name, path, tenant_id, allocations=False):
+        # Durée et pic de mémoire résidente, sans traçage
+        gc.collect()
+        rss_reset = reset_peak_rss()
+        rss_before = peak_rss_kib()
+        collections = gc.get_stats()[0]['collections']
+        start = time.perf_counter()
+        result = path(tenant_id)
+        duration = time.perf_counter() - start
+        collections = gc.get_stats()[0]['collections'] - collections
+        rss = (peak_rss_kib() - rss_before) / 1024 if rss_reset else None
+        count = sum(len(part) for part in result)
+        del result
+        rss_text = f'{rss:>15.1f}' if rss is not None else f"{'n/d':>15}"
+        line = f'{name:<12}{count:>9}{duration:>11.2f}{rss_text}{collections:>11}'
+        if not allocations:
+            return line
+
+        # Allocations Python (tracemalloc) : pic pendant la sérialisation, blocs retenus par le résultat
+        gc.collect()
+        tracemalloc.start()
+        result = path(tenant_id)
+        _, peak = tracemalloc.get_traced_memory()
+        blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics('filename'))
+        tracemalloc.stop()
+        del result
+        return f'{line}{peak / 2 ** 20:>18.1f}{blocks:>15}'
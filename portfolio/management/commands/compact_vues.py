@@ -0,0 +1,27 @@
+# portfolio/management/commands/compact_vues.py
+# Compaction du journal des vues en agrégats horaires et journaliers (à planifier, ex: cron horaire)
+
+from django.core.management.base import BaseCommand
+
+from portfolio.analytics import compact_views, refresh_project_views
+
+
+class Command(BaseCommand):
+    help = "Agrège le journal des vues de projets et met à jour Projet.vues"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--garder-heures', type=int, default=90,
+            help="Durée de conservation des agrégats horaires, en jours (défaut : %(default)s)",
+        )
+        parser.add_argument(
+            '--recalculer', action='store_true',
+            help="Recalcule Projet.vues pour tous les projets à partir des agrégats",
+        )
+
+    def handle(self, *args, **options):
+        compacted = compact_views(keep_hours_days=options['garder_heures'])
+        self.stdout.write(self.style.SUCCESS(f"{compacted} vue(s) compactée(s)."))
+        if options['recalculer']:
+            updated = refresh_project_views()
+            self.stdout.write(self.style.SUCCESS(f"{updated} projet(s) recalculé(s)."))
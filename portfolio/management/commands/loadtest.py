@@ -0,0 +1,103 @@
+# portfolio/management/commands/loadtest.py
+# Test de charge en boucle ouverte (paliers de débit croissants) et rapport
+# JSON comparable d'un commit à l'autre ; voir portfolio/loadtest.py.
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from portfolio.loadtest import (ASGILoadTest, ASGITarget, DEFAULT_MIX, HTTPTarget, LoadTest, Replay, WSGITarget,
+                                build_report, compare_reports, load_projet_ids, saturated)
+
+
+def parse_mix(value):
+    """'portfolio=70,index=10' -> {'portfolio': 70, 'index': 10}"""
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        if name.strip() not in DEFAULT_MIX:
+            raise CommandError(f"Opération inconnue : {name} (parmi {', '.join(DEFAULT_MIX)})")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+class Command(BaseCommand):
+    help = "Test de charge en boucle ouverte de l'application (dans le processus ou par HTTP)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--cible', default='wsgi',
+            help="'wsgi' ou 'asgi' (application dans le processus), ou URL d'un serveur local "
+                 "(ex: http://127.0.0.1:8000) (défaut : %(default)s)",
+        )
+        parser.add_argument('--hote', default='localhost', help="En-tête Host (choix du portfolio)")
+        parser.add_argument(
+            '--melange', type=parse_mix, default=DEFAULT_MIX,
+            help="Poids des opérations index, portfolio, vues, contact (défaut : %s)"
+                 % ','.join(f'{name}={weight}' for name, weight in DEFAULT_MIX.items()),
+        )
+        parser.add_argument('--rejouer', help="Requêtes enregistrées à rejouer (JSONL : method, path, body)")
+        parser.add_argument(
+            '--debits', default='50,100,200,400',
+            help="Paliers de débit offert, en requêtes par seconde (défaut : %(default)s)",
+        )
+        parser.add_argument('--duree', type=float, default=10, help="Durée de chaque palier, en secondes")
+        parser.add_argument('--concurrence', type=int, default=16, help="Requêtes traitées en parallèle")
+        parser.add_argument('--slo-ms', type=float, default=None,
+                            help="Objectif de p99 (ms) au-delà duquel un palier est saturé")
+        parser.add_argument('--graine', type=int, default=None, help="Graine aléatoire (mélange reproductible)")
+        parser.add_argument('--rapport', help="Fichier JSON où écrire le rapport")
+        parser.add_argument('--comparer', help="Rapport précédent à comparer")
+        parser.add_argument('--continuer', action='store_true',
+                            help="Poursuit les paliers après le premier palier saturé")
+
+    def handle(self, *args, **options):
+        cible = options['cible']
+        if cible == 'wsgi':
+            target, runner = WSGITarget(options['hote']), LoadTest
+        elif cible == 'asgi':
+            target, runner = ASGITarget(options['hote']), ASGILoadTest
+        elif cible.startswith('http://'):
+            target, runner = HTTPTarget(cible), LoadTest
+        else:
+            raise CommandError(f"Cible inconnue : {cible}")
+        try:
+            rates = [float(rate) for rate in options['debits'].split(',')]
+        except ValueError:
+            raise CommandError("Paliers de débit invalides")
+        replay = Replay(options['rejouer']) if options['rejouer'] else None
+
+        test = runner(target, mix=options['melange'], replay=replay, concurrency=options['concurrence'],
+                      seed=options['graine'], projet_ids=load_projet_ids(target))
+        self.stdout.write(f"{'débit':>8}{'atteint':>10}{'erreurs':>9}{'p50 ms':>10}{'p90 ms':>10}"
+                          f"{'p99 ms':>10}{'p99.9 ms':>10}{'max ms':>10}")
+        steps = []
+        for rate in rates:
+            step = test.run_step(rate, options['duree'])
+            steps.append(step)
+            data = step.to_dict()
+            latency = data['latency']
+            self.stdout.write(f"{rate:>8g}{data['throughput']:>10g}{data['errors']:>9}{latency['p50']:>10g}"
+                              f"{latency['p90']:>10g}{latency['p99']:>10g}{latency['p99.9']:>10g}"
+                              f"{latency['max']:>10g}")
+            if saturated(step, options['slo_ms']) and not options['continuer']:
+                break
+
+        report = build_report(steps, cible if not cible.startswith('http') else 'http',
+                              options['melange'] if replay is None else {'replay': options['rejouer']},
+                              options['concurrence'], options['slo_ms'])
+        if report['saturation_rate'] is not None:
+            self.stdout.write(self.style.WARNING(f"Saturation à {report['saturation_rate']:g} requêtes/s."))
+        else:
+            self.stdout.write(self.style.SUCCESS("Aucun palier saturé."))
+        if options['rapport']:
+            with open(options['rapport'], 'w', encoding='utf-8') as output:
+                json.dump(report, output, indent=1)
+        if options['comparer']:
+            with open(options['comparer'], encoding='utf-8') as source:
+                previous = json.load(source)
+            self.stdout.write(f"Comparaison avec {previous.get('commit') or options['comparer']} :")
+            for rate, *values in compare_reports(previous, report):
+                debit_avant, debit, p50_avant, p50, p99_avant, p99 = values
+                self.stdout.write(f"{rate:>8g}  atteint {debit_avant:g} -> {debit:g}  "
+                                  f"p50 {p50_avant:g} -> {p50:g} ms  p99 {p99_avant:g} -> {p99:g} ms")
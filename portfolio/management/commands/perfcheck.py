@@ -0,0 +1,55 @@
+# portfolio/management/commands/perfcheck.py
+# Bilan de santé des performances (voir portfolio/perfcheck.py) ; code de
+# sortie non nul en cas d'erreur (ou d'avertissement avec --strict), pour
+# bloquer un déploiement.
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from portfolio.perfcheck import AVERTISSEMENT, ERREUR, GRAVITE, build_report, run_checks
+
+
+class Command(BaseCommand):
+    help = "Vérifie les performances : requêtes, index, taille des réponses, rendu, configuration, médias"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hote', default='localhost', help="En-tête Host (choix du portfolio)")
+        parser.add_argument('--format', choices=('texte', 'json'), default='texte',
+                            help="Sortie lisible ou JSON (défaut : %(default)s)")
+        parser.add_argument('--rapport', help="Fichier JSON où écrire le rapport")
+        parser.add_argument('--max-octets', type=int, default=256 * 1024,
+                            help="Taille maximale d'une réponse (défaut : %(default)s)")
+        parser.add_argument('--min-lignes', type=int, default=1000,
+                            help="Parcours complet signalé à partir de ce nombre de lignes (défaut : %(default)s)")
+        parser.add_argument('--rendus', type=int, default=20, help="Rendus du template mesurés")
+        parser.add_argument('--max-rendu-ms', type=float, default=50,
+                            help="Durée médiane maximale du rendu du template (défaut : %(default)s)")
+        parser.add_argument('--max-media-octets', type=int, default=2 * 1024 * 1024,
+                            help="Taille maximale d'un fichier média (défaut : %(default)s)")
+        parser.add_argument('--strict', action='store_true', help="Échec aussi sur les avertissements")
+
+    def handle(self, *args, **options):
+        results = run_checks(
+            host=options['hote'], max_bytes=options['max_octets'], min_rows=options['min_lignes'],
+            render_iterations=options['rendus'], max_render_ms=options['max_rendu_ms'],
+            max_media_bytes=options['max_media_octets'],
+        )
+        report = build_report(results)
+        if options['format'] == 'json':
+            self.stdout.write(json.dumps(report, indent=1, ensure_ascii=False))
+        else:
+            styles = {AVERTISSEMENT: self.style.WARNING, ERREUR: self.style.ERROR}
+            for result in results:
+                line = f"[{result.statut:<13}] {result.categorie:<13} {result.nom:<36} {result.message}"
+                self.stdout.write(styles.get(result.statut, str)(line))
+        if options['rapport']:
+            with open(options['rapport'], 'w', encoding='utf-8') as output:
+                json.dump(report, output, indent=1, ensure_ascii=False)
+
+        seuil = GRAVITE[AVERTISSEMENT] if options['strict'] else GRAVITE[ERREUR]
+        echecs = sum(GRAVITE[result.statut] >= seuil for result in results)
+        if echecs:
+            raise CommandError(f"{echecs} vérification(s) en échec", returncode=1)
+        if options['format'] == 'texte':
+            self.stdout.write(self.style.SUCCESS("Aucune vérification en échec."))
@@ -0,0 +1,52 @@
+# portfolio/management/commands/portfolio_export.py
+# Export du contenu des portfolios (profils, compétences, projets, expériences,
+# messages) en JSON Lines ou en CSV, en flux, avec copie des fichiers média
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from portfolio.transfer import MediaCopier, export_media_to, iter_export, write_csv, write_jsonl
+
+
+class Command(BaseCommand):
+    help = "Exporte le contenu des portfolios (JSON Lines, ou un fichier CSV par type)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'destination',
+            help="Fichier JSON Lines (compressé si le nom finit par .gz) ou répertoire CSV",
+        )
+        parser.add_argument(
+            '--format', choices=['jsonl', 'csv'], default='jsonl',
+            help="Format d'export (défaut : %(default)s)",
+        )
+        parser.add_argument(
+            '--portfolio', type=int, default=None,
+            help="Id du profil à exporter (défaut : tous les portfolios)",
+        )
+        parser.add_argument(
+            '--media', metavar='REPERTOIRE',
+            help="Copie aussi les fichiers média référencés dans ce répertoire",
+        )
+        parser.add_argument(
+            '--workers', type=int, default=8,
+            help="Copies de fichiers média en parallèle (défaut : %(default)s)",
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=settings.ADMIN_BULK_CHUNK_SIZE,
+            help="Nombre d'objets lus par requête (défaut : %(default)s)",
+        )
+
+    def handle(self, *args, **options):
+        media = MediaCopier(export_media_to(options['media']), options['workers']) if options['media'] else None
+        records = iter_export(options['portfolio'], options['chunk_size'], media)
+        write = write_csv if options['format'] == 'csv' else write_jsonl
+        try:
+            count = write(options['destination'], records)
+        finally:
+            copied = media.close() if media is not None else 0
+        self.stdout.write(self.style.SUCCESS(f"{count} objet(s) exporté(s) dans {options['destination']}."))
+        if media is not None:
+            self.stdout.write(self.style.SUCCESS(f"{copied} fichier(s) média copié(s)."))
+            for error in media.errors:
+                self.stderr.write(error)
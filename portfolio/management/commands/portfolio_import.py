@@ -0,0 +1,55 @@
+# portfolio/management/commands/portfolio_import.py
+# Import en masse d'un export de portfolio_export (JSON Lines ou CSV) : objets
+# créés ou mis à jour par lots, dans une seule transaction
+
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError
+
+from portfolio.transfer import Importer, MediaCopier, import_media_from, read_csv, read_jsonl
+
+
+class Command(BaseCommand):
+    help = "Importe le contenu des portfolios depuis un export (JSON Lines ou répertoire CSV)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'source',
+            help="Fichier JSON Lines (.jsonl ou .jsonl.gz) ou répertoire de fichiers CSV",
+        )
+        parser.add_argument(
+            '--media', metavar='REPERTOIRE',
+            help="Copie dans le stockage les fichiers média référencés, depuis ce répertoire",
+        )
+        parser.add_argument(
+            '--workers', type=int, default=8,
+            help="Copies de fichiers média en parallèle (défaut : %(default)s)",
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.ADMIN_BULK_CHUNK_SIZE,
+            help="Nombre d'objets écrits par lot (défaut : %(default)s)",
+        )
+
+    def handle(self, *args, **options):
+        source = Path(options['source'])
+        if not source.exists():
+            raise CommandError(f"{source} introuvable.")
+        records = read_csv(source) if source.is_dir() else read_jsonl(source)
+        media = MediaCopier(import_media_from(options['media']), options['workers']) if options['media'] else None
+        try:
+            counts = Importer(options['batch_size'], media).run(records)
+        except (ValueError, KeyError, ValidationError, DatabaseError) as e:
+            raise CommandError(f"Import annulé : {e}")
+        finally:
+            copied = media.close() if media is not None else 0
+        for type_name, (created, updated) in counts.items():
+            if created or updated:
+                self.stdout.write(f"  {type_name} : {created} créé(s), {updated} mis à jour")
+        self.stdout.write(self.style.SUCCESS("Import terminé."))
+        if media is not None:
+            self.stdout.write(self.style.SUCCESS(f"{copied} fichier(s) média copié(s)."))
+            for error in media.errors:
+                self.stderr.write(error)
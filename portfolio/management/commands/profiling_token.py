@@ -0,0 +1,24 @@
+# portfolio/management/commands/profiling_token.py
+# Jeton signé à placer dans l'en-tête PROFILING_HEADER pour profiler une requête
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from portfolio.models import ProfilRequete
+from portfolio.profiling import make_token
+
+
+class Command(BaseCommand):
+    help = "Affiche un en-tête signé déclenchant le profilage des requêtes qui le portent"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--mode', choices=[mode for mode, _ in ProfilRequete.MODES], default=ProfilRequete.CPROFILE,
+            help="cProfile (fichier pstats) ou échantillonnage de pile (défaut : %(default)s)",
+        )
+
+    def handle(self, *args, **options):
+        if not settings.PROFILING_ENABLED:
+            self.stderr.write(self.style.WARNING("PROFILING_ENABLED est désactivé : le jeton sera ignoré."))
+        self.stdout.write(f"{settings.PROFILING_HEADER}: {make_token(options['mode'])}")
+        self.stdout.write(f"Valable {settings.PROFILING_TOKEN_MAX_AGE} secondes.")
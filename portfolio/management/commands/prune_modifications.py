@@ -0,0 +1,22 @@
+# portfolio/management/commands/prune_modifications.py
+# Purge du journal des modifications (à planifier, ex: cron quotidien)
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from portfolio.models import Modification
+
+
+class Command(BaseCommand):
+    help = "Supprime les anciennes entrées du journal des modifications"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--jours', type=int, default=settings.MODIFICATIONS_KEEP_DAYS,
+            help="Durée de conservation, en jours (défaut : %(default)s)",
+        )
+
+    def handle(self, *args, **options):
+        deleted = Modification.prune(options['jours'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{deleted} modification(s) supprimée(s). Les clients plus anciens rechargeront tout."))
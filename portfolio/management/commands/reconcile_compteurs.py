@@ -0,0 +1,27 @@
+# portfolio/management/commands/reconcile_compteurs.py
+# Réconciliation des compteurs de statistiques avec les tables (à planifier, ex: cron quotidien)
+
+from django.core.management.base import BaseCommand, CommandError
+
+from portfolio.counters import COUNTER_NAMES, reconcile_counters
+
+
+class Command(BaseCommand):
+    help = "Recalcule les compteurs de statistiques et affiche les écarts corrigés"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'compteurs', nargs='*',
+            help="Compteurs à recalculer parmi : %s (défaut : tous)" % ', '.join(COUNTER_NAMES),
+        )
+
+    def handle(self, *args, **options):
+        inconnus = set(options['compteurs']) - set(COUNTER_NAMES)
+        if inconnus:
+            raise CommandError("Compteur(s) inconnu(s) : %s" % ', '.join(sorted(inconnus)))
+        drift = reconcile_counters(options['compteurs'] or None)
+        for (tenant_id, nom), ecart in sorted(drift.items(), key=lambda item: (item[0][0] or 0, item[0][1])):
+            portfolio = tenant_id if tenant_id is not None else 'sans profil'
+            self.stdout.write(self.style.WARNING(f"{nom} (portfolio {portfolio}) : écart de {ecart:+d} corrigé."))
+        if not drift:
+            self.stdout.write(self.style.SUCCESS("Compteurs à jour."))
@@ -0,0 +1,21 @@
+# portfolio/management/commands/refresh_durees.py
+# Rafraîchissement des durées précalculées (à planifier, ex: cron quotidien) :
+# les expériences en cours vieillissent d'un jour à l'autre.
+
+from django.core.management.base import BaseCommand
+
+from portfolio.durations import refresh_durations
+
+
+class Command(BaseCommand):
+    help = "Met à jour la durée des expériences en cours et les mois d'expérience par compétence"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tous', action='store_true',
+            help="Recalcule toutes les durées (projets et expériences terminés compris) et tous les cumuls",
+        )
+
+    def handle(self, *args, **options):
+        changed = refresh_durations(en_cours=not options['tous'])
+        self.stdout.write(self.style.SUCCESS(f"{changed} durée(s) mise(s) à jour."))
@@ -0,0 +1,28 @@
+# portfolio/management/commands/sync_replica.py
+# Copie de la base SQLite principale vers ses répliques locales (développement :
+# remplace la réplication de PostgreSQL pour tester le routage des lectures)
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from portfolio.routers import replica_aliases
+
+
+class Command(BaseCommand):
+    help = "Copie la base SQLite principale dans les répliques SQLite locales"
+
+    def handle(self, *args, **options):
+        primary = connections['default']
+        if primary.vendor != 'sqlite':
+            raise CommandError("Seules les répliques SQLite locales sont copiées "
+                               "(en production, la réplication est assurée par PostgreSQL).")
+        replicas = replica_aliases()
+        if not replicas:
+            raise CommandError("Aucune réplique configurée (DATABASE_REPLICA_SQLITE).")
+        primary.ensure_connection()
+        for alias in replicas:
+            replica = connections[alias]
+            replica.ensure_connection()
+            # API de sauvegarde de SQLite : copie cohérente, même pendant des écritures
+            primary.connection.backup(replica.connection)
+            self.stdout.write(self.style.SUCCESS(f"Réplique '{alias}' synchronisée."))
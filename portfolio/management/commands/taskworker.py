@@ -0,0 +1,64 @@
+# portfolio/management/commands/taskworker.py
+# Processus d'exécution des tâches de fond (voir portfolio/tasks.py), à lancer
+# à côté du serveur web (systemd, supervisor...). Arrêt propre sur SIGTERM ou
+# SIGINT : la tâche en cours se termine avant la sortie.
+
+import multiprocessing
+import signal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from portfolio.tasks import Worker
+
+
+def run_worker(poll_interval):
+    """Point d'entrée d'un processus enfant"""
+    worker = Worker(poll_interval=poll_interval)
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run()
+
+
+class Command(BaseCommand):
+    help = "Exécute les tâches de fond (courriels, maintenance, cache) et planifie les tâches périodiques"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processus', type=int, default=1,
+                            help="Nombre de processus d'exécution (défaut : %(default)s)")
+        parser.add_argument('--intervalle', type=float, default=None,
+                            help="Secondes entre deux lectures de la file vide (défaut : TASKS_POLL_INTERVAL)")
+        parser.add_argument('--jusqua-vide', action='store_true',
+                            help="S'arrête quand aucune tâche n'est prête (ex: lancement par cron)")
+
+    def handle(self, *args, **options):
+        if options['processus'] < 1:
+            raise CommandError("Au moins un processus est nécessaire")
+        if options['processus'] > 1 and options['jusqua_vide']:
+            raise CommandError("--jusqua-vide s'exécute dans un seul processus : retirer --processus")
+        if options['processus'] == 1:
+            worker = Worker(poll_interval=options['intervalle'])
+            signal.signal(signal.SIGTERM, worker.stop)
+            signal.signal(signal.SIGINT, worker.stop)
+            done = worker.run(until_empty=options['jusqua_vide'])
+            self.stdout.write(self.style.SUCCESS(f"{done} tâche(s) exécutée(s)."))
+            return
+
+        # Connexions fermées avant le fork : chaque processus ouvre les siennes
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        children = [context.Process(target=run_worker, args=(options['intervalle'],), name=f'taskworker-{i}')
+                    for i in range(options['processus'])]
+        for child in children:
+            child.start()
+        self.stdout.write(f"{len(children)} processus d'exécution démarrés.")
+
+        def stop(*args):
+            for child in children:
+                if child.is_alive():
+                    child.terminate()  # SIGTERM : arrêt après la tâche en cours
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        for child in children:
+            child.join()
+        self.stdout.write(self.style.SUCCESS("Processus d'exécution arrêtés."))
@@ -0,0 +1,199 @@
+# portfolio/media.py
+# Distribution des fichiers média (CV, images) : délégation au serveur web
+# frontal (X-Accel-Redirect / X-Sendfile) ou envoi direct avec support des
+# requêtes partielles (Range) et conditionnelles (ETag / Last-Modified)
+
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+
+# Taille des blocs lus pour les réponses partielles bornées
+CHUNK_SIZE = 64 * 1024
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class AfterTransferMixin:
+    """Exécute un callback une fois la réponse entièrement envoyée
+
+    close() est aussi appelé après un transfert interrompu : quand Django envoie
+    lui-même le contenu, le callback n'est exécuté que si `expected_length` octets
+    ont été transmis. Envoyé par le serveur (wsgi.file_wrapper, X-Accel-Redirect),
+    le contenu n'est pas observable et le transfert est supposé complet.
+    """
+
+    after_transfer = None
+    # Octets attendus (None : pas de vérification) et octets transmis (None : contenu non parcouru)
+    expected_length = None
+    sent = None
+
+    def _set_streaming_content(self, value):
+        super()._set_streaming_content(value)
+        self._iterator = self._count_sent(self._iterator)
+
+    def _count_sent(self, iterator):
+        self.sent = 0
+        for chunk in iterator:
+            self.sent += len(chunk)
+            yield chunk
+
+    def close(self):
+        complete = self.sent is None or self.expected_length is None or self.sent >= self.expected_length
+        super().close()
+        if self.after_transfer is not None:
+            callback, self.after_transfer = self.after_transfer, None
+            if complete:
+                callback()
+
+
+class MediaResponse(AfterTransferMixin, HttpResponse):
+    pass
+
+
+class MediaFileResponse(AfterTransferMixin, FileResponse):
+    pass
+
+
+class MediaStreamingResponse(AfterTransferMixin, StreamingHttpResponse):
+    pass
+
+
+def resolve_media_path(path):
+    """Retourne le chemin absolu d'un fichier de MEDIA_ROOT (404 sinon)"""
+    try:
+        fullpath = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404("Fichier introuvable")
+    if not os.path.isfile(fullpath):
+        raise Http404("Fichier introuvable")
+    return fullpath
+
+
+def parse_range(header, size):
+    """Analyse un en-tête Range à plage unique
+
+    Retourne (début, fin) inclus, None si l'en-tête est absent ou ignoré,
+    ou False si la plage n'est pas satisfiable.
+    """
+    if not header:
+        return None
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        # Plages multiples ou unité inconnue : on renvoie le fichier complet
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        # Suffixe : les N derniers octets
+        length = int(end)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(start)
+    end = int(end) if end else size - 1
+    if start >= size or end < start:
+        return False
+    return start, min(end, size - 1)
+
+
+def _if_range_matches(request, etag, last_modified):
+    """Vérifie la précondition If-Range (RFC 9110, section 13.1.5)"""
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def _iter_range(fullpath, start, length):
+    """Lit une portion du fichier par blocs"""
+    with open(fullpath, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def serve_media_file(request, path, after_transfer=None):
+    """Construit la réponse pour un fichier média
+
+    `after_transfer` est appelé une fois le fichier envoyé en entier (sans Range,
+    ou plage couvrant tout le fichier) : un segment ou un transfert interrompu ne
+    compte pas.
+    """
+    fullpath = resolve_media_path(path)
+    stat = os.stat(fullpath)
+    size = stat.st_size
+    last_modified = int(stat.st_mtime)
+    etag = '"%x-%x"' % (last_modified, size)
+
+    # Requêtes conditionnelles : 304 Not Modified / 412 Precondition Failed
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        return response
+
+    content_type, encoding = mimetypes.guess_type(fullpath)
+    content_type = content_type or 'application/octet-stream'
+    accel = settings.MEDIA_ACCEL
+
+    byte_range = None
+    if not accel and _if_range_matches(request, etag, last_modified):
+        byte_range = parse_range(request.META.get('HTTP_RANGE'), size)
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = 'bytes */%d' % size
+        return response
+
+    if accel:
+        # Le serveur frontal envoie le fichier (et gère lui-même les Range)
+        response = MediaResponse(content_type=content_type)
+        if accel == 'nginx':
+            response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_PREFIX + quote(path)
+        else:
+            response['X-Sendfile'] = fullpath
+        range_header = request.META.get('HTTP_RANGE')
+        counts = not range_header or parse_range(range_header, size) == (0, size - 1)
+    elif byte_range is None:
+        # Fichier complet : FileResponse utilise wsgi.file_wrapper (sendfile)
+        response = MediaFileResponse(open(fullpath, 'rb'), content_type=content_type)
+        counts = True
+    else:
+        start, end = byte_range
+        length = end - start + 1
+        if end == size - 1:
+            # Plage ouverte : le fichier positionné reste envoyé sans copie
+            f = open(fullpath, 'rb')
+            f.seek(start)
+            response = MediaFileResponse(f, content_type=content_type, status=206)
+        else:
+            response = MediaStreamingResponse(
+                _iter_range(fullpath, start, length),
+                content_type=content_type, status=206,
+            )
+        response['Content-Length'] = str(length)
+        response['Content-Range'] = 'bytes %d-%d/%d' % (start, end, size)
+        counts = (start, end) == (0, size - 1)
+
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    if counts and after_transfer is not None:
+        response.after_transfer = after_transfer
+        response.expected_length = size
+    return response
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 05:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='telechargements_cv',
+            field=models.PositiveIntegerField(default=0, verbose_name='Téléchargements du CV'),
+        ),
+    ]
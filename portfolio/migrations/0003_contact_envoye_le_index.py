@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 05:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0002_profile_telechargements_cv'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='contact',
+            name='envoye_le',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Envoyé le'),
+        ),
+    ]
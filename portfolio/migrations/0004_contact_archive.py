@@ -0,0 +1,66 @@
+# Generated by Django 4.2.7 on 2026-10-19 05:24
+
+from django.db import migrations, models
+
+# Vue réunissant les messages récents et archivés (modèle ContactHistorique)
+CREATE_HISTORIQUE_VIEW = """
+CREATE VIEW portfolio_contact_historique AS
+SELECT id, nom, email, sujet, message, envoye_le, lu, repondu, FALSE AS archive
+FROM portfolio_contact
+UNION ALL
+SELECT id, nom, email, sujet, message, envoye_le, lu, repondu, TRUE AS archive
+FROM portfolio_contactarchive
+"""
+
+DROP_HISTORIQUE_VIEW = "DROP VIEW IF EXISTS portfolio_contact_historique"
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0003_contact_envoye_le_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContactHistorique',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('nom', models.CharField(max_length=100, verbose_name='Nom complet')),
+                ('email', models.EmailField(max_length=254, verbose_name='Adresse email')),
+                ('sujet', models.CharField(max_length=200, verbose_name='Sujet du message')),
+                ('message', models.TextField(verbose_name='Message')),
+                ('envoye_le', models.DateTimeField(verbose_name='Envoyé le')),
+                ('lu', models.BooleanField(verbose_name='Message lu')),
+                ('repondu', models.BooleanField(verbose_name='Réponse envoyée')),
+                ('archive', models.BooleanField(verbose_name='Archivé')),
+            ],
+            options={
+                'verbose_name': 'Message (historique complet)',
+                'verbose_name_plural': 'Messages (historique complet)',
+                'db_table': 'portfolio_contact_historique',
+                'ordering': ['-envoye_le'],
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ContactArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('nom', models.CharField(max_length=100, verbose_name='Nom complet')),
+                ('email', models.EmailField(max_length=254, verbose_name='Adresse email')),
+                ('sujet', models.CharField(max_length=200, verbose_name='Sujet du message')),
+                ('message', models.TextField(verbose_name='Message')),
+                ('envoye_le', models.DateTimeField(db_index=True, verbose_name='Envoyé le')),
+                ('lu', models.BooleanField(default=True, verbose_name='Message lu')),
+                ('repondu', models.BooleanField(default=True, verbose_name='Réponse envoyée')),
+                ('archive_le', models.DateTimeField(auto_now_add=True, verbose_name='Archivé le')),
+            ],
+            options={
+                'verbose_name': 'Message archivé',
+                'verbose_name_plural': 'Messages archivés',
+                'ordering': ['-envoye_le'],
+            },
+        ),
+        migrations.RunSQL(CREATE_HISTORIQUE_VIEW, DROP_HISTORIQUE_VIEW),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 4.2.7 on 2026-10-19 05:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def reprendre_compteurs(apps, schema_editor):
+    """Reprend l'ancien compteur `vues` sous forme d'un agrégat journalier"""
+    Projet = apps.get_model('portfolio', 'Projet')
+    StatistiqueVues = apps.get_model('portfolio', 'StatistiqueVues')
+    aujourd_hui = django.utils.timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    StatistiqueVues.objects.bulk_create([
+        StatistiqueVues(projet_id=pk, periode='jour', debut=aujourd_hui, vues=vues)
+        for pk, vues in Projet.objects.filter(vues__gt=0).values_list('pk', 'vues')
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0004_contact_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VueProjet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('vue_le', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Vue le')),
+                ('projet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='portfolio.projet')),
+            ],
+            options={
+                'verbose_name': 'Vue de projet',
+                'verbose_name_plural': 'Vues de projets (journal)',
+            },
+        ),
+        migrations.CreateModel(
+            name='StatistiqueVues',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('periode', models.CharField(choices=[('heure', 'Heure'), ('jour', 'Jour')], max_length=5, verbose_name='Période')),
+                ('debut', models.DateTimeField(verbose_name='Début de la période')),
+                ('vues', models.PositiveIntegerField(default=0, verbose_name='Nombre de vues')),
+                ('projet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='statistiques_vues', to='portfolio.projet')),
+            ],
+            options={
+                'verbose_name': 'Statistique de vues',
+                'verbose_name_plural': 'Statistiques de vues',
+                'ordering': ['-debut'],
+                'indexes': [models.Index(fields=['periode', 'debut'], name='statistiquevues_periode_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='statistiquevues',
+            constraint=models.UniqueConstraint(fields=('projet', 'periode', 'debut'), name='statistiquevues_unique_periode'),
+        ),
+        migrations.RunPython(reprendre_compteurs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.7 on 2026-10-19 05:28
+
+from django.db import migrations, models
+
+
+def initialiser_compteurs(apps, schema_editor):
+    """Calcule la valeur initiale des compteurs"""
+    Projet = apps.get_model('portfolio', 'Projet')
+    Competence = apps.get_model('portfolio', 'Competence')
+    Experience = apps.get_model('portfolio', 'Experience')
+    Contact = apps.get_model('portfolio', 'Contact')
+    CompteurPortfolio = apps.get_model('portfolio', 'CompteurPortfolio')
+    projets = Projet.objects.filter(actif=True)
+    valeurs = {
+        'total_projets': projets.count(),
+        'projets_featured': projets.filter(featured=True).count(),
+        'total_vues_projets': projets.aggregate(total=models.Sum('vues'))['total'] or 0,
+        'total_competences': Competence.objects.filter(actif=True).count(),
+        'total_experiences': Experience.objects.filter(actif=True).count(),
+        'messages_non_lus': Contact.objects.filter(lu=False).count(),
+    }
+    CompteurPortfolio.objects.bulk_create(
+        [CompteurPortfolio(nom=nom, valeur=valeur) for nom, valeur in valeurs.items()]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0005_vues_journal_statistiques'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompteurPortfolio',
+            fields=[
+                ('nom', models.CharField(max_length=50, primary_key=True, serialize=False, verbose_name='Compteur')),
+                ('valeur', models.BigIntegerField(default=0, verbose_name='Valeur')),
+            ],
+            options={
+                'verbose_name': 'Compteur',
+                'verbose_name_plural': 'Compteurs',
+                'ordering': ['nom'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(condition=models.Q(('lu', False)), fields=['lu'], name='contact_non_lus_idx'),
+        ),
+        migrations.RunPython(initialiser_compteurs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-19 05:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0006_compteurs_portfolio'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Modification',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('type_objet', models.CharField(choices=[('profile', 'Profil'), ('competence', 'Compétence'), ('projet', 'Projet'), ('experience', 'Expérience')], max_length=20, verbose_name="Type d'objet")),
+                ('objet_id', models.PositiveIntegerField(verbose_name="Id de l'objet")),
+                ('cree_le', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Date')),
+            ],
+            options={
+                'verbose_name': 'Modification',
+                'verbose_name_plural': 'Modifications (journal)',
+                'ordering': ['-id'],
+            },
+        ),
+    ]
@@ -0,0 +1,165 @@
+# Generated by Django 4.2.7 on 2026-10-19 06:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Vue ContactHistorique, avec (CREATE) et sans (ANCIEN) le portfolio
+CREATE_HISTORIQUE_VIEW = """
+CREATE VIEW portfolio_contact_historique AS
+SELECT id, profile_id, nom, email, sujet, message, envoye_le, lu, repondu, FALSE AS archive
+FROM portfolio_contact
+UNION ALL
+SELECT id, profile_id, nom, email, sujet, message, envoye_le, lu, repondu, TRUE AS archive
+FROM portfolio_contactarchive
+"""
+
+ANCIENNE_HISTORIQUE_VIEW = """
+CREATE VIEW portfolio_contact_historique AS
+SELECT id, nom, email, sujet, message, envoye_le, lu, repondu, FALSE AS archive
+FROM portfolio_contact
+UNION ALL
+SELECT id, nom, email, sujet, message, envoye_le, lu, repondu, TRUE AS archive
+FROM portfolio_contactarchive
+"""
+
+DROP_HISTORIQUE_VIEW = "DROP VIEW IF EXISTS portfolio_contact_historique"
+
+# Modèles rattachés à un portfolio
+MODELES_RATTACHES = ['Competence', 'Projet', 'Experience', 'Contact', 'ContactArchive', 'Modification']
+
+# Calcul des compteurs : (modèle, filtre, agrégat)
+COMPTEURS = {
+    'total_projets': ('Projet', {'actif': True}, models.Count('pk')),
+    'projets_featured': ('Projet', {'actif': True, 'featured': True}, models.Count('pk')),
+    'total_vues_projets': ('Projet', {'actif': True}, models.Sum('vues')),
+    'total_competences': ('Competence', {'actif': True}, models.Count('pk')),
+    'total_experiences': ('Experience', {'actif': True}, models.Count('pk')),
+    'messages_non_lus': ('Contact', {'lu': False}, models.Count('pk')),
+}
+
+
+def rattacher_au_premier_profil(apps, schema_editor):
+    """Les données existantes appartiennent au portfolio historique (premier profil)"""
+    Profile = apps.get_model('portfolio', 'Profile')
+    premier = Profile.objects.order_by('pk').values_list('pk', flat=True).first()
+    if premier is None:
+        return
+    for nom in MODELES_RATTACHES:
+        apps.get_model('portfolio', nom).objects.filter(profile__isnull=True).update(profile_id=premier)
+
+
+def initialiser_compteurs(apps, schema_editor):
+    """Calcule les compteurs de chaque portfolio (et des objets sans profil)"""
+    Profile = apps.get_model('portfolio', 'Profile')
+    CompteurPortfolio = apps.get_model('portfolio', 'CompteurPortfolio')
+    portfolios = [None] + list(Profile.objects.values_list('pk', flat=True))
+    compteurs = []
+    for nom, (modele, filtre, agregat) in COMPTEURS.items():
+        valeurs = dict(
+            apps.get_model('portfolio', modele).objects.filter(**filtre)
+            .values('profile').annotate(v=agregat).values_list('profile', 'v').order_by()
+        )
+        compteurs += [CompteurPortfolio(profile_id=pk, nom=nom, valeur=valeurs.get(pk) or 0)
+                      for pk in portfolios]
+    CompteurPortfolio.objects.bulk_create(compteurs, batch_size=500)
+
+
+def _profile_fk(related_name):
+    return models.ForeignKey(
+        db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE,
+        related_name=related_name, to='portfolio.profile', verbose_name='Portfolio',
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0007_journal_modifications'),
+    ]
+
+    operations = [
+        # La vue est recréée à la fin (les tables qu'elle lit sont modifiées)
+        migrations.RunSQL(DROP_HISTORIQUE_VIEW, ANCIENNE_HISTORIQUE_VIEW),
+        migrations.AddField(
+            model_name='profile',
+            name='slug',
+            field=models.SlugField(blank=True, help_text='Sous-domaine du portfolio (ex: jean → jean.exemple.com)', max_length=60, null=True, unique=True, verbose_name='Identifiant'),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='domaine',
+            field=models.CharField(blank=True, help_text="Nom d'hôte dédié (ex: www.jean-dupont.fr)", max_length=253, null=True, unique=True, verbose_name='Domaine personnalisé'),
+        ),
+        migrations.AddField(model_name='competence', name='profile', field=_profile_fk('competences')),
+        migrations.AddField(model_name='projet', name='profile', field=_profile_fk('projets')),
+        migrations.AddField(model_name='experience', name='profile', field=_profile_fk('experiences')),
+        migrations.AddField(model_name='contact', name='profile', field=_profile_fk('messages')),
+        migrations.AddField(model_name='modification', name='profile', field=_profile_fk('+')),
+        migrations.AddField(
+            model_name='contactarchive',
+            name='profile',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='portfolio.profile', verbose_name='Portfolio'),
+        ),
+        migrations.AddField(
+            model_name='contacthistorique',
+            name='profile',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='portfolio.profile', verbose_name='Portfolio'),
+        ),
+        migrations.RemoveIndex(
+            model_name='contact',
+            name='contact_non_lus_idx',
+        ),
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(fields=['profile', 'envoye_le'], name='contact_tenant_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(condition=models.Q(('lu', False)), fields=['profile'], name='contact_non_lus_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='competence',
+            index=models.Index(fields=['profile', 'actif', 'ordre'], name='competence_tenant_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projet',
+            index=models.Index(fields=['profile', 'actif', 'featured'], name='projet_tenant_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='experience',
+            index=models.Index(fields=['profile', 'actif', 'date_debut'], name='experience_tenant_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='modification',
+            index=models.Index(fields=['profile', 'id'], name='modification_tenant_idx'),
+        ),
+        # Compteurs par portfolio : table recréée puis recalculée
+        migrations.DeleteModel(
+            name='CompteurPortfolio',
+        ),
+        migrations.CreateModel(
+            name='CompteurPortfolio',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nom', models.CharField(max_length=50, verbose_name='Compteur')),
+                ('valeur', models.BigIntegerField(default=0, verbose_name='Valeur')),
+                ('profile', _profile_fk('+')),
+            ],
+            options={
+                'verbose_name': 'Compteur',
+                'verbose_name_plural': 'Compteurs',
+                'ordering': ['profile', 'nom'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='compteurportfolio',
+            constraint=models.UniqueConstraint(fields=('profile', 'nom'), name='compteur_unique_nom'),
+        ),
+        migrations.AddConstraint(
+            model_name='compteurportfolio',
+            constraint=models.UniqueConstraint(condition=models.Q(('profile__isnull', True)), fields=('nom',), name='compteur_unique_nom_sans_profil'),
+        ),
+        migrations.RunPython(rattacher_au_premier_profil, migrations.RunPython.noop),
+        migrations.RunPython(initialiser_compteurs, migrations.RunPython.noop),
+        migrations.RunSQL(CREATE_HISTORIQUE_VIEW, DROP_HISTORIQUE_VIEW),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 4.2.7 on 2026-10-19 06:10
+
+from datetime import date
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def calculer_durees(apps, schema_editor):
+    """Durées des projets et expériences existants, puis cumuls par compétence"""
+    Projet = apps.get_model('portfolio', 'Projet')
+    Experience = apps.get_model('portfolio', 'Experience')
+    Competence = apps.get_model('portfolio', 'Competence')
+    for model, en_cours in ((Projet, None), (Experience, date.today())):
+        for pk, debut, fin in model.objects.values_list('pk', 'date_debut', 'date_fin'):
+            fin = fin or en_cours
+            if fin is not None:
+                model.objects.filter(pk=pk).update(duree_mois=max(round((fin - debut).days / 30), 0))
+    through = Experience.competences_acquises.through
+    total = (through.objects.filter(competence_id=models.OuterRef('pk'), experience__actif=True)
+             .values('competence_id').annotate(total=models.Sum('experience__duree_mois')).values('total'))
+    Competence.objects.update(mois_experience=Coalesce(models.Subquery(total), models.Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0008_multi_portfolio'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='competence',
+            name='mois_experience',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Expérience (mois)'),
+        ),
+        migrations.AddField(
+            model_name='experience',
+            name='duree_mois',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Durée (mois)'),
+        ),
+        migrations.AddField(
+            model_name='projet',
+            name='duree_mois',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Durée (mois)'),
+        ),
+        migrations.AddIndex(
+            model_name='competence',
+            index=models.Index(fields=['profile', 'actif', 'mois_experience'], name='competence_experience_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='experience',
+            index=models.Index(fields=['profile', 'actif', 'duree_mois'], name='experience_duree_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projet',
+            index=models.Index(fields=['profile', 'actif', 'duree_mois'], name='projet_duree_idx'),
+        ),
+        migrations.RunPython(calculer_durees, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-19 06:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0009_durees_precalculees'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfilRequete',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cree_le', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Date')),
+                ('methode', models.CharField(max_length=10, verbose_name='Méthode')),
+                ('chemin', models.CharField(max_length=500, verbose_name='Chemin')),
+                ('statut', models.PositiveSmallIntegerField(verbose_name='Statut HTTP')),
+                ('duree_ms', models.FloatField(verbose_name='Durée (ms)')),
+                ('requetes_sql', models.PositiveIntegerField(default=0, verbose_name='Requêtes SQL')),
+                ('mode', models.CharField(choices=[('cprofile', 'cProfile (pstats)'), ('echantillonnage', 'Échantillonnage de pile (collapsed stacks)')], max_length=20, verbose_name='Mode')),
+                ('echantillonne', models.BooleanField(default=False, help_text='Profil tiré au sort (sinon demandé par en-tête signé)', verbose_name='Tiré au sort')),
+                ('donnees', models.BinaryField(verbose_name='Données du profil')),
+            ],
+            options={
+                'verbose_name': 'Profil de requête',
+                'verbose_name_plural': 'Profils de requêtes',
+                'ordering': ['-cree_le'],
+            },
+        ),
+    ]
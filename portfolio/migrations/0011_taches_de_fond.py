@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-19 06:23
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0010_profils_requetes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nom', models.CharField(max_length=100, verbose_name='Tâche')),
+                ('arguments', models.JSONField(blank=True, default=dict, help_text="{'args': [...], 'kwargs': {...}}", verbose_name='Arguments')),
+                ('etat', models.CharField(choices=[('en_attente', 'En attente'), ('en_cours', 'En cours'), ('terminee', 'Terminée'), ('echec', 'Échec')], default='en_attente', max_length=20, verbose_name='État')),
+                ('cle', models.CharField(blank=True, max_length=200, null=True, unique=True, verbose_name='Clé')),
+                ('executer_apres', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Exécution à partir de')),
+                ('tentatives', models.PositiveSmallIntegerField(default=0, verbose_name='Tentatives')),
+                ('max_tentatives', models.PositiveSmallIntegerField(default=5, verbose_name='Tentatives maximales')),
+                ('travailleur', models.CharField(blank=True, max_length=100, verbose_name='Processus')),
+                ('debut', models.DateTimeField(blank=True, null=True, verbose_name="Début de l'exécution")),
+                ('termine_le', models.DateTimeField(blank=True, null=True, verbose_name="Fin de l'exécution")),
+                ('duree_ms', models.FloatField(blank=True, null=True, verbose_name='Durée (ms)')),
+                ('derniere_erreur', models.TextField(blank=True, verbose_name='Dernière erreur')),
+                ('cree_le', models.DateTimeField(auto_now_add=True, verbose_name='Créée le')),
+            ],
+            options={
+                'verbose_name': 'Tâche de fond',
+                'verbose_name_plural': 'Tâches de fond',
+                'ordering': ['-id'],
+                'indexes': [models.Index(fields=['etat', 'executer_apres'], name='tache_file_idx')],
+            },
+        ),
+    ]
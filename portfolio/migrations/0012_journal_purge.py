@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 07:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0011_taches_de_fond'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='modification',
+            name='type_objet',
+            field=models.CharField(choices=[('profile', 'Profil'), ('competence', 'Compétence'), ('projet', 'Projet'), ('experience', 'Expérience'), ('purge', 'Purge du journal')], max_length=20, verbose_name="Type d'objet"),
+        ),
+    ]
@@ -1,12 +1,32 @@
 # portfolio/models.py
 # Définition des modèles de données pour le portfolio
 
+from datetime import timedelta
+
 from django.db import models
 from django.core.validators import URLValidator
 from django.utils import timezone
 
+class TenantQuerySet(models.QuerySet):
+    """QuerySet des données d'un portfolio (un portfolio = un profil)"""
+    
+    def for_tenant(self, tenant_id):
+        """Objets du portfolio `tenant_id` (None : objets sans profil, mode mono-portfolio)"""
+        return self.filter(profile_id=tenant_id)
+
 class Profile(models.Model):
-    """Modèle pour les informations personnelles du portfolio"""
+    """Modèle pour les informations personnelles du portfolio
+    
+    Chaque profil est un portfolio : les autres modèles y sont rattachés.
+    """
+    
+    # Résolution du portfolio à partir de la requête (voir portfolio/tenants.py)
+    slug = models.SlugField(max_length=60, unique=True, null=True, blank=True,
+                            verbose_name="Identifiant",
+                            help_text="Sous-domaine du portfolio (ex: jean → jean.exemple.com)")
+    domaine = models.CharField(max_length=253, unique=True, null=True, blank=True,
+                               verbose_name="Domaine personnalisé",
+                               help_text="Nom d'hôte dédié (ex: www.jean-dupont.fr)")
     
     # Informations de base
     nom = models.CharField(max_length=100, verbose_name="Nom complet")
@@ -32,6 +52,8 @@ class Profile(models.Model):
     # CV téléchargeable
     cv = models.FileField(upload_to='documents/', blank=True, null=True,
                          verbose_name="CV (PDF)")
+    telechargements_cv = models.PositiveIntegerField(default=0,
+                                                   verbose_name="Téléchargements du CV")
     
     # Réseaux sociaux
     linkedin = models.URLField(blank=True, verbose_name="LinkedIn")
@@ -50,6 +72,13 @@ class Profile(models.Model):
     
     def __str__(self):
         return self.nom
+    
+    @classmethod
+    def increment_cv_downloads(cls, cv_name):
+        """Incrémente le compteur de téléchargements du CV (sans lecture préalable)"""
+        return cls.objects.filter(cv=cv_name).update(
+            telechargements_cv=models.F('telechargements_cv') + 1
+        )
 
 class Competence(models.Model):
     """Modèle pour les compétences techniques"""
@@ -64,6 +93,9 @@ class Competence(models.Model):
         ('autres', 'Autres'),
     ]
     
+    # Portfolio propriétaire (index composites ci-dessous, d'où db_index=False)
+    profile = models.ForeignKey(Profile, on_delete=models.CASCADE, null=True, db_index=False,
+                                related_name='competences', verbose_name="Portfolio")
     nom = models.CharField(max_length=100, verbose_name="Nom de la compétence")
     categorie = models.CharField(max_length=20, choices=CATEGORIES, 
                                verbose_name="Catégorie")
@@ -75,14 +107,24 @@ class Competence(models.Model):
                              help_text="Couleur en hexadécimal (ex: #FF5733)")
     ordre = models.IntegerField(default=0, verbose_name="Ordre d'affichage")
     
+    # Cumul des durées des expériences actives où la compétence a été acquise (voir durations.py)
+    mois_experience = models.PositiveIntegerField(default=0, editable=False,
+                                                  verbose_name="Expérience (mois)")
+    
     # Métadonnées
     cree_le = models.DateTimeField(auto_now_add=True)
     actif = models.BooleanField(default=True, verbose_name="Compétence active")
     
+    objects = TenantQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Compétence"
         verbose_name_plural = "Compétences"
         ordering = ['ordre', 'nom']  # Tri par ordre puis par nom
+        indexes = [
+            models.Index(fields=['profile', 'actif', 'ordre'], name='competence_tenant_idx'),
+            models.Index(fields=['profile', 'actif', 'mois_experience'], name='competence_experience_idx'),
+        ]
     
     def __str__(self):
         return f"{self.nom} ({self.get_categorie_display()})"
@@ -97,6 +139,10 @@ class Projet(models.Model):
         ('archive', 'Archivé'),
     ]
     
+    # Portfolio propriétaire (index composites ci-dessous, d'où db_index=False)
+    profile = models.ForeignKey(Profile, on_delete=models.CASCADE, null=True, db_index=False,
+                                related_name='projets', verbose_name="Portfolio")
+    
     # Informations principales
     titre = models.CharField(max_length=200, verbose_name="Titre du projet")
     description_courte = models.CharField(max_length=300, 
@@ -126,6 +172,9 @@ class Projet(models.Model):
                             default='termine', verbose_name="Statut")
     date_debut = models.DateField(verbose_name="Date de début")
     date_fin = models.DateField(blank=True, null=True, verbose_name="Date de fin")
+    # Durée en mois, calculée à l'enregistrement (vide tant que le projet n'est pas fini)
+    duree_mois = models.PositiveIntegerField(blank=True, null=True, editable=False,
+                                             verbose_name="Durée (mois)")
     
     # Métadonnées pour l'affichage
     featured = models.BooleanField(default=False, 
@@ -138,18 +187,64 @@ class Projet(models.Model):
     modifie_le = models.DateTimeField(auto_now=True)
     actif = models.BooleanField(default=True, verbose_name="Projet actif")
     
+    objects = TenantQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Projet"
         verbose_name_plural = "Projets"
         ordering = ['-featured', 'ordre', '-date_debut']  # Projets featured en premier
+        indexes = [
+            models.Index(fields=['profile', 'actif', 'featured'], name='projet_tenant_idx'),
+            models.Index(fields=['profile', 'actif', 'duree_mois'], name='projet_duree_idx'),
+        ]
     
     def __str__(self):
         return self.titre
     
     def increment_views(self):
-        """Méthode pour incrémenter le nombre de vues"""
-        self.vues += 1
-        self.save(update_fields=['vues'])
+        """Enregistre une vue dans le journal (simple insertion, sans verrou sur le projet)
+
+        `vues` est recalculé à partir des agrégats par la commande compact_vues.
+        """
+        return VueProjet.objects.create(projet_id=self.pk)
+
+class VueProjet(models.Model):
+    """Journal des vues de projets (ajout seul, compacté par `compact_vues`)"""
+    
+    projet = models.ForeignKey(Projet, on_delete=models.CASCADE, related_name='+')
+    vue_le = models.DateTimeField(default=timezone.now, verbose_name="Vue le")
+    
+    class Meta:
+        verbose_name = "Vue de projet"
+        verbose_name_plural = "Vues de projets (journal)"
+
+class StatistiqueVues(models.Model):
+    """Nombre de vues d'un projet agrégé par heure ou par jour"""
+    
+    PERIODES = [
+        ('heure', 'Heure'),
+        ('jour', 'Jour'),
+    ]
+    
+    projet = models.ForeignKey(Projet, on_delete=models.CASCADE, related_name='statistiques_vues')
+    periode = models.CharField(max_length=5, choices=PERIODES, verbose_name="Période")
+    debut = models.DateTimeField(verbose_name="Début de la période")
+    vues = models.PositiveIntegerField(default=0, verbose_name="Nombre de vues")
+    
+    class Meta:
+        verbose_name = "Statistique de vues"
+        verbose_name_plural = "Statistiques de vues"
+        ordering = ['-debut']
+        constraints = [
+            models.UniqueConstraint(fields=['projet', 'periode', 'debut'],
+                                    name='statistiquevues_unique_periode'),
+        ]
+        indexes = [
+            models.Index(fields=['periode', 'debut'], name='statistiquevues_periode_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.projet_id} - {self.periode} {self.debut:%Y-%m-%d %H:%M} : {self.vues}"
 
 class Experience(models.Model):
     """Modèle pour l'expérience professionnelle et formations"""
@@ -161,6 +256,10 @@ class Experience(models.Model):
         ('benevolat', 'Bénévolat'),
     ]
     
+    # Portfolio propriétaire (index composites ci-dessous, d'où db_index=False)
+    profile = models.ForeignKey(Profile, on_delete=models.CASCADE, null=True, db_index=False,
+                                related_name='experiences', verbose_name="Portfolio")
+    
     type_experience = models.CharField(max_length=20, choices=TYPES, 
                                      verbose_name="Type d'expérience")
     titre = models.CharField(max_length=200, verbose_name="Titre du poste/formation")
@@ -171,6 +270,8 @@ class Experience(models.Model):
     date_debut = models.DateField(verbose_name="Date de début")
     date_fin = models.DateField(blank=True, null=True, 
                               verbose_name="Date de fin (laisser vide si en cours)")
+    # Durée en mois, calculée à l'enregistrement (rafraîchie chaque jour si en cours)
+    duree_mois = models.PositiveIntegerField(default=0, editable=False, verbose_name="Durée (mois)")
     
     # Détails
     description = models.TextField(verbose_name="Description des tâches/apprentissages")
@@ -182,10 +283,16 @@ class Experience(models.Model):
     cree_le = models.DateTimeField(auto_now_add=True)
     actif = models.BooleanField(default=True, verbose_name="Expérience active")
     
+    objects = TenantQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Expérience"
         verbose_name_plural = "Expériences"
         ordering = ['-date_debut']  # Plus récent en premier
+        indexes = [
+            models.Index(fields=['profile', 'actif', 'date_debut'], name='experience_tenant_idx'),
+            models.Index(fields=['profile', 'actif', 'duree_mois'], name='experience_duree_idx'),
+        ]
     
     def __str__(self):
         return f"{self.titre} - {self.entreprise}"
@@ -198,20 +305,273 @@ class Experience(models.Model):
 class Contact(models.Model):
     """Modèle pour les messages de contact"""
     
+    # Portfolio propriétaire (index composites ci-dessous, d'où db_index=False)
+    profile = models.ForeignKey(Profile, on_delete=models.CASCADE, null=True, db_index=False,
+                                related_name='messages', verbose_name="Portfolio")
     nom = models.CharField(max_length=100, verbose_name="Nom complet")
     email = models.EmailField(verbose_name="Adresse email")
     sujet = models.CharField(max_length=200, verbose_name="Sujet du message")
     message = models.TextField(verbose_name="Message")
     
     # Métadonnées
-    envoye_le = models.DateTimeField(auto_now_add=True, verbose_name="Envoyé le")
+    envoye_le = models.DateTimeField(auto_now_add=True, db_index=True, verbose_name="Envoyé le")
     lu = models.BooleanField(default=False, verbose_name="Message lu")
     repondu = models.BooleanField(default=False, verbose_name="Réponse envoyée")
     
+    objects = TenantQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Message de contact"
         verbose_name_plural = "Messages de contact"
         ordering = ['-envoye_le']  # Plus récent en premier
+        indexes = [
+            models.Index(fields=['profile', 'envoye_le'], name='contact_tenant_idx'),
+            # Index partiel : le comptage des messages non lus reste rapide
+            models.Index(fields=['profile'], condition=models.Q(lu=False), name='contact_non_lus_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.nom} - {self.sujet}"
+
+class ContactArchive(models.Model):
+    """Messages de contact archivés (lus et répondus, au-delà de la durée de rétention)"""
+    
+    # Même identifiant que le message d'origine : les ID ne sont jamais réutilisés
+    id = models.BigIntegerField(primary_key=True)
+    profile = models.ForeignKey(Profile, on_delete=models.CASCADE, null=True,
+                                related_name='+', verbose_name="Portfolio")
+    nom = models.CharField(max_length=100, verbose_name="Nom complet")
+    email = models.EmailField(verbose_name="Adresse email")
+    sujet = models.CharField(max_length=200, verbose_name="Sujet du message")
+    message = models.TextField(verbose_name="Message")
+    envoye_le = models.DateTimeField(db_index=True, verbose_name="Envoyé le")
+    lu = models.BooleanField(default=True, verbose_name="Message lu")
+    repondu = models.BooleanField(default=True, verbose_name="Réponse envoyée")
+    archive_le = models.DateTimeField(auto_now_add=True, verbose_name="Archivé le")
+    
+    objects = TenantQuerySet.as_manager()
+    
+    class Meta:
+        verbose_name = "Message archivé"
+        verbose_name_plural = "Messages archivés"
+        ordering = ['-envoye_le']
+    
+    def __str__(self):
+        return f"{self.nom} - {self.sujet}"
+
+class ContactHistorique(models.Model):
+    """Vue SQL réunissant les messages récents et archivés (lecture seule)"""
+    
+    id = models.BigIntegerField(primary_key=True)
+    profile = models.ForeignKey(Profile, on_delete=models.DO_NOTHING, null=True,
+                                related_name='+', verbose_name="Portfolio")
+    nom = models.CharField(max_length=100, verbose_name="Nom complet")
+    email = models.EmailField(verbose_name="Adresse email")
+    sujet = models.CharField(max_length=200, verbose_name="Sujet du message")
+    message = models.TextField(verbose_name="Message")
+    envoye_le = models.DateTimeField(verbose_name="Envoyé le")
+    lu = models.BooleanField(verbose_name="Message lu")
+    repondu = models.BooleanField(verbose_name="Réponse envoyée")
+    archive = models.BooleanField(verbose_name="Archivé")
+    
+    objects = TenantQuerySet.as_manager()
+    
+    class Meta:
+        managed = False  # Vue créée par la migration 0004
+        db_table = 'portfolio_contact_historique'
+        verbose_name = "Message (historique complet)"
+        verbose_name_plural = "Messages (historique complet)"
+        ordering = ['-envoye_le']
+    
+    def __str__(self):
+        return f"{self.nom} - {self.sujet}"
+
+class CompteurPortfolio(models.Model):
+    """Compteurs des statistiques du portfolio, maintenus par les signaux
+
+    Voir portfolio/counters.py (mise à jour incrémentale et réconciliation).
+    """
+    
+    profile = models.ForeignKey(Profile, on_delete=models.CASCADE, null=True, db_index=False,
+                                related_name='+', verbose_name="Portfolio")
+    nom = models.CharField(max_length=50, verbose_name="Compteur")
+    valeur = models.BigIntegerField(default=0, verbose_name="Valeur")
+    
+    objects = TenantQuerySet.as_manager()
+    
+    class Meta:
+        verbose_name = "Compteur"
+        verbose_name_plural = "Compteurs"
+        ordering = ['profile', 'nom']
+        constraints = [
+            models.UniqueConstraint(fields=['profile', 'nom'], name='compteur_unique_nom'),
+            # NULL n'est pas comparé par la contrainte précédente
+            models.UniqueConstraint(fields=['nom'], condition=models.Q(profile__isnull=True),
+                                    name='compteur_unique_nom_sans_profil'),
+        ]
+    
+    def __str__(self):
+        return f"{self.nom} = {self.valeur}"
+
+class Modification(models.Model):
+    """Journal des modifications du contenu public (synchronisation différentielle)
+    
+    L'id sert de numéro de séquence croissant : un client qui connaît la
+    version N demande les modifications d'id > N. Après une purge, la plus
+    récente entrée purgée de chaque portfolio devient un repère (PURGE) :
+    une version antérieure au repère impose un rechargement complet.
+    """
+    
+    PROFILE = 'profile'
+    COMPETENCE = 'competence'
+    PROJET = 'projet'
+    EXPERIENCE = 'experience'
+    PURGE = 'purge'
+    TYPES = [
+        (PROFILE, 'Profil'),
+        (COMPETENCE, 'Compétence'),
+        (PROJET, 'Projet'),
+        (EXPERIENCE, 'Expérience'),
+        (PURGE, 'Purge du journal'),
+    ]
+    
+    id = models.BigAutoField(primary_key=True)
+    profile = models.ForeignKey(Profile, on_delete=models.CASCADE, null=True, db_index=False,
+                                related_name='+', verbose_name="Portfolio")
+    type_objet = models.CharField(max_length=20, choices=TYPES, verbose_name="Type d'objet")
+    objet_id = models.PositiveIntegerField(verbose_name="Id de l'objet")
+    cree_le = models.DateTimeField(auto_now_add=True, db_index=True, verbose_name="Date")
+    
+    objects = TenantQuerySet.as_manager()
+    
+    class Meta:
+        verbose_name = "Modification"
+        verbose_name_plural = "Modifications (journal)"
+        ordering = ['-id']
+        indexes = [
+            models.Index(fields=['profile', 'id'], name='modification_tenant_idx'),
+        ]
+    
+    def __str__(self):
+        return f"#{self.id} {self.type_objet} {self.objet_id}"
+    
+    @classmethod
+    def record(cls, tenant_id, type_objet, ids):
+        """Enregistre une modification pour chacun des objets `ids` du portfolio"""
+        return cls.objects.bulk_create([
+            cls(profile_id=tenant_id, type_objet=type_objet, objet_id=pk) for pk in ids
+        ])
+    
+    @classmethod
+    def latest_sequence(cls, tenant_id=None):
+        """Numéro de la dernière modification du portfolio (0 si aucune)"""
+        return (cls.objects.for_tenant(tenant_id).order_by('-id')
+                .values_list('id', flat=True).first() or 0)
+    
+    @classmethod
+    def purged_sequence(cls, tenant_id=None):
+        """Numéro du repère de purge du portfolio (0 si son journal n'a jamais été purgé)
+        
+        Des modifications du portfolio de numéro inférieur ou égal ont pu être supprimées.
+        """
+        return (cls.objects.for_tenant(tenant_id).filter(type_objet=cls.PURGE)
+                .order_by('-id').values_list('id', flat=True).first() or 0)
+    
+    @classmethod
+    def prune(cls, days):
+        """Supprime les modifications de plus de `days` jours ; retourne leur nombre
+        
+        Par portfolio, la dernière entrée est conservée (elle porte la version courante) et la
+        plus récente entrée purgée devient le repère de purge.
+        """
+        limite = timezone.now() - timedelta(days=days)
+        latest = cls.objects.order_by().values('profile').annotate(last=models.Max('id')).values('last')
+        old = cls.objects.filter(cree_le__lt=limite).exclude(id__in=latest)
+        markers = list(old.order_by().values('profile').annotate(last=models.Max('id'))
+                       .values_list('last', flat=True))
+        cls.objects.filter(id__in=markers).update(type_objet=cls.PURGE, objet_id=0)
+        return old.exclude(id__in=markers).delete()[0]
+
+class ProfilRequete(models.Model):
+    """Profil d'exécution d'une requête (cProfile ou échantillonnage de pile)
+
+    Voir portfolio/profiling.py ; seuls les derniers profils sont conservés.
+    """
+    
+    CPROFILE = 'cprofile'
+    ECHANTILLONNAGE = 'echantillonnage'
+    MODES = [
+        (CPROFILE, 'cProfile (pstats)'),
+        (ECHANTILLONNAGE, 'Échantillonnage de pile (collapsed stacks)'),
+    ]
+    
+    cree_le = models.DateTimeField(auto_now_add=True, db_index=True, verbose_name="Date")
+    methode = models.CharField(max_length=10, verbose_name="Méthode")
+    chemin = models.CharField(max_length=500, verbose_name="Chemin")
+    statut = models.PositiveSmallIntegerField(verbose_name="Statut HTTP")
+    duree_ms = models.FloatField(verbose_name="Durée (ms)")
+    requetes_sql = models.PositiveIntegerField(default=0, verbose_name="Requêtes SQL")
+    mode = models.CharField(max_length=20, choices=MODES, verbose_name="Mode")
+    echantillonne = models.BooleanField(default=False, verbose_name="Tiré au sort",
+                                        help_text="Profil tiré au sort (sinon demandé par en-tête signé)")
+    # Fichier pstats (cProfile) ou texte « pile;...;fonction nombre » (échantillonnage)
+    donnees = models.BinaryField(verbose_name="Données du profil")
+    
+    class Meta:
+        verbose_name = "Profil de requête"
+        verbose_name_plural = "Profils de requêtes"
+        ordering = ['-cree_le']
+    
+    def __str__(self):
+        return f"{self.methode} {self.chemin} ({self.duree_ms:.0f} ms)"
+    
+    @property
+    def extension(self):
+        return 'pstats' if self.mode == self.CPROFILE else 'folded'
+
+
+class Tache(models.Model):
+    """Tâche de fond exécutée par les processus `manage.py taskworker`
+
+    Voir portfolio/tasks.py : file d'attente en base, nouvelles tentatives
+    espacées et tâches périodiques.
+    """
+    
+    EN_ATTENTE = 'en_attente'
+    EN_COURS = 'en_cours'
+    TERMINEE = 'terminee'
+    ECHEC = 'echec'
+    ETATS = [
+        (EN_ATTENTE, 'En attente'),
+        (EN_COURS, 'En cours'),
+        (TERMINEE, 'Terminée'),
+        (ECHEC, 'Échec'),
+    ]
+    
+    nom = models.CharField(max_length=100, verbose_name="Tâche")
+    arguments = models.JSONField(default=dict, blank=True, verbose_name="Arguments",
+                                 help_text="{'args': [...], 'kwargs': {...}}")
+    etat = models.CharField(max_length=20, choices=ETATS, default=EN_ATTENTE, verbose_name="État")
+    # Clé de déduplication (ex: une seule tâche périodique par période, quel que soit le nombre de processus)
+    cle = models.CharField(max_length=200, unique=True, null=True, blank=True, verbose_name="Clé")
+    executer_apres = models.DateTimeField(default=timezone.now, verbose_name="Exécution à partir de")
+    tentatives = models.PositiveSmallIntegerField(default=0, verbose_name="Tentatives")
+    max_tentatives = models.PositiveSmallIntegerField(default=5, verbose_name="Tentatives maximales")
+    travailleur = models.CharField(max_length=100, blank=True, verbose_name="Processus")
+    debut = models.DateTimeField(null=True, blank=True, verbose_name="Début de l'exécution")
+    termine_le = models.DateTimeField(null=True, blank=True, verbose_name="Fin de l'exécution")
+    duree_ms = models.FloatField(null=True, blank=True, verbose_name="Durée (ms)")
+    derniere_erreur = models.TextField(blank=True, verbose_name="Dernière erreur")
+    cree_le = models.DateTimeField(auto_now_add=True, verbose_name="Créée le")
+    
+    class Meta:
+        verbose_name = "Tâche de fond"
+        verbose_name_plural = "Tâches de fond"
+        ordering = ['-id']
+        indexes = [
+            # Prochaines tâches à exécuter
+            models.Index(fields=['etat', 'executer_apres'], name='tache_file_idx'),
+        ]
     
     def __str__(self):
-        return f"{self.nom} - {self.sujet}"
\ No newline at end of file
+        return f"{self.nom} #{self.pk} ({self.get_etat_display()})"
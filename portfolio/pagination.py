@@ -0,0 +1,140 @@
+# portfolio/pagination.py
+# Pagination performante pour l'administration des grandes tables :
+# nombre de lignes estimé et pagination par curseur (keyset)
+
+from django.contrib.admin.views.main import ChangeList, ORDER_VAR
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections, router
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+# Paramètre GET portant la clé primaire de la dernière ligne affichée
+CURSOR_VAR = 'apres'
+
+
+def estimate_row_count(model):
+    """Estime le nombre de lignes d'une table sans COUNT(*)
+
+    Retourne None si aucune estimation fiable n'est disponible.
+    """
+    connection = connections[router.db_for_read(model)]
+    qn = connection.ops.quote_name
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            # Statistiques maintenues par ANALYZE / autovacuum
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [table])
+        elif connection.vendor == 'mysql':
+            cursor.execute(
+                "SELECT table_rows FROM information_schema.tables "
+                "WHERE table_schema = DATABASE() AND table_name = %s", [table]
+            )
+        else:
+            # SQLite : l'écart des clés primaires (lu dans l'index) approxime
+            # le nombre de lignes des tables peu sujettes aux suppressions
+            pk = qn(model._meta.pk.column)
+            cursor.execute(
+                'SELECT (SELECT MAX({pk}) FROM {t}) - (SELECT MIN({pk}) FROM {t}) + 1'.format(
+                    pk=pk, t=qn(table)
+                )
+            )
+        row = cursor.fetchone()
+    if not row or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginateur qui évite le COUNT(*) complet sur les grandes tables"""
+
+    # En dessous de ce seuil, le COUNT(*) exact reste bon marché
+    exact_threshold = 10000
+    # Nombre maximal de lignes comptées pour une liste filtrée
+    count_limit = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        query = getattr(queryset, 'query', None)
+        if query is None:
+            return super().count
+        if not query.where:
+            # Table complète : estimation à partir des statistiques
+            estimate = estimate_row_count(queryset.model)
+            if estimate is not None and estimate >= self.exact_threshold:
+                return estimate
+            return super().count
+        # Liste filtrée : comptage borné (SELECT COUNT(*) FROM (... LIMIT n))
+        return queryset[:self.count_limit].count()
+
+
+class KeysetChangeList(ChangeList):
+    """Liste d'administration paginée par curseur plutôt que par OFFSET
+
+    Utilisée uniquement avec le tri par défaut (`keyset_field` du ModelAdmin) ;
+    un tri sur une colonne revient à la pagination classique.
+    """
+
+    def __init__(self, request, *args, **kwargs):
+        self.cursor = request.GET.get(CURSOR_VAR) or None
+        super().__init__(request, *args, **kwargs)
+
+    @cached_property
+    def keyset_enabled(self):
+        return ORDER_VAR not in self.params and not self.show_all
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        return lookup_params
+
+    def get_query_string(self, new_params=None, remove=None):
+        # Un changement de filtre ou de tri repart de la première page
+        new_params = new_params or {}
+        if CURSOR_VAR not in new_params:
+            remove = list(remove or []) + [CURSOR_VAR]
+        return super().get_query_string(new_params, remove)
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if not (self.keyset_enabled and self.cursor):
+            return queryset
+        try:
+            cursor = self.model._meta.pk.to_python(self.cursor)
+        except ValidationError:
+            # Curseur invalide (URL modifiée à la main) : première page
+            return queryset
+        field = self.model_admin.keyset_field
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        value = self.root_queryset.filter(pk=cursor).values_list(name, flat=True).first()
+        if value is None:
+            return queryset
+        # Départage par clé primaire décroissante, comme le tri de l'admin
+        return queryset.filter(
+            Q(**{'%s__%s' % (name, lookup): value}) | Q(**{name: value, 'pk__lt': cursor})
+        )
+
+    def get_results(self, request):
+        if not self.keyset_enabled:
+            return super().get_results(request)
+        # Aucun COUNT(*) : la page est une simple tranche du queryset
+        self.result_list = self.queryset[:self.list_per_page]
+        self.paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+        self.result_count = len(self.result_list)
+        self.full_result_count = None
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.can_show_all = False
+        self.multi_page = False
+
+    def first_page_url(self):
+        return self.get_query_string(remove=[CURSOR_VAR])
+
+    def next_page_url(self):
+        """URL de la page suivante, ou None si la page n'est pas pleine"""
+        rows = list(self.result_list)
+        if len(rows) < self.list_per_page:
+            return None
+        return self.get_query_string({CURSOR_VAR: rows[-1].pk})
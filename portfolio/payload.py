@@ -0,0 +1,342 @@
+# portfolio/payload.py
+# Construction des données publiques du portfolio (API complète, API par
+# sections chargées à la demande et synchronisation différentielle à partir
+# du journal des modifications)
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from .cache import get_content_version
+from .models import Profile, Competence, Projet, Experience, Modification
+from .records import EXPERIENCE_FIELDS, PROJET_FIELDS, PROJET_RESUME_FIELDS, iter_records, media_url
+
+# Libellés des choix (équivalents de get_..._display pour les lignes lues par records.py)
+STATUTS = dict(Projet.STATUS_CHOICES)
+TYPES_EXPERIENCE = dict(Experience.TYPES)
+
+# Durée de vie (secondes) de la liste des fichiers média publiés (clé suivant la version du contenu)
+MEDIA_CACHE_TIMEOUT = 3600
+
+
+def serialize_profile(profile):
+    """Données publiques du profil"""
+    return {
+        'nom': profile.nom,
+        'titre': profile.titre,
+        'email': profile.email,
+        'telephone': profile.telephone,
+        'bio': profile.bio,
+        'description_longue': profile.description_longue,
+        'ville': profile.ville,
+        'pays': profile.pays,
+        'photo': profile.photo.url if profile.photo else None,
+        'cv': profile.cv.url if profile.cv else None,
+        'linkedin': profile.linkedin,
+        'github': profile.github,
+        'twitter': profile.twitter,
+        'website': profile.website,
+    }
+
+
+def serialize_competence(competence):
+    """Données publiques d'une compétence"""
+    return {
+        'id': competence.id,
+        'nom': competence.nom,
+        'categorie': competence.categorie,
+        'categorie_display': competence.get_categorie_display(),
+        'niveau': competence.niveau,
+        'icone': competence.icone,
+        'couleur': competence.couleur,
+        'ordre': competence.ordre
+    }
+
+
+def serialize_projet(projet, references=None):
+    """Données publiques d'un projet ; `references` : compétences -> ids (forme normalisée)"""
+    technologies = projet.technologies.all()
+    return {
+        'id': projet.id,
+        'titre': projet.titre,
+        'description_courte': projet.description_courte,
+        'description_longue': projet.description_longue,
+        'image_principale': projet.image_principale.url if projet.image_principale else None,
+        'image_2': projet.image_2.url if projet.image_2 else None,
+        'image_3': projet.image_3.url if projet.image_3 else None,
+        'technologies': references(technologies) if references else
+                        [{'nom': tech.nom, 'couleur': tech.couleur} for tech in technologies],
+        'url_demo': projet.url_demo,
+        'url_code': projet.url_code,
+        'url_case_study': projet.url_case_study,
+        'statut': projet.statut,
+        'statut_display': projet.get_statut_display(),
+        'date_debut': projet.date_debut.isoformat() if projet.date_debut else None,
+        'date_fin': projet.date_fin.isoformat() if projet.date_fin else None,
+        'featured': projet.featured,
+        'ordre': projet.ordre,
+        'vues': projet.vues
+    }
+
+
+def serialize_experience(experience, references=None):
+    """Données publiques d'une expérience ; `references` comme pour serialize_projet"""
+    acquises = experience.competences_acquises.all()
+    return {
+        'id': experience.id,
+        'type_experience': experience.type_experience,
+        'type_display': experience.get_type_experience_display(),
+        'titre': experience.titre,
+        'entreprise': experience.entreprise,
+        'lieu': experience.lieu,
+        'date_debut': experience.date_debut.isoformat() if experience.date_debut else None,
+        'date_fin': experience.date_fin.isoformat() if experience.date_fin else None,
+        'est_en_cours': experience.est_en_cours,
+        'description': experience.description,
+        'competences_acquises': references(acquises) if references else [comp.nom for comp in acquises]
+    }
+
+
+def serialize_projet_row(row, technologies, references=None):
+    """Comme serialize_projet, pour une ligne de projet_records (sans instance de modèle)"""
+    return {
+        'id': row.id,
+        'titre': row.titre,
+        'description_courte': row.description_courte,
+        'description_longue': row.description_longue,
+        'image_principale': media_url(row.image_principale),
+        'image_2': media_url(row.image_2),
+        'image_3': media_url(row.image_3),
+        'technologies': references(technologies) if references else
+                        [{'nom': tech.nom, 'couleur': tech.couleur} for tech in technologies],
+        'url_demo': row.url_demo,
+        'url_code': row.url_code,
+        'url_case_study': row.url_case_study,
+        'statut': row.statut,
+        'statut_display': STATUTS.get(row.statut, row.statut),
+        'date_debut': row.date_debut.isoformat() if row.date_debut else None,
+        'date_fin': row.date_fin.isoformat() if row.date_fin else None,
+        'featured': row.featured,
+        'ordre': row.ordre,
+        'vues': row.vues
+    }
+
+
+def serialize_projet_resume(row, technologies):
+    """Données d'un projet pour les listes (sans description longue ni images secondaires)"""
+    return {
+        'id': row.id,
+        'titre': row.titre,
+        'description_courte': row.description_courte,
+        'image_principale': media_url(row.image_principale),
+        'technologies': [{'nom': tech.nom, 'couleur': tech.couleur} for tech in technologies],
+        'url_demo': row.url_demo,
+        'url_code': row.url_code,
+        'statut': row.statut,
+        'statut_display': STATUTS.get(row.statut, row.statut),
+        'date_debut': row.date_debut.isoformat() if row.date_debut else None,
+        'featured': row.featured,
+        'ordre': row.ordre,
+    }
+
+
+def serialize_experience_row(row, competences, references=None):
+    """Comme serialize_experience, pour une ligne de experience_records"""
+    return {
+        'id': row.id,
+        'type_experience': row.type_experience,
+        'type_display': TYPES_EXPERIENCE.get(row.type_experience, row.type_experience),
+        'titre': row.titre,
+        'entreprise': row.entreprise,
+        'lieu': row.lieu,
+        'date_debut': row.date_debut.isoformat() if row.date_debut else None,
+        'date_fin': row.date_fin.isoformat() if row.date_fin else None,
+        'est_en_cours': row.date_fin is None,
+        'description': row.description,
+        'competences_acquises': references(competences) if references else [comp.nom for comp in competences]
+    }
+
+
+def projet_records(queryset, fields=PROJET_FIELDS):
+    """(ligne, compétences) des projets de `queryset` : chemin rapide des grandes listes"""
+    return iter_records(queryset, fields, 'technologies')
+
+
+def experience_records(queryset):
+    return iter_records(queryset, EXPERIENCE_FIELDS, 'competences_acquises')
+
+
+# Éléments publiés d'un portfolio : seuls les objets actifs, dans l'ordre d'affichage
+def published_profile(tenant_id):
+    return Profile.objects.filter(pk=tenant_id, actif=True).first() if tenant_id else None
+
+
+def published_competences(tenant_id):
+    return Competence.objects.for_tenant(tenant_id).filter(actif=True).order_by('ordre', 'nom')
+
+
+def published_projets(tenant_id):
+    return (Projet.objects.for_tenant(tenant_id).filter(actif=True)
+            .order_by('-featured', 'ordre', '-date_debut').prefetch_related('technologies'))
+
+
+def published_experiences(tenant_id):
+    return (Experience.objects.for_tenant(tenant_id).filter(actif=True).order_by('-date_debut')
+            .prefetch_related('competences_acquises'))
+
+
+def published_media(tenant_id):
+    """Fichiers média du contenu publié : photo et CV du profil, images des projets actifs"""
+    key = 'portfolio:media:%s:%s' % (tenant_id, get_content_version(tenant_id))
+    paths = cache.get(key)
+    if paths is None:
+        paths = set()
+        if tenant_id:
+            paths.update(*Profile.objects.filter(pk=tenant_id, actif=True).values_list('photo', 'cv'))
+        for images in (Projet.objects.for_tenant(tenant_id).filter(actif=True)
+                       .values_list('image_principale', 'image_2', 'image_3')):
+            paths.update(images)
+        paths.discard('')
+        paths.discard(None)
+        cache.set(key, paths, MEDIA_CACHE_TIMEOUT)
+    return paths
+
+
+def build_portfolio_data(tenant_id=None, normalized=False):
+    """Données du portfolio ; `normalized` remplace les compétences imbriquées par leurs ids"""
+    # Version lue avant les données : une modification concurrente sera rejouée
+    version = Modification.latest_sequence(tenant_id)
+    profile = published_profile(tenant_id)
+    data = {
+        'success': True,
+        'version': version,
+        'profile': serialize_profile(profile) if profile else None,
+        'competences': [serialize_competence(c) for c in published_competences(tenant_id)],
+        'projets': [],
+        'experiences': []
+    }
+    
+    references = None
+    if normalized:
+        # Compétences référencées mais absentes de la liste (inactives)
+        annexes = {}
+        listees = {competence['id'] for competence in data['competences']}
+        
+        def references(related):
+            """Ids des compétences liées, en gardant une trace des compétences non listées"""
+            ids = []
+            for comp in related:
+                ids.append(comp.id)
+                if comp.id not in listees and comp.id not in annexes:
+                    annexes[comp.id] = {'id': comp.id, 'nom': comp.nom, 'couleur': comp.couleur, 'icone': comp.icone}
+            return ids
+    
+    data['projets'] = [serialize_projet_row(row, technologies, references)
+                       for row, technologies in projet_records(published_projets(tenant_id))]
+    data['experiences'] = [serialize_experience_row(row, competences, references)
+                           for row, competences in experience_records(published_experiences(tenant_id))]
+    
+    if normalized:
+        data['forme'] = 'normalisee'
+        data['competences_annexes'] = list(annexes.values())
+    return data
+
+
+def build_accueil_section(tenant_id):
+    """Premier écran : profil et quelques projets mis en avant"""
+    profile = published_profile(tenant_id)
+    projets = published_projets(tenant_id).filter(featured=True)[:settings.ACCUEIL_PROJETS]
+    return {
+        'profile': serialize_profile(profile) if profile else None,
+        'projets': [serialize_projet_resume(*record) for record in projet_records(projets, PROJET_RESUME_FIELDS)],
+    }
+
+
+# Sections de l'API chargées à la demande : nom -> construction des données
+SECTIONS = {
+    'accueil': build_accueil_section,
+    'competences': lambda tenant_id: {
+        'competences': [serialize_competence(c) for c in published_competences(tenant_id)],
+    },
+    'projets': lambda tenant_id: {
+        'projets': [serialize_projet_resume(*record)
+                    for record in projet_records(published_projets(tenant_id), PROJET_RESUME_FIELDS)],
+    },
+    'experiences': lambda tenant_id: {
+        'experiences': [serialize_experience_row(*record)
+                        for record in experience_records(published_experiences(tenant_id))],
+    },
+}
+
+
+def section_cache_key(tenant_id, section, fmt):
+    """Clé de la réponse encodée d'une section dans le cache à deux niveaux"""
+    return 'portfolio:api:section:%s:%s:%s' % (tenant_id, section, fmt)
+
+
+def build_portfolio_section(section, tenant_id=None):
+    """Données d'une section (KeyError si elle n'existe pas)"""
+    build = SECTIONS[section]
+    version = Modification.latest_sequence(tenant_id)
+    return {'success': True, 'section': section, 'version': version, **build(tenant_id)}
+
+
+def build_projet_detail(projet_id, tenant_id=None):
+    """Données complètes d'un projet publié (Projet.DoesNotExist sinon)"""
+    return {'success': True, 'projet': serialize_projet(published_projets(tenant_id).get(pk=projet_id))}
+
+
+def build_portfolio_changes(since, tenant_id=None):
+    """Modifications postérieures à la version `since` : objets à remplacer et ids supprimés
+    
+    Retourne None si le journal ne remonte plus jusqu'à `since` (rechargement complet).
+    """
+    if since < Modification.purged_sequence(tenant_id):
+        return None
+    journal = Modification.objects.for_tenant(tenant_id)
+    recent = Q(id__gt=since)
+    # Les numéros sont attribués avant la validation : une transaction validée après la lecture
+    # de `since` peut porter un numéro inférieur. Les entrées créées peu avant `since` sont relues.
+    window = settings.MODIFICATIONS_REREAD_WINDOW
+    anchor = journal.filter(id=since).values_list('cree_le', flat=True).first() if since and window else None
+    if anchor is not None:
+        recent |= Q(id__lt=since, cree_le__gte=anchor - timedelta(seconds=window))
+    changed = {}
+    version = since
+    for sequence, type_objet, objet_id in journal.filter(recent).values_list('id', 'type_objet', 'objet_id'):
+        changed.setdefault(type_objet, set()).add(objet_id)
+        version = max(version, sequence)
+    
+    # Les projets et expériences embarquent le nom et la couleur des compétences
+    competences = changed.get(Modification.COMPETENCE, set())
+    if competences:
+        changed.setdefault(Modification.PROJET, set()).update(
+            Projet.technologies.through.objects.filter(competence_id__in=competences)
+            .values_list('projet_id', flat=True))
+        changed.setdefault(Modification.EXPERIENCE, set()).update(
+            Experience.competences_acquises.through.objects.filter(competence_id__in=competences)
+            .values_list('experience_id', flat=True))
+    
+    data = {'success': True, 'since': since, 'version': version, 'upserts': {}, 'suppressions': {}}
+    if Modification.PROFILE in changed:
+        profile = published_profile(tenant_id)
+        data['upserts']['profile'] = serialize_profile(profile) if profile else None
+    
+    # Un objet désactivé ou supprimé disparaît des données publiques
+    for type_objet, cle, queryset, serialize in (
+        (Modification.COMPETENCE, 'competences', published_competences(tenant_id),
+         lambda objects: [serialize_competence(c) for c in objects]),
+        (Modification.PROJET, 'projets', published_projets(tenant_id),
+         lambda objects: [serialize_projet_row(*record) for record in projet_records(objects)]),
+        (Modification.EXPERIENCE, 'experiences', published_experiences(tenant_id),
+         lambda objects: [serialize_experience_row(*record) for record in experience_records(objects)]),
+    ):
+        ids = changed.get(type_objet)
+        if not ids:
+            continue
+        upserts = serialize(queryset.filter(pk__in=ids))
+        data['upserts'][cle] = upserts
+        data['suppressions'][cle] = sorted(ids - {obj['id'] for obj in upserts})
+    return data
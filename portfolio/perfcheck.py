@@ -0,0 +1,295 @@
+# portfolio/perfcheck.py
+# Bilan de santé des performances avant déploiement (commande perfcheck) :
+# résolution des URLs et imports des vues (comme debug_urls.py), requêtes SQL,
+# taille et durée des points d'accès publics comparées à leur budget, index
+# manquants sur les requêtes exécutées, temps de rendu du template principal,
+# configuration (cache, compression, WAL, connexions persistantes) et fichiers
+# média trop lourds. Chaque vérification produit un résultat sérialisable en JSON.
+
+import json
+import os
+import statistics
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.db import connections
+from django.template.loader import get_template
+from django.test import Client
+from django.urls import get_resolver, resolve, reverse
+
+from .cache import get_content_version
+from .loadtest import current_commit
+from .payload import SECTIONS, published_competences, published_profile, published_projets
+from .tenants import resolve_tenant_id
+
+OK, INFO, AVERTISSEMENT, ERREUR = 'ok', 'info', 'avertissement', 'erreur'
+GRAVITE = {OK: 0, INFO: 0, AVERTISSEMENT: 1, ERREUR: 2}
+
+
+class Result:
+    """Résultat d'une vérification"""
+
+    def __init__(self, categorie, nom, statut, message, **valeurs):
+        self.categorie = categorie
+        self.nom = nom
+        self.statut = statut
+        self.message = message
+        self.valeurs = valeurs
+
+    def to_dict(self):
+        return {'categorie': self.categorie, 'nom': self.nom, 'statut': self.statut,
+                'message': self.message, 'valeurs': self.valeurs}
+
+
+class QueryRecorder:
+    """Requêtes SELECT exécutées (alias, SQL, paramètres) sur toutes les connexions"""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if not many and sql.lstrip().upper().startswith('SELECT'):
+            self.queries.append((context['connection'].alias, sql, params))
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        self.wrappers = [connection.execute_wrapper(self) for connection in connections.all()]
+        for wrapper in self.wrappers:
+            wrapper.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        for wrapper in reversed(self.wrappers):
+            wrapper.__exit__(*exc)
+
+
+def public_endpoints(tenant_id):
+    """(nom, chemin) des points d'accès publics en lecture du portfolio `tenant_id`"""
+    endpoints = [
+        ('index', reverse('index')),
+        ('api_portfolio_data', reverse('api_portfolio_data')),
+        ('api_portfolio_data (normalisée)', reverse('api_portfolio_data') + '?forme=normalisee'),
+        *((f'api_portfolio_section ({section})', reverse('api_portfolio_section', args=[section]))
+          for section in SECTIONS),
+        ('api_portfolio_changes', reverse('api_portfolio_changes') + '?since=0'),
+        ('api_stats', reverse('api_stats')),
+        ('api_portfolio_stats', reverse('api_portfolio_stats')),
+    ]
+    skill_id = published_competences(tenant_id).values_list('pk', flat=True).first()
+    if skill_id is not None:
+        endpoints.append(('api_skill_related', reverse('api_skill_related', args=[skill_id])))
+    project_id = published_projets(tenant_id).values_list('pk', flat=True).first()
+    if project_id is not None:
+        endpoints.append(('api_project_detail', reverse('api_project_detail', args=[project_id])))
+    return endpoints
+
+
+def check_urls():
+    """Chargement des URLs, des vues et des gestionnaires d'erreurs (voir debug_urls.py)"""
+    results = []
+    try:
+        patterns = get_resolver().url_patterns
+    except Exception as exc:
+        return [Result('urls', 'resolver', ERREUR, f"Chargement des URLs impossible : {exc}")]
+    results.append(Result('urls', 'resolver', OK, f"{len(patterns)} motifs d'URL", motifs=len(patterns)))
+    try:
+        import_module('portfolio.views')
+    except Exception as exc:
+        results.append(Result('urls', 'vues', ERREUR, f"Import de portfolio.views impossible : {exc}"))
+    root = import_module(settings.ROOT_URLCONF)
+    for name in ('handler400', 'handler403', 'handler404', 'handler500'):
+        handler = getattr(root, name, None)
+        if isinstance(handler, str):
+            module, _, attribute = handler.rpartition('.')
+            try:
+                getattr(import_module(module), attribute)
+            except (ImportError, AttributeError) as exc:
+                results.append(Result('urls', name, ERREUR, f"Gestionnaire introuvable : {exc}"))
+    return results
+
+
+def measure_endpoints(host, max_bytes):
+    """Requêtes SQL, taille et durée des points d'accès ; requêtes SELECT enregistrées pour l'analyse des index"""
+    client = Client(HTTP_HOST=host, raise_request_exception=False)
+    results, recorded = [], []
+    for name, path in public_endpoints(resolve_tenant_id(host)):
+        budget = getattr(resolve(path.split('?')[0]).func, 'query_budget', None)
+        mesures = []
+        # Premier appel (caches éventuellement froids) puis appel suivant
+        for _ in range(2):
+            with QueryRecorder() as recorder:
+                start = time.perf_counter()
+                response = client.get(path, HTTP_ACCEPT_ENCODING='gzip')
+                duration = (time.perf_counter() - start) * 1000
+            content = b''.join(response) if response.streaming else response.content
+            mesures.append((response.status_code, len(recorder.queries), len(content), duration))
+            recorded.extend(recorder.queries)
+        (status, queries, size, duration), (_, warm_queries, _, warm_duration) = mesures
+        valeurs = {
+            'chemin': path, 'statut_http': status, 'requetes': queries, 'requetes_suivant': warm_queries,
+            'budget': budget.max_queries if budget else None, 'octets': size,
+            'compresse': response.get('Content-Encoding') == 'gzip',
+            'duree_ms': round(duration, 2), 'duree_suivant_ms': round(warm_duration, 2),
+        }
+        if status >= 500:
+            statut, message = ERREUR, f"Réponse {status}"
+        elif budget and queries > budget.max_queries:
+            statut, message = ERREUR, f"{queries} requêtes SQL pour un budget de {budget.max_queries}"
+        elif status >= 400:
+            statut, message = AVERTISSEMENT, f"Réponse {status}"
+        elif size > max_bytes:
+            statut, message = AVERTISSEMENT, f"Réponse de {size} octets (> {max_bytes})"
+        else:
+            statut, message = OK, f"{queries} requêtes, {size} octets, {duration:.1f} ms"
+        results.append(Result('points_acces', name, statut, message, **valeurs))
+    return results, recorded
+
+
+def full_scans(alias, sql, params):
+    """Tables parcourues intégralement par une requête (plan d'exécution de la base)"""
+    connection = connections[alias]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            # « SCAN table » : parcours complet ; « SCAN table USING [COVERING] INDEX » n'en est pas un
+            details = [row[-1].split() for row in cursor.fetchall()]
+            return {words[1] for words in details if words[:1] == ['SCAN'] and 'INDEX' not in words}
+        if connection.vendor == 'postgresql':
+            cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+            plan = cursor.fetchone()[0]
+            plan = json.loads(plan) if isinstance(plan, str) else plan
+            tables, nodes = set(), [plan[0]['Plan']]
+            while nodes:
+                node = nodes.pop()
+                if node.get('Node Type') == 'Seq Scan':
+                    tables.add(node['Relation Name'])
+                nodes.extend(node.get('Plans', []))
+            return tables
+    return set()
+
+
+def check_indexes(queries, min_rows):
+    """Parcours complets de tables dans les requêtes des points d'accès (au-delà de `min_rows` lignes)"""
+    scans = {}
+    for alias, sql, params in dict.fromkeys((a, s, tuple(p or ())) for a, s, p in queries):
+        for table in full_scans(alias, sql, params):
+            scans.setdefault((alias, table), []).append(sql)
+    results = []
+    for (alias, table), statements in sorted(scans.items()):
+        with connections[alias].cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM %s' % connections[alias].ops.quote_name(table))
+            rows = cursor.fetchone()[0]
+        statut = AVERTISSEMENT if rows >= min_rows else INFO
+        results.append(Result('index', table, statut, f"Parcours complet ({rows} lignes) dans {len(statements)} requête(s)",
+                              base=alias, lignes=rows, requetes=statements[:5]))
+    if not results:
+        results.append(Result('index', 'requetes', OK, "Aucun parcours complet de table",
+                              requetes=len(queries)))
+    return results
+
+
+def check_template(host, iterations, max_ms):
+    """Temps de rendu du template principal (contexte de la vue index)"""
+    tenant_id = resolve_tenant_id(host)
+    context = {
+        'tenant_id': tenant_id,
+        'content_version': get_content_version(tenant_id),
+        'fragment_timeout': settings.TEMPLATE_FRAGMENT_TIMEOUT,
+        'profile': published_profile(tenant_id),
+    }
+    durations = []
+    try:
+        for _ in range(iterations):
+            start = time.perf_counter()
+            get_template('index.html').render(context)
+            durations.append((time.perf_counter() - start) * 1000)
+    except Exception as exc:
+        return [Result('template', 'index.html', ERREUR, f"Rendu impossible : {exc}")]
+    median = statistics.median(durations)
+    statut = AVERTISSEMENT if median > max_ms else OK
+    return [Result('template', 'index.html', statut, f"Rendu en {median:.2f} ms (médiane, premier : {durations[0]:.2f} ms)",
+                   premier_ms=round(durations[0], 2), mediane_ms=round(median, 2),
+                   cache_templates=settings.TEMPLATE_CACHE)]
+
+
+def check_configuration(endpoint_results):
+    """Cache, compression, mode WAL de SQLite et connexions persistantes"""
+    results = []
+    backend = settings.CACHES['default']['BACKEND']
+    if backend.endswith('DummyCache'):
+        results.append(Result('configuration', 'cache', ERREUR, "Cache désactivé (DummyCache)", backend=backend))
+    elif backend.endswith('LocMemCache'):
+        results.append(Result('configuration', 'cache', AVERTISSEMENT,
+                              "Cache local à chaque processus (LocMemCache) : non partagé entre les workers",
+                              backend=backend))
+    else:
+        results.append(Result('configuration', 'cache', OK, "Cache partagé", backend=backend))
+
+    middleware = 'django.middleware.gzip.GZipMiddleware' in settings.MIDDLEWARE
+    compressed = any(r.valeurs.get('compresse') for r in endpoint_results)
+    if middleware or compressed:
+        results.append(Result('configuration', 'compression', OK, "Réponses compressées", middleware=middleware))
+    else:
+        results.append(Result('configuration', 'compression', AVERTISSEMENT,
+                              "Aucune compression dans l'application : à assurer par le serveur frontal",
+                              middleware=False))
+
+    for alias in connections:
+        connection = connections[alias]
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA journal_mode')
+                mode = cursor.fetchone()[0]
+            statut = OK if mode.lower() == 'wal' else AVERTISSEMENT
+            results.append(Result('configuration', f'wal ({alias})', statut,
+                                  f"Journal SQLite en mode {mode}", journal_mode=mode))
+        max_age = connection.settings_dict.get('CONN_MAX_AGE', 0)
+        if max_age is None or max_age > 0:
+            results.append(Result('configuration', f'connexions ({alias})', OK,
+                                  "Connexions persistantes", conn_max_age=max_age))
+        else:
+            # Ouvrir une connexion SQLite ne coûte presque rien, contrairement à PostgreSQL
+            statut = INFO if connection.vendor == 'sqlite' else AVERTISSEMENT
+            results.append(Result('configuration', f'connexions ({alias})', statut,
+                                  "Nouvelle connexion à chaque requête (CONN_MAX_AGE=0)", conn_max_age=max_age))
+    return results
+
+
+def check_media(max_bytes):
+    """Fichiers de MEDIA_ROOT plus lourds que `max_bytes`"""
+    root = str(settings.MEDIA_ROOT)
+    oversized = []
+    for directory, _, files in os.walk(root):
+        for name in files:
+            path = os.path.join(directory, name)
+            size = os.path.getsize(path)
+            if size > max_bytes:
+                oversized.append((os.path.relpath(path, root), size))
+    results = [Result('media', path, AVERTISSEMENT, f"{size} octets (> {max_bytes})", octets=size)
+               for path, size in sorted(oversized, key=lambda item: -item[1])]
+    return results or [Result('media', 'MEDIA_ROOT', OK, f"Aucun fichier de plus de {max_bytes} octets")]
+
+
+def run_checks(host='localhost', max_bytes=256 * 1024, min_rows=1000, render_iterations=20,
+               max_render_ms=50, max_media_bytes=2 * 1024 * 1024):
+    """Toutes les vérifications, dans l'ordre du rapport"""
+    results = check_urls()
+    endpoint_results, queries = measure_endpoints(host, max_bytes)
+    results += endpoint_results
+    results += check_indexes(queries, min_rows)
+    results += check_template(host, render_iterations, max_render_ms)
+    results += check_configuration(endpoint_results)
+    results += check_media(max_media_bytes)
+    return results
+
+
+def build_report(results):
+    worst = max((r.statut for r in results), key=GRAVITE.get, default=OK)
+    return {
+        'version': 1,
+        'commit': current_commit(),
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'statut': OK if GRAVITE[worst] == 0 else worst,
+        'resultats': [r.to_dict() for r in results],
+    }
@@ -0,0 +1,152 @@
+# portfolio/profiling.py
+# Profilage à la demande d'une requête : déclenché par un en-tête signé
+# (jeton produit par la commande profiling_token) ou par tirage au sort
+# (PROFILING_SAMPLE_RATE). Deux modes : cProfile (fichier pstats) ou
+# échantillonnage périodique de la pile du thread de la requête (format
+# « collapsed stacks » des flame graphs). Les derniers profils sont consultables
+# dans l'administration. Désactivé (PROFILING_ENABLED=False), le middleware est
+# retiré de la chaîne par Django : aucun coût.
+
+import cProfile
+import io
+import marshal
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .models import ProfilRequete
+
+SIGNING_SALT = 'portfolio.profiling'
+
+
+def make_token(mode=ProfilRequete.CPROFILE):
+    """Valeur de l'en-tête de déclenchement (valable PROFILING_TOKEN_MAX_AGE secondes)"""
+    return signing.dumps({'mode': mode}, salt=SIGNING_SALT)
+
+
+def read_token(value):
+    """Mode demandé par un jeton valide, None sinon"""
+    try:
+        mode = signing.loads(value, salt=SIGNING_SALT, max_age=settings.PROFILING_TOKEN_MAX_AGE).get('mode')
+    except (signing.BadSignature, AttributeError):
+        return None
+    return mode if mode in dict(ProfilRequete.MODES) else None
+
+
+class StackSampler:
+    """Relève périodiquement la pile d'un thread (thread d'échantillonnage séparé)"""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        # pile « module:fonction;... » (de la racine vers la feuille) -> échantillons
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True, name='profiling-sampler')
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stopped.set()
+        self.thread.join()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{frame.f_globals.get('__name__', '?')}:{code.co_name}")
+                frame = frame.f_back
+            if names:
+                self.stacks[';'.join(reversed(names))] += 1
+
+    def collapsed(self):
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common()).encode()
+
+
+def profile_call(mode, call):
+    """Exécute `call()` sous profilage ; retourne (résultat, données du profil)"""
+    if mode == ProfilRequete.CPROFILE:
+        profiler = cProfile.Profile()
+        result = profiler.runcall(call)
+        profiler.create_stats()
+        return result, marshal.dumps(profiler.stats)
+    with StackSampler(threading.get_ident(), settings.PROFILING_SAMPLE_INTERVAL) as sampler:
+        result = call()
+    return result, sampler.collapsed()
+
+
+def summarize(profil, limit=40):
+    """Résumé lisible d'un profil : fonctions les plus coûteuses ou piles les plus fréquentes"""
+    if profil.mode == ProfilRequete.CPROFILE:
+        output = io.StringIO()
+        stats = pstats.Stats(stream=output)
+        stats.stats = marshal.loads(bytes(profil.donnees))
+        stats.get_top_level_stats()
+        stats.sort_stats('cumulative').print_stats(limit)
+        return output.getvalue()
+    lines = bytes(profil.donnees).decode().splitlines()
+    total = sum(int(line.rsplit(' ', 1)[1]) for line in lines) or 1
+    return '\n'.join(f"{int(line.rsplit(' ', 1)[1]) * 100 / total:5.1f} %  {line.rsplit(' ', 1)[0]}"
+                     for line in lines[:limit])
+
+
+class ProfilingMiddleware:
+    """Profile les requêtes demandées (en-tête signé) ou tirées au sort"""
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.header = 'HTTP_' + settings.PROFILING_HEADER.upper().replace('-', '_')
+
+    def __call__(self, request):
+        token = request.META.get(self.header)
+        mode = read_token(token) if token else None
+        sampled = mode is None and random.random() < settings.PROFILING_SAMPLE_RATE
+        if sampled:
+            mode = settings.PROFILING_SAMPLE_MODE
+        if mode is None:
+            return self.get_response(request)
+
+        queries = [0]
+
+        def count(execute, sql, params, many, context):
+            queries[0] += 1
+            return execute(sql, params, many, context)
+
+        wrappers = [connection.execute_wrapper(count) for connection in connections.all()]
+        for wrapper in wrappers:
+            wrapper.__enter__()
+        start = time.perf_counter()
+        try:
+            response, data = profile_call(mode, lambda: self.get_response(request))
+        finally:
+            for wrapper in wrappers:
+                wrapper.__exit__(None, None, None)
+        duration = (time.perf_counter() - start) * 1000
+        profil = ProfilRequete.objects.create(
+            methode=request.method, chemin=request.get_full_path()[:500], statut=response.status_code,
+            duree_ms=duration, requetes_sql=queries[0], mode=mode, echantillonne=sampled, donnees=data,
+        )
+        prune_profiles()
+        response['X-Profile-Id'] = str(profil.pk)
+        return response
+
+
+def prune_profiles(keep=None):
+    """Supprime les profils au-delà des PROFILING_KEEP plus récents"""
+    keep = settings.PROFILING_KEEP if keep is None else keep
+    cutoff = list(ProfilRequete.objects.order_by('-id').values_list('id', flat=True)[keep:keep + 1])
+    return ProfilRequete.objects.filter(id__lte=cutoff[0]).delete()[0] if cutoff else 0
@@ -0,0 +1,151 @@
+# portfolio/querybudget.py
+# Budget de requêtes SQL par vue : nombre total de requêtes et répétitions
+# d'une même forme de requête (signature d'un N+1). Dépassement : exception
+# pendant les tests (ou avec QUERY_BUDGET_RAISE), avertissement journalisé sinon
+# (formes fautives et pile d'appels). Vues synchrones seulement : les requêtes
+# d'une vue asynchrone s'exécutent dans d'autres threads et ne seraient pas comptées.
+
+import asyncio
+import logging
+import re
+import traceback
+from collections import namedtuple
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# Listes de paramètres : IN (%s, %s, ...) -> IN (...)
+IN_LIST_RE = re.compile(r'IN \((?:%s, )*%s\)')
+SPACES_RE = re.compile(r'\s+')
+
+# Budget déclaré d'une vue ; `methods` : méthodes HTTP concernées (None : toutes)
+Limits = namedtuple('Limits', ['max_queries', 'max_repeats', 'methods'])
+
+
+class QueryBudgetExceeded(Exception):
+    """Budget de requêtes dépassé"""
+
+
+def fingerprint(sql):
+    """Forme d'une requête : SQL paramétré, listes IN réduites, espaces normalisés"""
+    return SPACES_RE.sub(' ', IN_LIST_RE.sub('IN (...)', sql)).strip()
+
+
+def capture_stack(limit=8):
+    """Dernières lignes de la pile d'appels situées dans le projet"""
+    base = str(Path(settings.BASE_DIR))
+    frames = [frame for frame in traceback.extract_stack()[:-2]
+              if frame.filename.startswith(base) and 'site-packages' not in frame.filename]
+    return ''.join(traceback.format_list(frames[-limit:]))
+
+
+class QueryBudget:
+    """Compte les requêtes d'un traitement (toutes les bases) et vérifie le budget
+
+    Utilisable comme contexte : `with QueryBudget(5): ...` vérifie à la sortie.
+    """
+
+    def __init__(self, max_queries, max_repeats=None, label=None):
+        self.max_queries = max_queries
+        self.max_repeats = settings.QUERY_BUDGET_MAX_REPEATS if max_repeats is None else max_repeats
+        self.label = label
+        self.total = 0
+        # forme -> nombre d'exécutions
+        self.counts = {}
+        # forme -> pile d'appels, relevée au premier dépassement
+        self.stacks = {}
+        self.wrappers = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.stop()
+        if exc_type is None:
+            self.check()
+
+    def start(self):
+        for connection in connections.all():
+            wrapper = connection.execute_wrapper(self._record)
+            wrapper.__enter__()
+            self.wrappers.append(wrapper)
+        return self
+
+    def stop(self):
+        while self.wrappers:
+            self.wrappers.pop().__exit__(None, None, None)
+
+    def _record(self, execute, sql, params, many, context):
+        shape = fingerprint(sql)
+        count = self.counts[shape] = self.counts.get(shape, 0) + 1
+        self.total += 1
+        # Pile relevée seulement au dépassement : coût nul dans le cas normal
+        if count == self.max_repeats + 1 or self.total == self.max_queries + 1:
+            self.stacks.setdefault(shape, capture_stack())
+        return execute(sql, params, many, context)
+
+    def violations(self):
+        """Descriptions des dépassements (liste vide si le budget est respecté)"""
+        problems = []
+        if self.total > self.max_queries:
+            problems.append('%d requêtes pour un budget de %d' % (self.total, self.max_queries))
+        for shape, count in sorted(self.counts.items(), key=lambda item: -item[1]):
+            if count > self.max_repeats:
+                problems.append('%d exécutions de la même requête (N+1 ?) : %s' % (count, shape))
+        return problems
+
+    def report(self, problems):
+        lines = ['Budget de requêtes dépassé (%s)' % (self.label or 'traitement')]
+        lines += ['- ' + problem for problem in problems]
+        for shape, stack in self.stacks.items():
+            lines.append('Pile de %s\n%s' % (shape[:200], stack))
+        return '\n'.join(lines)
+
+    def check(self):
+        """Lève QueryBudgetExceeded (développement, tests) ou journalise un avertissement"""
+        problems = self.violations()
+        if not problems:
+            return
+        report = self.report(problems)
+        if settings.QUERY_BUDGET_RAISE:
+            raise QueryBudgetExceeded(report)
+        logger.warning(report)
+
+
+def query_budget(max_queries, max_repeats=None, methods=None):
+    """Déclare le budget de requêtes d'une vue synchrone (vérifié par QueryBudgetMiddleware)"""
+    def decorator(view):
+        if asyncio.iscoroutinefunction(view):
+            raise TypeError("query_budget : les requêtes d'une vue asynchrone ne peuvent pas être comptées")
+        view.query_budget = Limits(max_queries, max_repeats, methods)
+        return view
+    return decorator
+
+
+class QueryBudgetMiddleware:
+    """Vérifie le budget déclaré par la vue appelée (rendu des gabarits compris)"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.query_budget = None
+        try:
+            response = self.get_response(request)
+        finally:
+            if request.query_budget is not None:
+                request.query_budget.stop()
+        if request.query_budget is not None:
+            request.query_budget.check()
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        limits = getattr(view_func, 'query_budget', None)
+        if limits is None or not settings.QUERY_BUDGET_ENABLED:
+            return
+        if limits.methods is None or request.method in limits.methods:
+            request.query_budget = QueryBudget(limits.max_queries, limits.max_repeats,
+                                               label=request.path).start()
@@ -0,0 +1,69 @@
+# portfolio/records.py
+# Lecture légère des projets et expériences pour sérialiser de grands
+# volumes : tuples nommés lus par values_list(...).iterator() au lieu
+# d'instances de modèles, et compétences liées jointes depuis une table
+# compacte id -> Skill (une seule instance par compétence, partagée par
+# toutes les lignes) au lieu de prefetch_related.
+
+from collections import namedtuple
+
+from django.core.files.storage import default_storage
+
+from .models import Competence
+
+# Compétence liée (attributs lus par les sérialiseurs : id, nom, couleur, icone)
+Skill = namedtuple('Skill', 'id nom couleur icone')
+
+# Lignes lues par itérateur, par lots
+CHUNK_SIZE = 2000
+
+PROJET_FIELDS = (
+    'id', 'titre', 'description_courte', 'description_longue', 'image_principale', 'image_2', 'image_3',
+    'url_demo', 'url_code', 'url_case_study', 'statut', 'date_debut', 'date_fin', 'featured', 'ordre', 'vues',
+)
+PROJET_RESUME_FIELDS = (
+    'id', 'titre', 'description_courte', 'image_principale', 'url_demo', 'url_code', 'statut',
+    'date_debut', 'featured', 'ordre',
+)
+EXPERIENCE_FIELDS = (
+    'id', 'type_experience', 'titre', 'entreprise', 'lieu', 'date_debut', 'date_fin', 'description',
+)
+
+
+def media_url(name):
+    """URL d'un fichier enregistré (comme FieldFile.url), None si le champ est vide"""
+    return default_storage.url(name) if name else None
+
+
+def _skill_ordering(prefix):
+    """Ordre par défaut des compétences (celui de prefetch_related), depuis la table de liaison"""
+    return [f'-{prefix}__{field[1:]}' if field.startswith('-') else f'{prefix}__{field}'
+            for field in Competence._meta.ordering]
+
+
+def skill_links(queryset, relation):
+    """{id de l'objet: [Skill, ...]} pour les objets de `queryset`, en une requête"""
+    field = queryset.model._meta.get_field(relation)
+    through = field.remote_field.through
+    source, target = field.m2m_field_name(), field.m2m_reverse_field_name()
+    pairs = (through.objects.filter(**{source + '__in': queryset.values('pk')})
+             .order_by(*_skill_ordering(target), 'pk')
+             .values_list(source + '_id', target + '_id', target + '__nom', target + '__couleur', target + '__icone'))
+    skills, links = {}, {}
+    for object_id, skill_id, nom, couleur, icone in pairs.iterator(chunk_size=CHUNK_SIZE):
+        skill = skills.get(skill_id)
+        if skill is None:
+            skill = skills[skill_id] = Skill(skill_id, nom, couleur, icone)
+        links.setdefault(object_id, []).append(skill)
+    return links
+
+
+def iter_records(queryset, fields, relation):
+    """(ligne, compétences liées) pour chaque objet de `queryset`, dans son ordre
+
+    Les lignes sont des tuples nommés (une classe par requête) ; `fields` doit contenir 'id'.
+    """
+    links = skill_links(queryset, relation)
+    rows = queryset.prefetch_related(None).values_list(*fields, named=True)
+    for row in rows.iterator(chunk_size=CHUNK_SIZE):
+        yield row, links.get(row.id, ())
@@ -0,0 +1,99 @@
+# portfolio/routers.py
+# Routage des lectures vers les répliques : seules les requêtes publiques en
+# lecture (GET/HEAD hors administration) lisent sur une réplique ; écritures,
+# administration, commandes et tâches de fond restent sur la base principale.
+# Après une écriture, le client reste quelques secondes sur la principale
+# (lecture de ses propres écritures malgré le retard de réplication). Après
+# une modification du contenu, toutes les lectures du portfolio vont aussi sur
+# la principale pendant ce délai : une réplique en retard remplirait les
+# caches de l'ancien contenu sous la nouvelle version.
+
+import random
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Vrai pendant une requête autorisée à lire sur une réplique
+_replica_reads = ContextVar('portfolio_replica_reads', default=False)
+
+# Cookie de maintien sur la base principale après une écriture
+STICKY_COOKIE = 'portfolio_primary'
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Clé du cache partagé : fin de la lecture sur la principale après une modification (suffixée par le portfolio)
+PRIMARY_UNTIL_KEY = 'portfolio:primary_until'
+
+
+def replica_aliases():
+    """Alias des bases déclarées comme répliques (toutes sauf 'default')"""
+    return [alias for alias in settings.DATABASES if alias != 'default']
+
+
+def content_version_changed(sender, tenant_id=None, **kwargs):
+    """Contenu modifié : lectures du portfolio sur la principale le temps de la réplication"""
+    if settings.REPLICA_STICKY_SECONDS:
+        cache.set('%s:%s' % (PRIMARY_UNTIL_KEY, tenant_id), time.time() + settings.REPLICA_STICKY_SECONDS,
+                  settings.REPLICA_STICKY_SECONDS)
+
+
+class PrimaryReplicaRouter:
+    """Lectures sur une réplique quand la requête le permet, écritures sur 'default'"""
+
+    def __init__(self, replicas=None):
+        self.replicas = replica_aliases() if replicas is None else replicas
+
+    def db_for_read(self, model, **hints):
+        if self.replicas and _replica_reads.get():
+            return random.choice(self.replicas)
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Mêmes données sur toutes les bases
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Le schéma des répliques vient de la réplication (voir sync_replica)
+        return db == 'default'
+
+
+class ReplicaRoutingMiddleware:
+    """Décide, pour chaque requête, si les lectures peuvent aller sur une réplique
+
+    Placé après TenantMiddleware : la décision dépend des modifications récentes du portfolio servi.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def uses_replica(self, request):
+        if request.method not in SAFE_METHODS or request.path.startswith('/admin/'):
+            return False
+        try:
+            sticky_until = float(request.COOKIES.get(STICKY_COOKIE, 0))
+        except ValueError:
+            sticky_until = 0
+        now = time.time()
+        if sticky_until >= now:
+            return False
+        primary_until = cache.get('%s:%s' % (PRIMARY_UNTIL_KEY, getattr(request, 'tenant_id', None)), 0)
+        return primary_until < now
+
+    def __call__(self, request):
+        token = _replica_reads.set(self.uses_replica(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            _replica_reads.reset(token)
+        if request.method not in SAFE_METHODS and settings.REPLICA_STICKY_SECONDS:
+            # Écriture probable : les prochaines lectures de ce client vont sur la principale
+            response.set_cookie(
+                STICKY_COOKIE, str(time.time() + settings.REPLICA_STICKY_SECONDS),
+                max_age=settings.REPLICA_STICKY_SECONDS, httponly=True, samesite='Lax',
+            )
+        return response
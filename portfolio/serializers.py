@@ -2,6 +2,7 @@
 # Sérialiseurs pour convertir les modèles Django en JSON pour l'API REST
 
 from rest_framework import serializers
+from .durations import libelle_duree
 from .models import Profile, Competence, Projet, Experience, Contact
 
 class ProfileSerializer(serializers.ModelSerializer):
@@ -43,14 +44,19 @@ class CompetenceSerializer(serializers.ModelSerializer):
     
     # Affichage du nom de la catégorie au lieu de la valeur
     categorie_display = serializers.CharField(source='get_categorie_display', read_only=True)
+    # Cumul précalculé des expériences où la compétence a été acquise
+    annees_experience = serializers.SerializerMethodField()
     
     class Meta:
         model = Competence
         fields = [
             'id', 'nom', 'categorie', 'categorie_display',
-            'niveau', 'icone', 'couleur', 'ordre', 'actif'
+            'niveau', 'icone', 'couleur', 'ordre', 'mois_experience', 'annees_experience', 'actif'
         ]
-        read_only_fields = ['id']
+        read_only_fields = ['id', 'mois_experience']
+    
+    def get_annees_experience(self, obj):
+        return round(obj.mois_experience / 12, 1)
 
 class CompetenceSimpleSerializer(serializers.ModelSerializer):
     """Sérialiseur simplifié pour les compétences (utilisé dans les projets)"""
@@ -70,7 +76,7 @@ class ProjetSerializer(serializers.ModelSerializer):
     image_2_url = serializers.SerializerMethodField()
     image_3_url = serializers.SerializerMethodField()
     statut_display = serializers.CharField(source='get_statut_display', read_only=True)
-    duree_projet = serializers.SerializerMethodField()  # Durée calculée
+    duree_projet = serializers.IntegerField(source='duree_mois', read_only=True)  # Durée précalculée (mois)
     
     class Meta:
         model = Projet
@@ -107,13 +113,6 @@ class ProjetSerializer(serializers.ModelSerializer):
             if request:
                 return request.build_absolute_uri(obj.image_3.url)
         return None
-    
-    def get_duree_projet(self, obj):
-        """Calcule la durée du projet en mois"""
-        if obj.date_fin:
-            delta = obj.date_fin - obj.date_debut
-            return round(delta.days / 30)  # Conversion approximative en mois
-        return None
 
 class ProjetSimpleSerializer(serializers.ModelSerializer):
     """Sérialiseur simplifié pour l'aperçu des projets (liste)"""
@@ -148,30 +147,14 @@ class ExperienceSerializer(serializers.ModelSerializer):
         model = Experience
         fields = [
             'id', 'type_experience', 'type_display', 'titre', 'entreprise', 'lieu',
-            'date_debut', 'date_fin', 'est_en_cours', 'duree',
+            'date_debut', 'date_fin', 'est_en_cours', 'duree_mois', 'duree',
             'description', 'competences_acquises', 'ordre', 'actif'
         ]
-        read_only_fields = ['id']
+        read_only_fields = ['id', 'duree_mois']
     
     def get_duree(self, obj):
-        """Calcule la durée de l'expérience"""
-        from datetime import date
-        
-        date_fin = obj.date_fin if obj.date_fin else date.today()
-        delta = date_fin - obj.date_debut
-        
-        # Calcul en mois
-        mois = round(delta.days / 30)
-        
-        if mois < 12:
-            return f"{mois} mois"
-        else:
-            annees = mois // 12
-            mois_restants = mois % 12
-            if mois_restants == 0:
-                return f"{annees} an{'s' if annees > 1 else ''}"
-            else:
-                return f"{annees} an{'s' if annees > 1 else ''} et {mois_restants} mois"
+        """Libellé de la durée précalculée (voir durations.py)"""
+        return libelle_duree(obj.duree_mois)
 
 class ContactSerializer(serializers.ModelSerializer):
     """Sérialiseur pour le modèle Contact"""
@@ -0,0 +1,209 @@
+# portfolio/signals.py
+# Signaux pour invalider les caches lorsque le contenu du portfolio change
+# et alimenter le journal des modifications (synchronisation différentielle)
+
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, m2m_changed
+
+from . import routers, skillgraph, tasks
+from .cache import TENANTS_VERSION_KEY, bump_content_version, bump_version, content_version_changed
+from .counters import (CONTRIBUTIONS, FIELDS, apply_deltas, contributions, create_counters, recount,
+                       stored_contributions)
+from .durations import duree_calculee, update_skill_experience
+from .events import record_changes
+from .models import Profile, Competence, Projet, Experience, Contact, Modification
+
+# Modèles dont le contenu est affiché sur la page publique
+CONTENT_MODELS = (Profile, Competence, Projet, Experience)
+
+# Type de chaque modèle dans le journal des modifications
+MODIFICATION_TYPES = {
+    Profile: Modification.PROFILE,
+    Competence: Modification.COMPETENCE,
+    Projet: Modification.PROJET,
+    Experience: Modification.EXPERIENCE,
+}
+
+
+def tenant_of(instance):
+    """Portfolio (id du profil) auquel appartient un objet"""
+    return instance.pk if isinstance(instance, Profile) else instance.profile_id
+
+
+def content_saved(sender, instance, update_fields=None, **kwargs):
+    """Invalide les caches après l'enregistrement d'un contenu"""
+    # Le compteur de vues n'est pas du contenu : pas d'invalidation
+    if update_fields is not None and set(update_fields) <= {'vues'}:
+        return
+    tenant_id = tenant_of(instance)
+    record_changes(tenant_id, MODIFICATION_TYPES[sender], [instance.pk])
+    bump_content_version(tenant_id)
+
+
+def deleted_with_portfolio(origin):
+    """Suppression d'un profil (et de ses objets en cascade) : son journal disparaît avec lui"""
+    return isinstance(origin, Profile) or getattr(origin, 'model', None) is Profile
+
+
+def content_deleted(sender, instance, origin=None, **kwargs):
+    """Invalide les caches après la suppression d'un contenu"""
+    tenant_id = tenant_of(instance)
+    if not deleted_with_portfolio(origin):
+        record_changes(tenant_id, MODIFICATION_TYPES[sender], [instance.pk])
+    bump_content_version(tenant_id)
+
+
+def profile_changed(sender, instance, created=False, **kwargs):
+    """Invalide la résolution hôte -> portfolio (domaine, identifiant, activation)"""
+    if created:
+        create_counters(instance.pk)
+    bump_version(TENANTS_VERSION_KEY)
+
+
+def content_relations_changed(sender, instance, action, reverse, model, pk_set=None, **kwargs):
+    """Invalide les caches quand les compétences liées changent"""
+    tenant_id = tenant_of(instance)
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        if not reverse:
+            # Projet ou expérience modifié
+            record_changes(tenant_id, MODIFICATION_TYPES[type(instance)], [instance.pk])
+        elif pk_set:
+            # Compétence ajoutée à (ou retirée de) projets ou expériences
+            record_changes(tenant_id, MODIFICATION_TYPES[model], pk_set)
+        bump_content_version(tenant_id)
+    elif action == 'pre_clear' and reverse:
+        # pk_set n'est pas fourni au post_clear : objets liés relevés avant
+        record_linked(sender, model, instance)
+
+
+def record_linked(through, model, competence):
+    """Journalise les projets ou expériences liés à une compétence"""
+    field = '%s_id' % model._meta.model_name
+    record_changes(tenant_of(competence), MODIFICATION_TYPES[model], through.objects.filter(
+        competence_id=competence.pk).values_list(field, flat=True))
+
+
+def competence_deleting(sender, instance, origin=None, **kwargs):
+    """Journalise les objets liés avant que la suppression ne retire les liaisons"""
+    if deleted_with_portfolio(origin):
+        return
+    for through, model in RELATIONS:
+        record_linked(through, model, instance)
+
+
+def counters_pre_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Mémorise la contribution aux compteurs de la version enregistrée"""
+    if raw:
+        return
+    if update_fields is not None and not set(update_fields) & {'profile', *FIELDS[sender]}:
+        return
+    if instance._state.adding or instance.pk is None:
+        instance._compteurs_avant = (None, {})
+    else:
+        instance._compteurs_avant = stored_contributions(sender, instance.pk)
+
+
+def counters_post_save(sender, instance, **kwargs):
+    """Applique aux compteurs l'écart entre l'ancienne et la nouvelle version"""
+    avant = instance.__dict__.pop('_compteurs_avant', None)
+    if avant is None:
+        return
+    tenant_avant, contributions_avant = avant
+    apres = contributions(instance)
+    if tenant_avant != instance.profile_id and contributions_avant:
+        # Objet déplacé vers un autre portfolio
+        apply_deltas(tenant_avant, {nom: -valeur for nom, valeur in contributions_avant.items()})
+        contributions_avant = {}
+    apply_deltas(instance.profile_id, {
+        nom: apres.get(nom, 0) - contributions_avant.get(nom, 0)
+        for nom in set(contributions_avant) | set(apres)
+    })
+
+
+def counters_post_delete(sender, instance, **kwargs):
+    """Retire des compteurs la contribution d'un objet supprimé"""
+    apply_deltas(instance.profile_id, {nom: -valeur for nom, valeur in contributions(instance).items()})
+
+
+def contact_counters_post_save(sender, instance, created, raw=False, **kwargs):
+    """Messages non lus : +1 après la validation d'un nouveau message, recalcul après une modification
+
+    Pas de lecture préalable, et le compteur du portfolio n'est pas verrouillé pendant
+    la transaction de la requête : les envois simultanés ne s'attendent pas.
+    """
+    if raw:
+        return
+    if created:
+        if not instance.lu:
+            transaction.on_commit(partial(apply_deltas, instance.profile_id, {'messages_non_lus': 1}))
+    else:
+        # Modification depuis l'administration (lu, portfolio) : valeur exacte en une requête
+        recount(instance.profile_id, 'messages_non_lus')
+
+
+# Index des compétences, connecté en premier : chaque modification y est
+# appliquée avant l'incrément de version qui l'accompagne
+for model in skillgraph.LINKED_MODELS:
+    post_save.connect(skillgraph.object_saved, sender=model)
+    post_delete.connect(skillgraph.object_deleted, sender=model)
+    m2m_changed.connect(skillgraph.links_changed, sender=getattr(model, skillgraph.LINKED_MODELS[model]).through)
+post_save.connect(skillgraph.skill_saved, sender=Competence)
+post_delete.connect(skillgraph.skill_deleted, sender=Competence)
+content_version_changed.connect(skillgraph.skill_graph.content_version_changed, weak=False)
+
+def duration_pre_save(sender, instance, **kwargs):
+    """Durée calculée à partir des dates enregistrées"""
+    instance.duree_mois = duree_calculee(instance)
+
+
+def skill_experience_changed(sender, instance, action=None, **kwargs):
+    """Recalcule les mois d'expérience des compétences du portfolio (expérience ou liaisons modifiées)"""
+    # action : None pour un enregistrement ou une suppression, étape pour m2m_changed
+    if action in (None, 'post_add', 'post_remove', 'post_clear'):
+        update_skill_experience([instance.profile_id])
+
+
+# Connexion par modèle (et non globale) : les autres modèles, comme Contact,
+# gardent la suppression rapide en une requête de l'ORM
+for model in CONTENT_MODELS:
+    post_save.connect(content_saved, sender=model)
+    post_delete.connect(content_deleted, sender=model)
+
+# Tables de liaison vers les compétences, avec le modèle qui les porte
+RELATIONS = (
+    (Projet.technologies.through, Projet),
+    (Experience.competences_acquises.through, Experience),
+)
+
+post_save.connect(profile_changed, sender=Profile)
+post_delete.connect(profile_changed, sender=Profile)
+
+for through, _ in RELATIONS:
+    m2m_changed.connect(content_relations_changed, sender=through)
+
+pre_delete.connect(competence_deleting, sender=Competence)
+
+# Durées précalculées et mois d'expérience par compétence
+for model in (Projet, Experience):
+    pre_save.connect(duration_pre_save, sender=model)
+post_save.connect(skill_experience_changed, sender=Experience)
+post_delete.connect(skill_experience_changed, sender=Experience)
+m2m_changed.connect(skill_experience_changed, sender=Experience.competences_acquises.through)
+
+# Compteurs des statistiques. Messages de contact : post_save seulement (pas de
+# lecture avant l'insertion) ; pas de post_delete, seuls des messages lus sont
+# supprimés (archivage), sans effet sur les compteurs
+for model in CONTRIBUTIONS:
+    if model is not Contact:
+        pre_save.connect(counters_pre_save, sender=model)
+        post_save.connect(counters_post_save, sender=model)
+        post_delete.connect(counters_post_delete, sender=model)
+post_save.connect(contact_counters_post_save, sender=Contact)
+
+# Réchauffage du cache en tâche de fond après chaque modification (TASKS_CACHE_WARMING)
+content_version_changed.connect(tasks.content_version_changed)
+
+# Lectures sur la principale le temps de la réplication de chaque modification
+content_version_changed.connect(routers.content_version_changed)
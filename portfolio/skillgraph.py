@@ -0,0 +1,242 @@
+# portfolio/skillgraph.py
+# Index en mémoire du graphe des compétences de chaque portfolio : projets et
+# expériences utilisant une compétence, et nombre de co-occurrences entre
+# compétences (utilisées ensemble dans un même projet ou une même expérience
+# actifs). Construit depuis les tables de liaison, puis tenu à jour de façon
+# incrémentale par les signaux (m2m_changed, enregistrements, suppressions).
+# Chaque graphe porte la version du contenu dont il est issu : toute autre
+# modification (autre processus, mise à jour en masse) provoque sa reconstruction.
+# Une modification faite dans une transaction est suivie d'un second incrément
+# après la validation (voir bump_content_version) : il est attribué à la
+# transaction dont les modifications ont déjà été appliquées.
+
+import threading
+from collections import Counter
+
+from django.db import transaction
+
+from .cache import get_content_version
+from .models import Competence, Experience, Projet
+
+# Modèles liés aux compétences, avec le nom de leur liaison
+LINKED_MODELS = {
+    Projet: 'technologies',
+    Experience: 'competences_acquises',
+}
+
+
+class SkillGraph:
+    """Graphe des compétences d'un portfolio ; les objets sont désignés par (modèle, id)"""
+
+    def __init__(self):
+        # compétence -> active
+        self.skills = {}
+        # objet -> compétences liées
+        self.links = {}
+        # objets actifs (seuls comptés dans les co-occurrences)
+        self.active = set()
+        # compétence -> objets liés
+        self.postings = {}
+        # compétence -> Counter(autre compétence -> objets actifs communs)
+        self.cooccurrences = {}
+
+    def _contribute(self, key, sign):
+        """Ajoute (ou retire) les paires de compétences d'un objet actif"""
+        if key not in self.active:
+            return
+        skills = self.links.get(key, ())
+        for skill in skills:
+            counter = self.cooccurrences.setdefault(skill, Counter())
+            for other in skills:
+                if other != skill:
+                    counter[other] += sign
+                    if counter[other] <= 0:
+                        del counter[other]
+
+    def set_links(self, key, skills):
+        self._contribute(key, -1)
+        for skill in self.links.get(key, ()):
+            self.postings[skill].discard(key)
+        self.links[key] = set(skills)
+        for skill in self.links[key]:
+            self.postings.setdefault(skill, set()).add(key)
+        self._contribute(key, 1)
+
+    def set_object(self, key, active):
+        self._contribute(key, -1)
+        self.links.setdefault(key, set())
+        if active:
+            self.active.add(key)
+        else:
+            self.active.discard(key)
+        self._contribute(key, 1)
+
+    def remove_object(self, key):
+        if key in self.links:
+            self.set_links(key, ())
+            del self.links[key]
+            self.active.discard(key)
+
+    def set_skill(self, pk, active):
+        self.skills[pk] = active
+
+    def remove_skill(self, pk):
+        for key in list(self.postings.get(pk, ())):
+            self.set_links(key, self.links[key] - {pk})
+        self.skills.pop(pk, None)
+        self.postings.pop(pk, None)
+        self.cooccurrences.pop(pk, None)
+
+    def related(self, pk, limit=10):
+        """Objets actifs utilisant la compétence et compétences actives les plus souvent associées"""
+        objects = self.postings.get(pk, set()) & self.active
+        ids = {model: sorted(obj_id for obj_model, obj_id in objects if obj_model is model)
+               for model in LINKED_MODELS}
+        related = [(other, count) for other, count in self.cooccurrences.get(pk, Counter()).most_common()
+                   if self.skills.get(other)]
+        return ids, related[:limit]
+
+    @classmethod
+    def build(cls, tenant_id):
+        """Graphe d'un portfolio, lu dans les tables (une requête par table)"""
+        graph = cls()
+        for pk, actif in Competence.objects.for_tenant(tenant_id).values_list('pk', 'actif'):
+            graph.set_skill(pk, actif)
+        links = {}
+        for model, name in LINKED_MODELS.items():
+            objects = model.objects.for_tenant(tenant_id)
+            for pk, actif in objects.values_list('pk', 'actif'):
+                links[model, pk] = set()
+                if actif:
+                    graph.active.add((model, pk))
+            field = model._meta.get_field(name)
+            source, target = field.m2m_field_name() + '_id', field.m2m_reverse_field_name() + '_id'
+            rows = field.remote_field.through.objects.filter(**{source + '__in': objects.values('pk')})
+            for pk, skill in rows.values_list(source, target):
+                links[model, pk].add(skill)
+        for key, skills in links.items():
+            graph.set_links(key, skills)
+        return graph
+
+
+class Entry:
+    """Graphe d'un portfolio et version du contenu dont il est issu"""
+
+    __slots__ = ('graph', 'version', 'pending', 'transactions')
+
+    def __init__(self, graph, version):
+        self.graph = graph
+        self.version = version
+        # Modification appliquée au graphe, en attente de l'incrément de version qui l'accompagne
+        self.pending = False
+        # Connexions dont la transaction a modifié le graphe, en attente de l'incrément après validation
+        self.transactions = set()
+
+
+class SkillGraphIndex:
+    """Graphes des portfolios du processus, construits à la première consultation"""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        # portfolio -> Entry
+        self.entries = {}
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def related(self, tenant_id, pk, limit=10):
+        """Voir SkillGraph.related ; None si la compétence n'est pas une compétence active du portfolio"""
+        version = get_content_version(tenant_id)
+        with self.lock:
+            entry = self.entries.get(tenant_id)
+            if entry is None or entry.version != version:
+                # Version lue avant la construction : une modification concurrente sera rejouée
+                entry = self.entries[tenant_id] = Entry(SkillGraph.build(tenant_id), version)
+            if not entry.graph.skills.get(pk):
+                return None
+            return entry.graph.related(pk, limit)
+
+    def update(self, tenant_id, change):
+        """Applique `change(graph)` au graphe du portfolio s'il est construit"""
+        with self.lock:
+            entry = self.entries.get(tenant_id)
+            if entry is not None:
+                change(entry.graph)
+                entry.pending = True
+                connection = transaction.get_connection()
+                if connection.in_atomic_block:
+                    entry.transactions.add(connection)
+
+    def discard(self, key, keep=None):
+        """Objet déplacé : le graphe de son ancien portfolio (sans incrément de version) est abandonné"""
+        with self.lock:
+            for tenant_id in [tenant_id for tenant_id, entry in self.entries.items()
+                              if tenant_id != keep and key in entry.graph.links]:
+                del self.entries[tenant_id]
+
+    def content_version_changed(self, sender, tenant_id=None, version=None, after_commit=False, **kwargs):
+        """Le graphe reste valide si l'incrément correspond à une modification déjà appliquée"""
+        with self.lock:
+            entry = self.entries.get(tenant_id)
+            if entry is None:
+                return
+            if after_commit:
+                # Émis depuis la connexion qui valide : même modification, déjà appliquée
+                connection = transaction.get_connection()
+                applied = connection in entry.transactions
+                entry.transactions.discard(connection)
+            else:
+                applied = entry.pending
+            if applied and version is not None and entry.version == version - 1:
+                entry.version = version
+            entry.pending = False
+
+
+skill_graph = SkillGraphIndex()
+
+
+def object_saved(sender, instance, **kwargs):
+    key = (sender, instance.pk)
+    skill_graph.discard(key, keep=instance.profile_id)
+    skill_graph.update(instance.profile_id, lambda graph: graph.set_object(key, instance.actif))
+
+
+def object_deleted(sender, instance, **kwargs):
+    skill_graph.update(instance.profile_id, lambda graph: graph.remove_object((sender, instance.pk)))
+
+
+def skill_saved(sender, instance, **kwargs):
+    skill_graph.update(instance.profile_id, lambda graph: graph.set_skill(instance.pk, instance.actif))
+
+
+def skill_deleted(sender, instance, **kwargs):
+    skill_graph.update(instance.profile_id, lambda graph: graph.remove_skill(instance.pk))
+
+
+def links_changed(sender, instance, action, reverse, model, pk_set=None, **kwargs):
+    """Liaisons modifiées depuis l'objet (projet, expérience) ou depuis la compétence"""
+    # Côté objet, post_clear suffit ; côté compétence, seul pre_clear voit encore les objets liés
+    clear = 'pre_clear' if reverse else 'post_clear'
+    if action not in ('post_add', 'post_remove', clear):
+        return
+
+    def change(graph):
+        if not reverse:
+            key = (type(instance), instance.pk)
+            skills = graph.links.get(key, set())
+            if action == 'post_add':
+                skills = skills | pk_set
+            elif action == 'post_remove':
+                skills = skills - pk_set
+            else:
+                skills = ()
+            graph.set_links(key, skills)
+        else:
+            keys = [key for key in graph.postings.get(instance.pk, ()) if key[0] is model] \
+                if action == 'pre_clear' else [(model, pk) for pk in pk_set]
+            for key in keys:
+                skills = graph.links.get(key, set())
+                graph.set_links(key, skills | {instance.pk} if action == 'post_add' else skills - {instance.pk})
+
+    skill_graph.update(instance.profile_id, change)
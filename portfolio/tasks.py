@@ -0,0 +1,256 @@
+# portfolio/tasks.py
+# Tâches de fond sans dépendance externe : file d'attente dans la base
+# (modèle Tache), exécutée par les processus `manage.py taskworker`. Une tâche
+# est réservée par une mise à jour conditionnelle (un seul processus la
+# prend, sur SQLite comme sur PostgreSQL) ; en cas d'erreur elle est
+# retentée avec un délai croissant. Les tâches périodiques sont ajoutées par
+# les processus avec une clé par période : une seule exécution par période.
+# Ajoutée pendant une requête, une tâche n'est visible qu'après la validation
+# de la transaction, et la requête n'attend jamais son exécution.
+
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Contact, Modification, Tache
+
+logger = logging.getLogger(__name__)
+
+# Tâches déclarées : nom -> Task
+TASKS = {}
+
+
+class Task:
+    """Fonction exécutable en tâche de fond (voir le décorateur `task`)"""
+
+    def __init__(self, func, name, max_tentatives, periodique):
+        self.func = func
+        self.name = name
+        self.max_tentatives = max_tentatives
+        self.periodique = periodique
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def enqueue(self, *args, **kwargs):
+        """Ajoute une exécution à la file (arguments sérialisables en JSON)"""
+        return enqueue(self.name, args, kwargs)
+
+
+def task(max_tentatives=5, periodique=None, name=None):
+    """Déclare une tâche ; `periodique` : intervalle en secondes entre deux exécutions planifiées"""
+    def register(func):
+        declared = Task(func, name or func.__name__, max_tentatives, periodique)
+        TASKS[declared.name] = declared
+        return declared
+    return register
+
+
+def enqueue(name, args=(), kwargs=None, delay=0, key=None):
+    """Ajoute une tâche à la file ; avec `key`, ne fait rien si une tâche de même clé existe déjà"""
+    if name not in TASKS:
+        raise KeyError(f"Tâche inconnue : {name}")
+    values = {
+        'nom': name, 'arguments': {'args': list(args), 'kwargs': kwargs or {}},
+        'executer_apres': timezone.now() + timedelta(seconds=delay),
+        'max_tentatives': TASKS[name].max_tentatives, 'cle': key,
+    }
+    if key is None:
+        return Tache.objects.create(**values)
+    try:
+        # Point de sauvegarde : le doublon n'interrompt pas la transaction en cours
+        with transaction.atomic():
+            return Tache.objects.create(**values)
+    except IntegrityError:
+        return None
+
+
+def retry_delay(tentatives):
+    """Délai avant la tentative suivante : doublé à chaque échec, plafonné, avec une part aléatoire"""
+    delay = min(settings.TASKS_RETRY_DELAY * 2 ** (tentatives - 1), settings.TASKS_RETRY_MAX_DELAY)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def schedule_periodic(now=None, scheduled=None):
+    """Ajoute les tâches périodiques de la période en cours (une par tâche et par période)
+
+    `scheduled` (nom -> période déjà planifiée) évite de retenter l'insertion à chaque passage.
+    """
+    now = now or timezone.now()
+    scheduled = {} if scheduled is None else scheduled
+    added = 0
+    for declared in TASKS.values():
+        if declared.periodique:
+            period = int(now.timestamp() // declared.periodique)
+            if scheduled.get(declared.name) != period:
+                added += enqueue(declared.name, key=f'{declared.name}@{period}') is not None
+                scheduled[declared.name] = period
+    return added
+
+
+def requeue_stale(now=None):
+    """Remet en attente les tâches réservées par un processus arrêté (au-delà de TASKS_LOCK_TIMEOUT)
+
+    Une tâche qui a épuisé ses tentatives (elle arrête peut-être le processus qui l'exécute) échoue.
+    """
+    now = now or timezone.now()
+    stale = Tache.objects.filter(etat=Tache.EN_COURS,
+                                 debut__lt=now - timedelta(seconds=settings.TASKS_LOCK_TIMEOUT))
+    stale.filter(tentatives__gte=F('max_tentatives')).update(
+        etat=Tache.ECHEC, travailleur='', termine_le=now,
+        derniere_erreur="Processus arrêté pendant l'exécution (dernière tentative)")
+    return stale.update(etat=Tache.EN_ATTENTE, travailleur='', debut=None)
+
+
+def claim(worker, limit=1, now=None):
+    """Réserve jusqu'à `limit` tâches prêtes pour le processus `worker`"""
+    now = now or timezone.now()
+    candidates = list(Tache.objects.filter(etat=Tache.EN_ATTENTE, executer_apres__lte=now)
+                      .order_by('executer_apres', 'id').values_list('id', flat=True)[:limit * 2])
+    claimed = []
+    for pk in candidates:
+        # Mise à jour conditionnelle : un autre processus a pu réserver la tâche entre-temps
+        if Tache.objects.filter(pk=pk, etat=Tache.EN_ATTENTE).update(
+                etat=Tache.EN_COURS, travailleur=worker, debut=now, tentatives=F('tentatives') + 1):
+            claimed.append(pk)
+            if len(claimed) == limit:
+                break
+    return list(Tache.objects.filter(pk__in=claimed).order_by('executer_apres', 'id'))
+
+
+def execute(tache):
+    """Exécute une tâche réservée et enregistre son résultat (terminée, nouvel essai ou échec)"""
+    declared = TASKS.get(tache.nom)
+    start = time.perf_counter()
+    try:
+        if declared is None:
+            raise LookupError(f"Tâche inconnue : {tache.nom}")
+        declared(*tache.arguments.get('args', []), **tache.arguments.get('kwargs', {}))
+    except Exception:
+        error = traceback.format_exc()
+        logger.warning("Tâche %s #%s en erreur (tentative %s/%s)", tache.nom, tache.pk,
+                       tache.tentatives, tache.max_tentatives)
+        values = {'derniere_erreur': error, 'travailleur': '', 'duree_ms': (time.perf_counter() - start) * 1000}
+        if declared is not None and tache.tentatives < tache.max_tentatives:
+            values.update(etat=Tache.EN_ATTENTE, debut=None,
+                          executer_apres=timezone.now() + timedelta(seconds=retry_delay(tache.tentatives)))
+        else:
+            values.update(etat=Tache.ECHEC, termine_le=timezone.now())
+        Tache.objects.filter(pk=tache.pk).update(**values)
+        return False
+    Tache.objects.filter(pk=tache.pk).update(
+        etat=Tache.TERMINEE, termine_le=timezone.now(), duree_ms=(time.perf_counter() - start) * 1000)
+    return True
+
+
+class Worker:
+    """Boucle d'un processus d'exécution des tâches"""
+
+    def __init__(self, name=None, poll_interval=None, batch=1):
+        self.name = name or f'{socket.gethostname()}:{os.getpid()}'
+        self.poll_interval = settings.TASKS_POLL_INTERVAL if poll_interval is None else poll_interval
+        self.batch = batch
+        self.stopped = threading.Event()
+        self.scheduled = {}
+        self.last_requeue = 0
+
+    def stop(self, *args):
+        self.stopped.set()
+
+    def run_once(self):
+        """Planifie, récupère les tâches abandonnées puis exécute un lot ; retourne le nombre exécuté"""
+        close_old_connections()
+        schedule_periodic(scheduled=self.scheduled)
+        if time.monotonic() - self.last_requeue > 60:
+            requeue_stale()
+            self.last_requeue = time.monotonic()
+        done = 0
+        for tache in claim(self.name, self.batch):
+            execute(tache)
+            done += 1
+            close_old_connections()
+        return done
+
+    def run(self, until_empty=False):
+        """Exécute les tâches jusqu'à l'arrêt (ou jusqu'à ce que la file soit vide)"""
+        total = 0
+        while not self.stopped.is_set():
+            done = self.run_once()
+            total += done
+            if not done:
+                if until_empty:
+                    break
+                self.stopped.wait(self.poll_interval)
+        return total
+
+
+def purge_tasks(days=None):
+    """Supprime les tâches terminées depuis plus de `days` jours (TASKS_KEEP_DAYS par défaut)"""
+    days = settings.TASKS_KEEP_DAYS if days is None else days
+    limite = timezone.now() - timedelta(days=days)
+    return Tache.objects.filter(etat=Tache.TERMINEE, termine_le__lt=limite).delete()[0]
+
+
+# Tâches du portfolio
+
+@task(max_tentatives=8)
+def notifier_contact(contact_id):
+    """Informe le propriétaire du portfolio d'un nouveau message de contact"""
+    contact = Contact.objects.select_related('profile').filter(pk=contact_id).first()
+    if contact is None:
+        return
+    destinataire = contact.profile.email if contact.profile else settings.CONTACT_NOTIFICATION_EMAIL
+    if not destinataire:
+        return
+    send_mail(
+        f"[Portfolio] {contact.sujet}",
+        f"Message de {contact.nom} <{contact.email}> :\n\n{contact.message}",
+        None, [destinataire],
+    )
+
+
+@task()
+def rechauffer_cache(tenant_id):
+    """Construit le premier écran de l'API par sections dans le cache (avant la première visite)"""
+    from .encoding import encode
+    from .localcache import get_hot_cache
+    from .payload import build_portfolio_section, section_cache_key
+    get_hot_cache().get_or_set(section_cache_key(tenant_id, 'accueil', 'json'), tenant_id,
+                               lambda: encode(build_portfolio_section('accueil', tenant_id), 'json'))
+
+
+def content_version_changed(sender, tenant_id=None, version=None, **kwargs):
+    """Réchauffe le cache après une modification (une tâche par version, TASKS_CACHE_WARMING)"""
+    if settings.TASKS_CACHE_WARMING:
+        enqueue('rechauffer_cache', [tenant_id], key=f'rechauffer_cache:{tenant_id}:{version}')
+
+
+@task(periodique=3600)
+def compacter_vues():
+    """Agrège le journal des vues de projets (comme la commande compact_vues)"""
+    from .analytics import compact_views
+    compact_views()
+
+
+@task(periodique=24 * 3600)
+def maintenance_quotidienne():
+    """Compteurs, durées, archivage des messages, journal des modifications et tâches terminées"""
+    from .archive import archive_contacts
+    from .counters import reconcile_counters
+    from .durations import refresh_durations
+    reconcile_counters()
+    refresh_durations()
+    archive_contacts()
+    Modification.prune(settings.MODIFICATIONS_KEEP_DAYS)
+    purge_tasks()
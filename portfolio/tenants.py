@@ -0,0 +1,54 @@
+# portfolio/tenants.py
+# Résolution du portfolio servi par une requête : domaine personnalisé du
+# profil, sous-domaine <identifiant>.TENANT_DOMAIN, sinon portfolio par défaut.
+# La correspondance hôte -> portfolio est mise en cache (invalidée à chaque
+# modification d'un profil).
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http.request import split_domain_port
+
+from .cache import TENANTS_VERSION_KEY, get_version
+from .models import Profile
+
+# Durée de vie (secondes) de la correspondance hôte -> portfolio
+TENANT_CACHE_TIMEOUT = 3600
+
+# Valeur mise en cache quand aucun profil ne correspond (None = absent du cache)
+NO_TENANT = 0
+
+
+def lookup_tenant_id(host):
+    """Id du profil servi sur `host` (requêtes en base)"""
+    profiles = Profile.objects.filter(actif=True)
+    tenant_id = profiles.filter(domaine=host).values_list('pk', flat=True).first()
+    suffix = '.' + settings.TENANT_DOMAIN
+    if tenant_id is None and settings.TENANT_DOMAIN and host.endswith(suffix):
+        tenant_id = profiles.filter(slug=host[:-len(suffix)]).values_list('pk', flat=True).first()
+    if tenant_id is None:
+        # Portfolio par défaut (comportement mono-portfolio : premier profil actif)
+        default = profiles.filter(slug=settings.TENANT_DEFAULT) if settings.TENANT_DEFAULT else profiles
+        tenant_id = default.order_by('pk').values_list('pk', flat=True).first()
+    return tenant_id
+
+
+def resolve_tenant_id(host):
+    """Id du profil servi sur `host` (None : aucun profil), depuis le cache"""
+    host, _ = split_domain_port(host)
+    key = 'portfolio:tenant:%s:%s' % (get_version(TENANTS_VERSION_KEY), host)
+    tenant_id = cache.get(key)
+    if tenant_id is None:
+        tenant_id = lookup_tenant_id(host) or NO_TENANT
+        cache.set(key, tenant_id, TENANT_CACHE_TIMEOUT)
+    return tenant_id or None
+
+
+class TenantMiddleware:
+    """Ajoute `request.tenant_id` : id du profil (portfolio) servi"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.tenant_id = resolve_tenant_id(request.get_host())
+        return self.get_response(request)
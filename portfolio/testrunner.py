@@ -0,0 +1,117 @@
+# portfolio/testrunner.py
+# Lanceur de tests : la base de test SQLite (en mémoire) est restaurée depuis
+# un modèle enregistré sur disque au lieu de rejouer les migrations. Le modèle
+# est identifié par une empreinte des fichiers de migration : toute migration
+# ajoutée ou modifiée en produit un nouveau au lancement suivant.
+# Compatible avec `manage.py test --parallel` : les bases des processus sont
+# clonées par Django à partir de la base restaurée.
+# Les dépassements de budget de requêtes lèvent une exception pendant les tests
+# (sauf QUERY_BUDGET_RAISE=False dans l'environnement).
+
+import hashlib
+import os
+import sqlite3
+import sys
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+
+import django
+from decouple import config
+from django.conf import settings
+from django.db import connections
+from django.db.migrations.loader import MigrationLoader
+from django.test.runner import DiscoverRunner
+
+
+def migrations_fingerprint():
+    """Empreinte de l'état des migrations (fichiers sur disque et version de Django)"""
+    digest = hashlib.sha1(django.get_version().encode())
+    loader = MigrationLoader(None, ignore_no_migrations=True)
+    for key, migration in sorted(loader.disk_migrations.items()):
+        digest.update(('%s.%s' % key).encode())
+        digest.update(Path(sys.modules[migration.__module__].__file__).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+class SQLiteTemplate:
+    """Modèle d'une base de test SQLite en mémoire, restauré par l'API de sauvegarde de SQLite"""
+
+    def __init__(self, connection, directory, fingerprint):
+        self.connection = connection
+        self.directory = Path(directory)
+        self.path = self.directory / f'{connection.alias}-{fingerprint}.sqlite3'
+
+    @contextmanager
+    def installed(self):
+        """Remplace la création de la base de test pendant la préparation des bases"""
+        creation = self.connection.creation
+        create_test_db = creation.create_test_db
+
+        def create_from_template(verbosity=1, autoclobber=False, serialize=True, keepdb=False):
+            if keepdb:
+                return create_test_db(verbosity, autoclobber, serialize, keepdb)
+            if self.path.exists():
+                return self.restore(verbosity, serialize)
+            name = create_test_db(verbosity, autoclobber, serialize, keepdb)
+            self.save()
+            return name
+
+        creation.create_test_db = create_from_template
+        try:
+            yield
+        finally:
+            del creation.create_test_db
+
+    def restore(self, verbosity, serialize):
+        """Équivalent de create_test_db, migrations remplacées par la copie du modèle"""
+        creation = self.connection.creation
+        name = creation._create_test_db(verbosity, autoclobber=True)
+        if verbosity >= 1:
+            creation.log('Restoring test database for alias %s from %s...' % (
+                creation._get_database_display_str(verbosity, name), self.path.name))
+        self.connection.close()
+        settings.DATABASES[self.connection.alias]['NAME'] = name
+        self.connection.settings_dict['NAME'] = name
+        self.connection.ensure_connection()
+        template = sqlite3.connect(self.path)
+        try:
+            template.backup(self.connection.connection)
+        finally:
+            template.close()
+        if serialize:
+            self.connection._test_serialized_contents = creation.serialize_db_to_string()
+        return name
+
+    def save(self):
+        """Enregistre la base migrée (écriture atomique : plusieurs lancements peuvent se croiser)"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for old in self.directory.glob(f'{self.connection.alias}-*.sqlite3'):
+            old.unlink(missing_ok=True)
+        partial = self.path.with_suffix('.%d.tmp' % os.getpid())
+        target = sqlite3.connect(partial)
+        try:
+            self.connection.connection.backup(target)
+        finally:
+            target.close()
+        os.replace(partial, self.path)
+
+
+class PortfolioTestRunner(DiscoverRunner):
+    """DiscoverRunner avec restauration des bases de test SQLite depuis un modèle"""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        settings.QUERY_BUDGET_RAISE = config('QUERY_BUDGET_RAISE', default=True, cast=bool)
+
+    def setup_databases(self, **kwargs):
+        directory = settings.TEST_DB_TEMPLATE_DIR
+        if not directory:
+            return super().setup_databases(**kwargs)
+        fingerprint = migrations_fingerprint()
+        with ExitStack() as stack:
+            for alias in kwargs.get('aliases') or connections:
+                connection = connections[alias]
+                if connection.vendor == 'sqlite' and connection.creation.is_in_memory_db(
+                        connection.creation._get_test_db_name()):
+                    stack.enter_context(SQLiteTemplate(connection, directory, fingerprint).installed())
+            return super().setup_databases(**kwargs)
@@ -1,3 +1,1079 @@
-from django.test import TestCase
+import asyncio
+import io
+import json
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core import mail
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, transaction
+from django.template import Engine
+from django.http import JsonResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from . import antispam, events
+from .analytics import compact_views
+from .archive import archive_contacts, restore_contacts
+from .bulk import chunked_update
+from .cache import bump_content_version, get_content_version
+from .counters import get_counters, reconcile_counters
+from .durations import refresh_durations
+from .factories import image_file, make_competence, make_experience, make_profile, make_projet
+from .loadtest import Histogram, LoadTest, WSGITarget, build_report, compare_reports
+from .localcache import LocalLRUCache, get_hot_cache
+from .payload import (build_portfolio_changes, experience_records, projet_records, published_experiences, published_projets,
+                      serialize_experience, serialize_experience_row, serialize_projet, serialize_projet_row)
+from .perfcheck import full_scans
+from .profiling import ProfilingMiddleware, make_token, prune_profiles
+from .querybudget import Limits, QueryBudget, QueryBudgetExceeded, query_budget
+from .models import (Profile, Competence, Projet, Experience, Contact, ContactArchive,
+                     ContactHistorique, Modification, ProfilRequete, StatistiqueVues, Tache, VueProjet)
+from .serializers import ExperienceSerializer, ProjetSerializer
+from .routers import PRIMARY_UNTIL_KEY, STICKY_COOKIE, PrimaryReplicaRouter, ReplicaRoutingMiddleware
+from .skillgraph import skill_graph
+from .tasks import TASKS, Worker, claim, execute, requeue_stale, schedule_periodic, task
+from .testrunner import migrations_fingerprint
+
+
+class AdminChangelistQueryBudgetTests(TestCase):
+    """Budget de requêtes par page des listes d'administration"""
+
+    # Nombre maximal de requêtes SQL par page de liste, quel que soit le volume
+    QUERY_BUDGET = 12
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'motdepasse')
+        competences = Competence.objects.bulk_create(
+            Competence(nom=f'Compétence {i}', categorie='backend') for i in range(5)
+        )
+        for i in range(30):
+            projet = Projet.objects.create(
+                titre=f'Projet {i}', description_courte='Court', description_longue='Long',
+                image_principale='projects/projet.jpg', date_debut=date(2024, 1, 1),
+            )
+            projet.technologies.set(competences)
+            experience = Experience.objects.create(
+                type_experience='travail', titre=f'Poste {i}', entreprise='Entreprise',
+                date_debut=date(2023, 1, 1), description='Description',
+            )
+            experience.competences_acquises.set(competences)
+        Contact.objects.bulk_create(
+            Contact(nom=f'Visiteur {i}', email='v@example.com', sujet='Sujet', message='Message de test')
+            for i in range(150)
+        )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def assertChangelistWithinBudget(self, model, params=None):
+        url = reverse('admin:portfolio_%s_changelist' % model._meta.model_name)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(len(queries), self.QUERY_BUDGET, [q['sql'] for q in queries])
+        return response, queries
+
+    def test_changelists_within_budget(self):
+        for model in (Competence, Projet, Experience, Contact):
+            with self.subTest(model=model.__name__):
+                self.assertChangelistWithinBudget(model)
+
+    @override_settings(ADMIN_PERFORMANCE_MODE=True)
+    def test_changelists_within_budget_performance_mode(self):
+        for model in (Competence, Projet, Experience, Contact):
+            with self.subTest(model=model.__name__):
+                self.assertChangelistWithinBudget(model)
+
+    @override_settings(ADMIN_PERFORMANCE_MODE=True)
+    def test_contact_keyset_pagination(self):
+        response, queries = self.assertChangelistWithinBudget(Contact)
+        changelist = response.context['cl']
+        first_page = list(changelist.result_list)
+        self.assertEqual(len(first_page), changelist.list_per_page)
+        self.assertNotIn('COUNT(', ' '.join(q['sql'] for q in queries))
+
+        response, queries = self.assertChangelistWithinBudget(Contact, {'apres': first_page[-1].pk})
+        second_page = list(response.context['cl'].result_list)
+        self.assertEqual(len(second_page), Contact.objects.count() - changelist.list_per_page)
+        self.assertIsNone(response.context['cl'].next_page_url())
+        self.assertTrue(all(c.pk < first_page[-1].pk for c in second_page))
+
+        # Curseur invalide : première page
+        response, _ = self.assertChangelistWithinBudget(Contact, {'apres': 'abc'})
+        self.assertEqual(list(response.context['cl'].result_list), first_page)
+
+
+class BulkActionTests(TestCase):
+    """Actions d'administration en masse traitées par lots"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'motdepasse')
+        Contact.objects.bulk_create(
+            Contact(nom=f'Visiteur {i}', email='v@example.com', sujet='Sujet',
+                    message='Message de test', lu=i % 3 == 0)
+            for i in range(45)
+        )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    @override_settings(ADMIN_BULK_CHUNK_SIZE=7)
+    def test_mark_as_read_select_across_filtered(self):
+        unread = Contact.objects.filter(lu=False).count()
+        response = self.client.post(
+            reverse('admin:portfolio_contact_changelist') + '?lu__exact=0',
+            {'action': 'mark_as_read', 'select_across': '1', 'index': '0',
+             '_selected_action': [Contact.objects.filter(lu=False).first().pk]},
+            follow=True,
+        )
+        self.assertContains(response, f"{unread} message(s) marqué(s) comme lu(s).")
+        # Avancement : un message par lot de 7
+        self.assertContains(response, f"Lot 5/5 : {unread} ligne(s) mise(s) à jour.")
+        self.assertFalse(Contact.objects.filter(lu=False).exists())
+
+    def test_chunked_update_reports_progress(self):
+        progress = []
+        count = chunked_update(Contact.objects.all(), chunk_size=10,
+                               progress=lambda updated, chunks: progress.append((updated, chunks)),
+                               repondu=True)
+        self.assertEqual(count, 45)
+        self.assertEqual(progress[-1], (45, 5))
+
+
+class MediaServingTests(TestCase):
+    """Fichiers média : requêtes partielles, conditionnelles et compteur de téléchargements du CV"""
+
+    CONTENU = bytes(range(256)) * 4
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        for name in ('documents/cv.pdf', 'documents/ancien.pdf', 'projects/brouillon.png'):
+            (Path(directory.name) / name).parent.mkdir(exist_ok=True)
+            (Path(directory.name) / name).write_bytes(self.CONTENU)
+        self.enterContext(override_settings(MEDIA_ROOT=directory.name, MEDIA_ACCEL=''))
+        self.profile = make_profile(cv='documents/cv.pdf')
+        self.url = reverse('media', args=['documents/cv.pdf'])
+
+    def get(self, **headers):
+        response = self.client.get(self.url, **headers)
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        response.close()
+        return response, body
+
+    def downloads(self):
+        return Profile.objects.get(pk=self.profile.pk).telechargements_cv
+
+    def test_ranges(self):
+        size = len(self.CONTENU)
+        for header, start, end in (('bytes=10-19', 10, 19), ('bytes=1000-', 1000, size - 1),
+                                   ('bytes=-24', size - 24, size - 1), ('bytes=0-5000', 0, size - 1)):
+            with self.subTest(range=header):
+                response, body = self.get(HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(response['Content-Range'], f'bytes {start}-{end}/{size}')
+                self.assertEqual(body, self.CONTENU[start:end + 1])
+
+        response, _ = self.get(HTTP_RANGE=f'bytes={size}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{size}')
+        # Plages multiples : fichier complet
+        response, body = self.get(HTTP_RANGE='bytes=0-1,5-6')
+        self.assertEqual((response.status_code, body), (200, self.CONTENU))
+
+    def test_conditional_requests(self):
+        response, _ = self.get()
+        etag = response['ETag']
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag)[0].status_code, 304)
+
+        response, _ = self.get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=etag)
+        self.assertEqual(response.status_code, 206)
+        # If-Range périmé : le fichier a changé, il est renvoyé en entier
+        response, body = self.get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"autre"')
+        self.assertEqual((response.status_code, body), (200, self.CONTENU))
+
+    def test_cv_downloads_counted_after_complete_transfer(self):
+        response = self.client.get(self.url)
+        self.assertEqual(self.downloads(), 0)
+        b''.join(response.streaming_content)
+        response.close()
+        self.assertEqual(self.downloads(), 1)
+
+        # Segments d'un téléchargement ou 304 : non comptés ; plage couvrant tout le fichier : comptée
+        self.get(HTTP_RANGE='bytes=100-')
+        self.get(HTTP_RANGE='bytes=0-99')
+        self.get(HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(self.downloads(), 1)
+        self.get(HTTP_RANGE='bytes=0-')
+        self.assertEqual(self.downloads(), 2)
+
+    def test_interrupted_transfer_is_not_counted(self):
+        response = self.client.get(self.url)
+        response.block_size = 100
+        next(iter(response.streaming_content))
+        response.close()
+        self.assertEqual(self.downloads(), 0)
+
+    def test_only_published_files_are_served(self):
+        # Fichier non référencé, image d'un projet inactif : 404
+        projet = make_projet(profile=self.profile, image_principale='projects/brouillon.png', actif=False, images=0)
+        self.url = reverse('media', args=['documents/ancien.pdf'])
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        self.url = reverse('media', args=['projects/brouillon.png'])
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        projet.actif = True
+        projet.save()
+        self.assertEqual(self.get()[0].status_code, 200)
+
+
+class ContactArchiveTests(TestCase):
+    """Archivage des anciens messages de contact"""
+
+    def test_archive_moves_only_old_processed_messages(self):
+        ancien = timezone.now() - timedelta(days=settings.CONTACT_ARCHIVE_DAYS + 1)
+        for i in range(6):
+            contact = Contact.objects.create(nom=f'Visiteur {i}', email='v@example.com',
+                                             sujet='Sujet', message='Message de test')
+            Contact.objects.filter(pk=contact.pk).update(
+                envoye_le=ancien if i < 4 else timezone.now(), lu=i != 0, repondu=i != 0,
+            )
+
+        self.assertEqual(archive_contacts(chunk_size=2), 3)
+        self.assertEqual(Contact.objects.count(), 3)
+        self.assertEqual(ContactArchive.objects.count(), 3)
+        self.assertEqual(ContactHistorique.objects.filter(archive=True).count(), 3)
+        self.assertEqual(ContactHistorique.objects.count(), 6)
+
+        # Un lot : lecture, insertion, date d'envoi rétablie, suppression (+ point de sauvegarde)
+        with self.assertNumQueries(6):
+            restore_contacts(ContactArchive.objects.all())
+        self.assertEqual(Contact.objects.filter(envoye_le=ancien).count(), 4)
+
+
+@override_settings(CONTACT_SPAM_FILTER=True)
+class ContactFilterTests(TestCase):
+    """Filtrage des messages de contact avant enregistrement"""
+
+    MESSAGE = "Je souhaiterais discuter d'un projet de site web pour mon association le mois prochain."
+
+    def setUp(self):
+        antispam._filter = None
+
+    def post(self, **data):
+        return self.client.post(reverse('api_contact'), json.dumps(data), content_type='application/json')
+
+    def test_duplicates_and_spam_are_not_stored(self):
+        self.post(nom='Alice', email='alice@example.com', sujet='Projet', message=self.MESSAGE)
+        self.post(nom='Alice', email='alice@example.com', sujet='Projet', message=self.MESSAGE)
+        self.post(nom='Bob', email='bob@example.com', sujet='Site',
+                  message=self.MESSAGE.replace('prochain', 'suivant'))
+        response = self.post(nom='Eve', email='eve@example.com', sujet='WINNER',
+                             message='CASINO BITCOIN http://a.example http://b.example http://c.example')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Contact.objects.count(), 1)
+
+    def test_legitimate_french_message_is_accepted(self):
+        response = self.post(nom='Claire', email='claire@example.com', sujet='Refonte du site',
+                             message="Bonjour, je suis prêt à lancer la refonte de notre site : l'investissement "
+                                     "est validé et nous voulons améliorer le SEO. Êtes-vous disponible ?")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Contact.objects.count(), 1)
+
+    def test_failed_save_can_be_resent(self):
+        # Sans nom : refusé par la base, le message n'est pas mémorisé comme reçu
+        self.assertEqual(self.post(email='alice@example.com', sujet='Projet', message=self.MESSAGE).status_code, 400)
+        response = self.post(nom='Alice', email='alice@example.com', sujet='Projet', message=self.MESSAGE)
+        self.assertEqual(response.json()['message'], 'Message envoyé avec succès!')
+        self.assertEqual(Contact.objects.count(), 1)
+
+    @override_settings(TENANT_DOMAIN='exemple.com', ALLOWED_HOSTS=['.exemple.com', 'www.marie.fr'])
+    def test_same_message_reaches_each_portfolio(self):
+        jean = make_profile(nom='Jean', slug='jean')
+        marie = make_profile(nom='Marie', slug='marie', domaine='www.marie.fr')
+        message = dict(nom='Alice', email='alice@example.com', sujet='Projet', message=self.MESSAGE)
+        for host in ('jean.exemple.com', 'www.marie.fr', 'www.marie.fr'):
+            self.client.post(reverse('api_contact'), json.dumps(message), content_type='application/json',
+                             HTTP_HOST=host)
+        self.assertEqual(Contact.objects.filter(profile=jean).count(), 1)
+        self.assertEqual(Contact.objects.filter(profile=marie).count(), 1)
+
+    def test_rolling_bloom_filter_expires(self):
+        bloom = antispam.RollingBloomFilter(size_bits=1 << 12, window=10)
+        self.assertFalse(bloom.check_and_add('cle', now=bloom.rotated_at))
+        self.assertTrue(bloom.check_and_add('cle', now=bloom.rotated_at + 5))
+        self.assertFalse(bloom.check_and_add('autre', now=bloom.rotated_at + 5))
+        self.assertFalse(bloom.check_and_add('cle', now=bloom.rotated_at + 25))
+
+
+class TemplateCacheTests(TestCase):
+    """Templates compilés une seule fois et fragments mis en cache par version du contenu"""
+
+    def test_cached_loader_compiles_templates_once(self):
+        loaders = settings.TEMPLATES[0]['OPTIONS']['loaders']
+        self.assertEqual(loaders[0][0] == 'django.template.loaders.cached.Loader', settings.TEMPLATE_CACHE)
+        engine = Engine(dirs=settings.TEMPLATES[0]['DIRS'],
+                        loaders=[('django.template.loaders.cached.Loader', ['django.template.loaders.filesystem.Loader'])],
+                        libraries={'static': 'django.templatetags.static', 'cache': 'django.templatetags.cache'})
+        self.assertIs(engine.get_template('index.html'), engine.get_template('index.html'))
+
+    def test_fragments_follow_content_version(self):
+        profile = make_profile(nom='Jean')
+        url = reverse('index')
+        self.assertContains(self.client.get(url), 'JEAN')
+        # Mise à jour en masse, sans signal : les fragments en cache sont servis
+        Profile.objects.filter(pk=profile.pk).update(nom='Marie')
+        self.assertContains(self.client.get(url), 'JEAN')
+        profile.nom = 'Marie'
+        profile.save()
+        self.assertContains(self.client.get(url), 'MARIE')
+
+    def test_version_bumped_again_after_commit(self):
+        version = get_content_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_content_version()
+            bump_content_version()
+            self.assertEqual(get_content_version(), version + 2)
+        # Une requête servie avant la validation a pu cacher l'ancien contenu sous la version + 2
+        self.assertEqual(get_content_version(), version + 3)
+
+
+class ViewAnalyticsTests(TestCase):
+    """Journal des vues de projets et agrégats horaires / journaliers"""
+
+    def test_compaction_derives_vues_from_rollups(self):
+        projet = Projet.objects.create(
+            titre='Projet', description_courte='Court', description_longue='Long',
+            image_principale='projects/projet.jpg', date_debut=date(2024, 1, 1),
+        )
+        url = reverse('increment_project_views', args=[projet.pk])
+        for _ in range(3):
+            self.client.get(url)
+        self.assertEqual(compact_views(), 3)
+        # Réponse : vues compactées et vues du journal, dont celle enregistrée
+        self.assertEqual([self.client.get(url).json()['views'] for _ in range(2)], [4, 5])
+        self.assertEqual(compact_views(), 2)
+
+        projet.refresh_from_db()
+        self.assertEqual(projet.vues, 5)
+        self.assertFalse(VueProjet.objects.exists())
+        self.assertEqual(StatistiqueVues.objects.get(periode='jour').vues, 5)
+
+        stats = self.client.get(reverse('api_stats'), {'periode': 'heure'}).json()
+        self.assertEqual(stats['projets'][0]['vues'], 5)
+
+
+class PortfolioCountersTests(TestCase):
+    """Compteurs de statistiques maintenus de façon incrémentale"""
+
+    def test_counters_follow_saves_and_deletes(self):
+        projet = Projet.objects.create(
+            titre='Projet', description_courte='Court', description_longue='Long',
+            image_principale='projects/projet.jpg', date_debut=date(2024, 1, 1), featured=True,
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            contact = Contact.objects.create(nom='A', email='a@example.com', sujet='Sujet', message='Un message')
+        projet.actif = False
+        projet.save()
+        Projet.objects.create(
+            titre='Autre', description_courte='Court', description_longue='Long',
+            image_principale='projects/autre.jpg', date_debut=date(2024, 1, 1),
+        ).delete()
+
+        stats = self.client.get(reverse('api_portfolio_stats')).json()['stats']
+        self.assertEqual(stats['total_projets'], 0)
+        self.assertEqual(stats['projets_featured'], 0)
+        self.assertEqual(stats['messages_non_lus'], 1)
+        self.assertEqual(reconcile_counters(), {})
+
+        # Message lu depuis l'administration : compteur recalculé
+        contact.lu = True
+        contact.save()
+        self.assertEqual(get_counters()['messages_non_lus'], 0)
+
+    def test_contact_insert_does_not_read_or_lock_counters(self):
+        # Insertion seule pendant la transaction, compteur ajusté après la validation
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertNumQueries(1):
+                Contact.objects.create(nom='A', email='a@example.com', sujet='Sujet', message='Un message')
+            self.assertEqual(get_counters()['messages_non_lus'], 0)
+        self.assertEqual(get_counters()['messages_non_lus'], 1)
+
+    def test_reconcile_fixes_drift_from_bulk_updates(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Contact.objects.create(nom='A', email='a@example.com', sujet='Sujet', message='Un message')
+        Contact.objects.update(lu=True)
+        self.assertEqual(reconcile_counters(), {(None, 'messages_non_lus'): -1})
+        self.assertEqual(get_counters()['messages_non_lus'], 0)
+
+
+class PortfolioFormatsTests(TestCase):
+    """Formats de réponse de l'API portfolio"""
+
+    def test_normalized_shape_references_skill_ids(self):
+        python = Competence.objects.create(nom='Python', categorie='backend', niveau=90)
+        ancienne = Competence.objects.create(nom='Perl', categorie='backend', niveau=40, actif=False)
+        projet = Projet.objects.create(
+            titre='Projet', description_courte='Court', description_longue='Long',
+            image_principale='projects/projet.jpg', date_debut=date(2024, 1, 1),
+        )
+        projet.technologies.set([python, ancienne])
+
+        data = self.client.get(reverse('api_portfolio_data'), {'forme': 'normalisee'}).json()
+        self.assertEqual(sorted(data['projets'][0]['technologies']), [python.pk, ancienne.pk])
+        self.assertEqual([c['id'] for c in data['competences_annexes']], [ancienne.pk])
+
+        embedded = self.client.get(reverse('api_portfolio_data')).json()
+        self.assertEqual(embedded['projets'][0]['technologies'][0].keys(), {'nom', 'couleur'})
+
+    def test_unknown_format_is_not_acceptable(self):
+        response = self.client.get(reverse('api_portfolio_data'), {'format': 'xml'})
+        self.assertEqual(response.status_code, 406)
+
+
+@override_settings(ACCUEIL_PROJETS=2)
+class PortfolioSectionsTests(TestCase):
+    """API par sections chargées à la demande"""
+
+    def test_first_screen_then_sections_and_detail(self):
+        python = make_competence(nom='Python')
+        projets = [make_projet(technologies=[python], featured=i < 3, images=0, description_longue='Long' * 500)
+                   for i in range(5)]
+
+        accueil = self.client.get(reverse('api_portfolio_section', args=['accueil'])).json()
+        self.assertEqual(len(accueil['projets']), 2)
+        self.assertTrue(all(p['featured'] for p in accueil['projets']))
+        self.assertNotIn('description_longue', accueil['projets'][0])
+        self.assertNotIn('competences', accueil)
+
+        section = self.client.get(reverse('api_portfolio_section', args=['projets']))
+        self.assertEqual(len(section.json()['projets']), 5)
+        self.assertLess(len(section.content), len(self.client.get(reverse('api_portfolio_data')).content) / 4)
+        self.assertEqual(self.client.get(reverse('api_portfolio_section', args=['projets']))['X-Cache'], 'local')
+        competences = self.client.get(reverse('api_portfolio_section', args=['competences'])).json()
+        self.assertEqual([c['nom'] for c in competences['competences']], ['Python'])
+        self.assertEqual(self.client.get(reverse('api_portfolio_section', args=['inconnue'])).status_code, 404)
+
+        detail = self.client.get(reverse('api_project_detail', args=[projets[4].pk])).json()
+        self.assertEqual(detail['projet']['description_longue'], 'Long' * 500)
+        projets[4].actif = False
+        projets[4].save()
+        self.assertEqual(self.client.get(reverse('api_project_detail', args=[projets[4].pk])).status_code, 404)
+
+
+class LightweightRecordsTests(TestCase):
+    """Sérialisation par lignes légères (records.py)"""
+
+    def test_rows_match_instance_serialization(self):
+        python = make_competence(nom='Python', ordre=2)
+        django = make_competence(nom='Django', ordre=1)
+        perl = make_competence(nom='Perl', ordre=3, actif=False)
+        make_projet(technologies=[python, django, perl], images=2, statut='termine', featured=True)
+        make_projet(images=0)
+        make_experience(competences=[python, django])
+        make_experience(date_fin=date(2024, 6, 1), type_experience='formation')
+
+        with self.assertNumQueries(2):
+            rows = [serialize_projet_row(*record) for record in projet_records(published_projets(None))]
+        self.assertEqual(rows, [serialize_projet(p) for p in published_projets(None)])
+        self.assertEqual(rows[0]['technologies'][0]['nom'], 'Django')
+        self.assertEqual([serialize_experience_row(*record) for record in experience_records(published_experiences(None))],
+                         [serialize_experience(e) for e in published_experiences(None)])
+
+
+class PortfolioChangesTests(TestCase):
+    """Synchronisation différentielle à partir du journal des modifications"""
+
+    def test_changes_since_version(self):
+        python = Competence.objects.create(nom='Python', categorie='backend', niveau=90)
+        projet = Projet.objects.create(
+            titre='Projet', description_courte='Court', description_longue='Long',
+            image_principale='projects/projet.jpg', date_debut=date(2024, 1, 1),
+        )
+        version = self.client.get(reverse('api_portfolio_data')).json()['version']
+
+        python.couleur = '#ff0000'
+        python.save()
+        projet.actif = False
+        projet.save()
+        autre = Projet.objects.create(
+            titre='Autre', description_courte='Court', description_longue='Long',
+            image_principale='projects/autre.jpg', date_debut=date(2024, 1, 1),
+        )
+        autre.technologies.add(python)
+
+        changes = self.client.get(reverse('api_portfolio_changes'), {'since': version}).json()
+        self.assertGreater(changes['version'], version)
+        self.assertEqual(changes['upserts']['competences'][0]['couleur'], '#ff0000')
+        self.assertEqual([p['id'] for p in changes['upserts']['projets']], [autre.pk])
+        self.assertEqual(changes['upserts']['projets'][0]['technologies'][0]['couleur'], '#ff0000')
+        self.assertEqual(changes['suppressions']['projets'], [projet.pk])
+
+        with self.settings(MODIFICATIONS_REREAD_WINDOW=0):
+            latest = self.client.get(reverse('api_portfolio_changes'), {'since': changes['version']}).json()
+        self.assertEqual(latest['upserts'], {})
+
+    def test_recent_entries_below_version_are_reread(self):
+        tardive = Competence.objects.create(nom='Validée en retard', categorie='backend', niveau=50)
+        Competence.objects.create(nom='Django', categorie='backend', niveau=50)
+        version = Modification.latest_sequence()
+        # Entrée de numéro inférieur créée dans la fenêtre : relue (mises à jour idempotentes)
+        changes = build_portfolio_changes(version)
+        self.assertEqual(changes['version'], version)
+        self.assertIn(tardive.pk, [c['id'] for c in changes['upserts']['competences']])
+        Modification.objects.filter(objet_id=tardive.pk).update(cree_le=timezone.now() - timedelta(hours=1))
+        self.assertEqual(build_portfolio_changes(version)['upserts'], {})
+
+    def test_pruned_log_requires_full_reload(self):
+        for nom in ('A', 'B', 'C'):
+            Competence.objects.create(nom=nom, categorie='backend', niveau=50)
+        Modification.objects.update(cree_le=timezone.now() - timedelta(days=60))
+        self.assertEqual(Modification.prune(30), 1)
+        response = self.client.get(reverse('api_portfolio_changes'), {'since': 0})
+        self.assertEqual(response.status_code, 410)
+
+    def test_prune_keeps_each_portfolio_version(self):
+        calme = Profile.objects.create(nom='Calme', slug='calme', email='calme@example.com',
+                                       bio='Bio', description_longue='Description')
+        Competence.objects.create(profile=calme, nom='Go', categorie='backend', niveau=50)
+        Competence.objects.create(nom='A', categorie='backend', niveau=50)
+        ancienne = Modification.latest_sequence(None)
+        Competence.objects.create(nom='B', categorie='backend', niveau=50)
+        Modification.objects.update(cree_le=timezone.now() - timedelta(days=60))
+        Competence.objects.create(nom='C', categorie='backend', niveau=50)
+
+        Modification.prune(30)
+        version = Modification.latest_sequence(calme.pk)
+        self.assertTrue(version)
+        changes = build_portfolio_changes(version, calme.pk)
+        self.assertEqual(changes['upserts'], {})
+        # Portfolio actif : la version d'avant la purge n'est plus couverte par le journal
+        self.assertIsNone(build_portfolio_changes(ancienne, None))
+
+
+class EventsBrokerTests(TestCase):
+    """Diffusion des notifications temps réel"""
+
+    def test_fanout_and_bounded_queue(self):
+        async def scenario():
+            broker = events.Broker(queue_size=3)
+            subscriptions = [broker.subscribe() for _ in range(100)]
+            other = broker.subscribe(tenant_id=2)
+            broker.publish([events.Event(None, 'projet', 1, 10)])
+            received = [await s.get(1) for s in subscriptions]
+            broker.publish([events.Event(None, 'projet', n, n) for n in range(5)])
+            overflow = await subscriptions[0].get(1)
+            broker.unsubscribe(subscriptions[0])
+            return received, overflow, len(broker), await other.get(0.01)
+
+        received, overflow, remaining, other = asyncio.run(scenario())
+        self.assertTrue(all(r == ([events.Event(None, 'projet', 1, 10)], False) for r in received))
+        self.assertEqual(len(overflow[0]), 3)
+        self.assertTrue(overflow[1])
+        self.assertEqual(remaining, 100)
+        self.assertEqual(other, ([], False))
+
+    def test_changes_notified_after_commit(self):
+        with mock.patch.object(events.get_broker(), 'publish') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                competence = Competence.objects.create(nom='Python', categorie='backend', niveau=90)
+        published = publish.call_args.args[0]
+        self.assertEqual([(e.type_objet, e.objet_id) for e in published], [('competence', competence.pk)])
+        self.assertEqual(published[0].version, Modification.latest_sequence())
+
+    def test_events_require_asgi(self):
+        self.assertEqual(self.client.get(reverse('api_events')).status_code, 501)
+
+
+@override_settings(TENANT_DOMAIN='exemple.com', ALLOWED_HOSTS=['.exemple.com', 'www.marie.fr'])
+class MultiPortfolioTests(TestCase):
+    """Plusieurs portfolios servis par le même déploiement"""
+
+    def setUp(self):
+        self.jean = Profile.objects.create(nom='Jean', slug='jean', email='jean@example.com',
+                                           bio='Bio', description_longue='Description')
+        self.marie = Profile.objects.create(nom='Marie', slug='marie', domaine='www.marie.fr',
+                                            email='marie@example.com', bio='Bio', description_longue='Description')
+        Competence.objects.create(profile=self.jean, nom='Python', categorie='backend', niveau=90)
+        Competence.objects.create(profile=self.marie, nom='Rust', categorie='backend', niveau=80)
+
+    def test_tenant_resolved_from_host(self):
+        url = reverse('api_portfolio_data')
+        jean = self.client.get(url, HTTP_HOST='jean.exemple.com').json()
+        marie = self.client.get(url, HTTP_HOST='www.marie.fr').json()
+        self.assertEqual(jean['profile']['nom'], 'Jean')
+        self.assertEqual([c['nom'] for c in jean['competences']], ['Python'])
+        self.assertEqual([c['nom'] for c in marie['competences']], ['Rust'])
+
+        stats = self.client.get(reverse('api_portfolio_stats'), HTTP_HOST='www.marie.fr').json()['stats']
+        self.assertEqual(stats['total_competences'], 1)
+
+    def test_edits_only_invalidate_own_tenant(self):
+        versions = (get_content_version(self.jean.pk), get_content_version(self.marie.pk))
+        Competence.objects.create(profile=self.jean, nom='Django', categorie='backend', niveau=70)
+        self.assertNotEqual(get_content_version(self.jean.pk), versions[0])
+        self.assertEqual(get_content_version(self.marie.pk), versions[1])
+
+        changes = self.client.get(reverse('api_portfolio_changes'), {'since': 0}, HTTP_HOST='www.marie.fr').json()
+        self.assertEqual([c['nom'] for c in changes['upserts']['competences']], ['Rust'])
+
+    def test_skills_of_another_portfolio_are_not_found(self):
+        python = Competence.objects.get(nom='Python')
+        url = reverse('api_skill_related', args=[python.pk])
+        self.assertEqual(self.client.get(url, HTTP_HOST='jean.exemple.com').status_code, 200)
+        self.assertEqual(self.client.get(url, HTTP_HOST='www.marie.fr').status_code, 404)
+
+    def test_deleting_a_portfolio_drops_its_journal(self):
+        # Suppression d'une instance, puis d'un queryset (objets supprimés en cascade)
+        self.jean.delete()
+        Profile.objects.filter(pk=self.marie.pk).delete()
+        self.assertFalse(Modification.objects.exists())
+
+
+class ReplicaRoutingTests(TestCase):
+    """Routage des lectures vers les répliques"""
+
+    def setUp(self):
+        cache.delete_many(['%s:%s' % (PRIMARY_UNTIL_KEY, tenant_id) for tenant_id in (None, -1)])
+
+    def route(self, request):
+        """Base de lecture choisie pendant le traitement de la requête"""
+        router = PrimaryReplicaRouter(replicas=['replica'])
+        seen = []
+
+        def view(request):
+            seen.append(router.db_for_read(Projet))
+            return JsonResponse({})
+
+        response = ReplicaRoutingMiddleware(view)(request)
+        return seen[0], response
+
+    def test_public_reads_use_replica_and_writes_stick_to_primary(self):
+        factory = RequestFactory()
+        self.assertEqual(self.route(factory.get('/api/portfolio/'))[0], 'replica')
+        self.assertEqual(self.route(factory.get('/admin/portfolio/projet/'))[0], 'default')
+
+        db, response = self.route(factory.post('/api/contact/'))
+        self.assertEqual(db, 'default')
+        sticky = response.cookies[STICKY_COOKIE].value
+        request = factory.get('/api/portfolio/')
+        request.COOKIES[STICKY_COOKIE] = sticky
+        self.assertEqual(self.route(request)[0], 'default')
+
+        # Hors requête (commandes, tâches de fond) : base principale
+        self.assertEqual(PrimaryReplicaRouter(replicas=['replica']).db_for_read(Projet), 'default')
+
+    def test_edits_send_portfolio_reads_to_primary(self):
+        request = RequestFactory().get('/api/portfolio/')
+        request.tenant_id = None
+        bump_content_version()
+        # Réplique peut-être en retard : ses lectures rempliraient le cache de la nouvelle version
+        self.assertEqual(self.route(request)[0], 'default')
+        request.tenant_id = -1
+        self.assertEqual(self.route(request)[0], 'replica')
+
+
+class HotCacheTests(TestCase):
+    """Cache local des processus devant le cache partagé"""
+
+    def test_lru_is_bounded_in_bytes_and_revalidates_versions(self):
+        lru = LocalLRUCache(max_bytes=10, max_entries=10, ttl=5)
+        lru.set('a', b'aaaaaa', version=1, now=0)
+        lru.set('b', b'bbbbbb', version=1, now=0)
+        self.assertEqual(len(lru), 1)
+        self.assertEqual(lru.get('b', lambda version: False, now=1), b'bbbbbb')
+        # Expirée : conservée si la version n'a pas changé
+        self.assertEqual(lru.get('b', lambda version: version == 1, now=10), b'bbbbbb')
+        self.assertIsNone(lru.get('b', lambda version: False, now=20))
+        stats = lru.stats()
+        self.assertEqual((stats['hits'], stats['revalidations'], stats['misses'], stats['evictions']),
+                         (1, 1, 1, 1))
+
+    def test_api_served_locally_until_content_changes(self):
+        python = Competence.objects.create(nom='Python', categorie='backend', niveau=90)
+        url = reverse('api_portfolio_data')
+        self.assertEqual(self.client.get(url)['X-Cache'], 'miss')
+        self.assertEqual(self.client.get(url)['X-Cache'], 'local')
+
+        python.nom = 'Python 3'
+        python.save()
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'miss')
+        self.assertEqual(response.json()['competences'][0]['nom'], 'Python 3')
+
+        # Notification d'un autre processus : copie locale abandonnée, cache partagé intact
+        get_hot_cache().events_received([events.Event(None, Modification.COMPETENCE, python.pk, 0)])
+        self.assertEqual(self.client.get(url)['X-Cache'], 'shared')
+
+
+class SkillGraphTests(TestCase):
+    """Index des compétences : projets d'une compétence et compétences associées"""
+
+    def setUp(self):
+        skill_graph.clear()
+        self.python, self.django, self.react = (make_competence(nom=nom) for nom in ('Python', 'Django', 'React'))
+        self.projets = [
+            make_projet(technologies=[self.python, self.django], images=0),
+            make_projet(technologies=[self.python, self.django, self.react], images=0),
+            make_projet(technologies=[self.react], images=0),
+        ]
+        self.experience = make_experience(competences=[self.python])
+
+    def related(self, competence):
+        return self.client.get(reverse('api_skill_related', args=[competence.pk]))
+
+    def test_projects_and_related_skills(self):
+        data = self.related(self.python).json()
+        self.assertEqual(data['projets'], [self.projets[0].pk, self.projets[1].pk])
+        self.assertEqual(data['experiences'], [self.experience.pk])
+        self.assertEqual([(c['nom'], c['nombre']) for c in data['associees']], [('Django', 2), ('React', 1)])
+
+        self.react.actif = False
+        self.react.save()
+        self.assertEqual(self.related(self.react).status_code, 404)
+
+    def test_graph_updated_incrementally(self):
+        self.related(self.python)
+        graph = skill_graph.entries[None].graph
+
+        # Liaisons modifiées depuis le projet, depuis la compétence, puis projet désactivé
+        self.projets[2].technologies.add(self.python)
+        self.react.projet_set.remove(self.projets[1])
+        self.projets[0].actif = False
+        self.projets[0].save()
+        data = self.related(self.python).json()
+        self.assertIs(skill_graph.entries[None].graph, graph)
+        self.assertEqual(data['projets'], [self.projets[1].pk, self.projets[2].pk])
+        self.assertEqual([(c['nom'], c['nombre']) for c in data['associees']], [('Django', 1), ('React', 1)])
+
+        self.django.delete()
+        data = self.related(self.python).json()
+        self.assertIs(skill_graph.entries[None].graph, graph)
+        self.assertEqual([(c['nom'], c['nombre']) for c in data['associees']], [('React', 1)])
+
+        # Modification sans signal (mise à jour en masse) : graphe reconstruit
+        Projet.objects.update(actif=True)
+        bump_content_version()
+        self.assertEqual(len(self.related(self.python).json()['projets']), 3)
+        self.assertIsNot(skill_graph.entries[None].graph, graph)
+
+    def test_graph_kept_after_commit(self):
+        self.related(self.python)
+        entry = skill_graph.entries[None]
+        version = get_content_version()
+
+        # Incrément répété après la validation : même modification, graphe conservé
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self.projets[2].technologies.add(self.python)
+        self.assertEqual(get_content_version(), version + 2)
+        data = self.related(self.python).json()
+        self.assertIs(skill_graph.entries[None], entry)
+        self.assertEqual(entry.version, get_content_version())
+        self.assertEqual(data['projets'], [project.pk for project in self.projets])
+
+
+class PrecomputedDurationTests(TestCase):
+    """Durées enregistrées avec les objets et mois d'expérience par compétence"""
+
+    def setUp(self):
+        self.python = Competence.objects.create(nom='Python', categorie='backend')
+        self.experience = Experience.objects.create(
+            type_experience='travail', titre='Poste', entreprise='Entreprise',
+            date_debut=date(2020, 1, 1), date_fin=date(2021, 7, 1), description='Description',
+        )
+
+    def test_durations_kept_current_on_save(self):
+        self.assertEqual(self.experience.duree_mois, 18)
+        self.assertEqual(ExperienceSerializer(self.experience).data['duree'], '1 an et 6 mois')
+        projet = Projet.objects.create(titre='Projet', description_courte='Court', description_longue='Long',
+                                       date_debut=date(2024, 1, 1))
+        self.assertIsNone(ProjetSerializer(projet).data['duree_projet'])
+        projet.date_fin = date(2024, 3, 1)
+        projet.save()
+        self.assertEqual(Projet.objects.filter(duree_mois__gte=2).get(), projet)
+
+    def test_skill_experience_rollup(self):
+        self.experience.competences_acquises.add(self.python)
+        self.python.refresh_from_db()
+        self.assertEqual(self.python.mois_experience, 18)
+
+        # Expérience en cours : durée rafraîchie chaque jour
+        self.experience.date_fin = None
+        self.experience.save()
+        self.assertEqual(refresh_durations(today=date(2022, 1, 1)), 1)
+        self.assertEqual(Experience.objects.get().duree_mois, 24)
+        self.python.refresh_from_db()
+        self.assertEqual(self.python.mois_experience, 24)
+
+        self.experience.delete()
+        self.python.refresh_from_db()
+        self.assertEqual(self.python.mois_experience, 0)
+
+
+class TestInfrastructureTests(TestCase):
+    """Fabriques et base de test"""
+
+    def test_factories_keep_images_in_memory(self):
+        projet = make_projet(profile=make_profile(), technologies=[make_competence()], images=3)
+        self.assertEqual(projet.image_2.width, 8)
+        self.assertTrue(default_storage.exists(projet.image_3.name))
+        self.assertFalse((Path(settings.MEDIA_ROOT) / projet.image_principale.name).exists())
+        self.assertEqual(image_file('photo.jpg').content_type, 'image/jpeg')
+
+    def test_template_fingerprint_follows_migrations(self):
+        fingerprint = migrations_fingerprint()
+        self.assertEqual(migrations_fingerprint(), fingerprint)
+        with mock.patch('portfolio.testrunner.django.get_version', return_value='0'):
+            self.assertNotEqual(migrations_fingerprint(), fingerprint)
+
+
+class LoadTestHarnessTests(TestCase):
+    """Outil de test de charge : histogrammes, boucle ouverte, rapports"""
+
+    def test_histogram_precision(self):
+        histogram = Histogram()
+        for value in range(1, 10001):
+            histogram.record(value)
+        self.assertAlmostEqual(histogram.percentile(50), 5000, delta=50)
+        self.assertAlmostEqual(histogram.percentile(99), 9900, delta=99)
+        self.assertEqual(Histogram.from_dict(histogram.to_dict()).summary(), histogram.summary())
+
+    def test_open_loop_step_report(self):
+        target = mock.Mock()
+        target.request.return_value = 200
+        step = LoadTest(target, mix={'portfolio': 1}, seed=1, concurrency=2).run_step(rate=200, duration=0.2)
+        self.assertGreater(step.sent, 10)
+        self.assertEqual(step.completed, step.sent)
+        report = build_report([step], 'wsgi', {'portfolio': 1}, 2, slo_ms=None)
+        self.assertEqual(report['steps'][0]['operations']['portfolio']['count'], step.sent)
+        self.assertEqual(len(compare_reports(report, report)), 1)
+
+        # Cible dans le processus
+        self.assertEqual(WSGITarget().request('GET', reverse('api_portfolio_data')), 200)
+
+
+class PerfCheckTests(TestCase):
+    """Bilan de santé des performances (commande perfcheck)"""
+
+    def test_json_report_and_strict_exit(self):
+        make_projet(technologies=[make_competence(profile=make_profile())])
+        output = io.StringIO()
+        call_command('perfcheck', '--format', 'json', '--rendus', '2', stdout=output)
+        report = json.loads(output.getvalue())
+        endpoints = [r for r in report['resultats'] if r['categorie'] == 'points_acces']
+        self.assertIn('api_skill_related', [r['nom'] for r in endpoints])
+        for result in endpoints:
+            self.assertEqual(result['statut'], 'ok', result)
+            self.assertLessEqual(result['valeurs']['requetes'], result['valeurs']['budget'])
+        self.assertEqual({r['categorie'] for r in report['resultats']},
+                         {'urls', 'points_acces', 'index', 'template', 'configuration', 'media'})
+        # LocMemCache : avertissement, donc échec en mode strict
+        with self.assertRaises(CommandError):
+            call_command('perfcheck', '--strict', '--rendus', '1', stdout=io.StringIO())
+
+    def test_full_scan_detection(self):
+        self.assertEqual(full_scans('default', 'SELECT id FROM portfolio_contact WHERE message = %s', ['x']),
+                         {'portfolio_contact'})
+        self.assertEqual(full_scans('default', 'SELECT id FROM portfolio_contact WHERE id = %s', [1]), set())
+
+
+class ProfilingTests(TestCase):
+    """Profilage des requêtes à la demande"""
+
+    def test_disabled_middleware_is_removed(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            ProfilingMiddleware(lambda request: None)
+
+    @override_settings(PROFILING_ENABLED=True)
+    def test_signed_header_profiles_request(self):
+        make_competence()  # nouvelle version du contenu : réponse calculée, pas servie par le cache
+        url = reverse('api_portfolio_data')
+        response = self.client.get(url, HTTP_X_PROFILE=make_token())
+        profil = ProfilRequete.objects.get(pk=response['X-Profile-Id'])
+        self.assertEqual((profil.chemin, profil.statut, profil.echantillonne), (url, 200, False))
+        self.assertGreater(profil.requetes_sql, 0)
+        self.assertNotIn('X-Profile-Id', self.client.get(url, HTTP_X_PROFILE='faux'))
+
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'motdepasse')
+        self.client.force_login(admin)
+        page = self.client.get(reverse('admin:portfolio_profilrequete_change', args=[profil.pk]))
+        self.assertContains(page, 'api_portfolio_data')
+        download = self.client.get(reverse('admin:portfolio_profilrequete_download', args=[profil.pk]))
+        self.assertEqual(download.content, bytes(profil.donnees))
+
+    @override_settings(PROFILING_ENABLED=True, PROFILING_SAMPLE_RATE=1.0, PROFILING_KEEP=2)
+    def test_sampled_requests_keep_latest_profiles(self):
+        for _ in range(3):
+            self.client.get(reverse('api_portfolio_data'))
+        self.assertEqual(ProfilRequete.objects.filter(echantillonne=True, mode='echantillonnage').count(), 2)
+        self.assertEqual(prune_profiles(keep=1), 1)
+
+
+class BackgroundTaskTests(TestCase):
+    """File de tâches de fond en base"""
+
+    @override_settings(CONTACT_NOTIFICATION_EMAIL='proprietaire@example.com')
+    def test_contact_notification_runs_outside_request(self):
+        self.client.post(reverse('api_contact'), json.dumps({
+            'nom': 'Alice', 'email': 'alice@example.com', 'sujet': 'Projet', 'message': 'Bonjour, un projet ?',
+        }), content_type='application/json')
+        self.assertEqual(mail.outbox, [])
+        tache = Tache.objects.get(nom='notifier_contact')
+        self.assertEqual(tache.etat, Tache.EN_ATTENTE)
+
+        Worker(poll_interval=0).run(until_empty=True)
+        self.assertEqual(mail.outbox[0].to, ['proprietaire@example.com'])
+        tache.refresh_from_db()
+        self.assertEqual((tache.etat, tache.tentatives), (Tache.TERMINEE, 1))
+
+    def test_retry_with_backoff_then_failure(self):
+        @task(max_tentatives=2, name='test_echec')
+        def echoue():
+            raise ValueError('boum')
+        self.addCleanup(TASKS.pop, 'test_echec')
+
+        tache = echoue.enqueue()
+        with self.assertLogs('portfolio.tasks', 'WARNING'):
+            execute(claim('test')[0])
+        tache.refresh_from_db()
+        self.assertEqual((tache.etat, tache.tentatives), (Tache.EN_ATTENTE, 1))
+        self.assertGreater(tache.executer_apres, timezone.now())
+        self.assertIn('boum', tache.derniere_erreur)
+        self.assertEqual(claim('test'), [])  # pas avant le délai
+
+        Tache.objects.filter(pk=tache.pk).update(executer_apres=timezone.now())
+        with self.assertLogs('portfolio.tasks', 'WARNING'):
+            execute(claim('test')[0])
+        tache.refresh_from_db()
+        self.assertEqual(tache.etat, Tache.ECHEC)
+
+    def test_abandoned_task_fails_after_last_attempt(self):
+        @task(max_tentatives=2, name='test_abandon')
+        def abandon():
+            pass
+        self.addCleanup(TASKS.pop, 'test_abandon')
+
+        tache = abandon.enqueue()
+        plus_tard = timezone.now() + timedelta(seconds=settings.TASKS_LOCK_TIMEOUT + 1)
+        for etat in (Tache.EN_ATTENTE, Tache.ECHEC):
+            claim('test')
+            requeue_stale(plus_tard)
+            tache.refresh_from_db()
+            self.assertEqual(tache.etat, etat)
+        self.assertEqual(tache.tentatives, 2)
+
+    def test_worker_options_conflict(self):
+        with self.assertRaises(CommandError):
+            call_command('taskworker', processus=2, jusqua_vide=True)
+
+    def test_periodic_tasks_scheduled_once_per_period(self):
+        now = timezone.now()
+        added = schedule_periodic(now)
+        self.assertEqual(added, sum(1 for t in TASKS.values() if t.periodique))
+        # Autre processus, même période : rien de plus
+        self.assertEqual(schedule_periodic(now), 0)
+        self.assertEqual(schedule_periodic(now + timedelta(hours=1)), 1)  # compacter_vues
+
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'motdepasse')
+        self.client.force_login(admin)
+        response = self.client.get(reverse('admin:portfolio_tache_changelist'))
+        self.assertContains(response, 'compacter_vues')
+
+
+class QueryBudgetTests(TestCase):
+    """Budget de requêtes SQL des vues"""
+
+    def test_repeated_query_shape_is_reported(self):
+        ids = [Competence.objects.create(nom=nom, categorie='backend').pk for nom in 'ABC']
+        with self.assertRaises(QueryBudgetExceeded) as raised:
+            with QueryBudget(max_queries=10, max_repeats=2):
+                for pk in ids:
+                    Competence.objects.get(pk=pk)
+        self.assertIn('N+1', str(raised.exception))
+
+    @override_settings(QUERY_BUDGET_RAISE=False)
+    def test_production_logs_instead_of_raising(self):
+        with self.assertLogs('portfolio.querybudget', 'WARNING') as logs:
+            with QueryBudget(max_queries=0):
+                Competence.objects.count()
+        self.assertIn('1 requêtes pour un budget de 0', logs.output[0])
+
+    def test_declared_budgets_are_enforced(self):
+        url = reverse('api_portfolio_data')
+        self.assertEqual(resolve(url).func.query_budget.max_queries, 10)
+        changelist = resolve(reverse('admin:portfolio_projet_changelist')).func
+        self.assertEqual(changelist.query_budget.max_queries, 12)
+
+        Competence.objects.create(nom='Python', categorie='backend')
+        with mock.patch.object(resolve(url).func, 'query_budget', Limits(1, None, None)):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get(url)
+
+    def test_async_views_are_rejected(self):
+        async def vue(request):
+            return None
+
+        with self.assertRaises(TypeError):
+            query_budget(2)(vue)
+
+
+class PortfolioTransferTests(TestCase):
+    """Import / export en masse du contenu"""
+
+    def setUp(self):
+        self.profile = Profile.objects.create(nom='Jean', slug='jean', email='jean@example.com',
+                                              bio='Bio', description_longue='Description')
+        self.python = Competence.objects.create(profile=self.profile, nom='Python', categorie='backend')
+        self.projet = Projet.objects.create(
+            profile=self.profile, titre='Projet', description_courte='Court', description_longue='Long',
+            image_principale='projects/projet.jpg', date_debut=date(2024, 1, 1), featured=True,
+        )
+        self.projet.technologies.add(self.python)
+        Contact.objects.create(profile=self.profile, nom='Visiteur', email='v@example.com',
+                               sujet='Sujet', message='Message')
+        Contact.objects.update(envoye_le=timezone.now() - timedelta(days=400))
+
+    def test_round_trip(self):
+        envoye_le = Contact.objects.get().envoye_le
+        for destination, fmt in (('portfolio.jsonl.gz', 'jsonl'), ('csv', 'csv')):
+            with self.subTest(format=fmt), tempfile.TemporaryDirectory() as directory:
+                path = str(Path(directory) / destination)
+                call_command('portfolio_export', path, format=fmt, stdout=mock.Mock())
+                Profile.objects.all().delete()
+                call_command('portfolio_import', path, stdout=mock.Mock())
+
+                projet = Projet.objects.get(pk=self.projet.pk)
+                self.assertEqual(list(projet.technologies.all()), [self.python])
+                self.assertEqual(Contact.objects.get().envoye_le, envoye_le)
+                self.assertEqual(get_counters(self.profile.pk)['projets_featured'], 1)
+
+                # Second import : mise à jour des objets existants
+                Projet.objects.update(titre='Modifié')
+                call_command('portfolio_import', path, stdout=mock.Mock())
+                self.assertEqual(Projet.objects.get().titre, 'Projet')
+                self.assertEqual(Projet.technologies.through.objects.count(), 1)
+
+    def test_media_copied_in_parallel(self):
+        with tempfile.TemporaryDirectory() as export:
+            default_storage.save('projects/projet.jpg', ContentFile(b'image'))
+            call_command('portfolio_export', str(Path(export) / 'p.jsonl'), media=str(Path(export) / 'media'),
+                         stdout=mock.Mock())
+            default_storage.delete('projects/projet.jpg')
+            call_command('portfolio_import', str(Path(export) / 'p.jsonl'), media=str(Path(export) / 'media'),
+                         stdout=mock.Mock())
+            with default_storage.open('projects/projet.jpg') as image:
+                self.assertEqual(image.read(), b'image')
@@ -0,0 +1,373 @@
+# portfolio/transfer.py
+# Import / export en masse du contenu des portfolios (JSON Lines ou CSV), en
+# flux : mémoire constante quel que soit le volume, écritures par lots
+# (requêtes préparées exécutées en executemany, liaisons insérées directement
+# dans les tables intermédiaires) et copie parallèle des fichiers média. Les identifiants sont conservés :
+# un objet déjà présent est mis à jour, les autres sont créés.
+
+import csv
+import datetime
+import gzip
+import json
+import shutil
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.utils import timezone
+
+from .cache import TENANTS_VERSION_KEY, bump_content_version, bump_version
+from .counters import reconcile_counters
+from .durations import refresh_durations
+from .events import record_changes
+from .models import Competence, Contact, Experience, Modification, Profile, Projet
+
+# Description d'un type exporté : liaisons plusieurs-à-plusieurs, champs de
+# fichiers média et type dans le journal des modifications (None : non journalisé)
+Spec = namedtuple('Spec', ['model', 'm2m', 'media', 'modification'])
+
+# Types dans l'ordre d'export (les objets référencés précèdent les autres)
+SPECS = {
+    'profile': Spec(Profile, (), ('photo', 'cv'), Modification.PROFILE),
+    'competence': Spec(Competence, (), (), Modification.COMPETENCE),
+    'projet': Spec(Projet, ('technologies',), ('image_principale', 'image_2', 'image_3'), Modification.PROJET),
+    'experience': Spec(Experience, ('competences_acquises',), (), Modification.EXPERIENCE),
+    'contact': Spec(Contact, (), (), None),
+}
+
+
+def _attnames(model):
+    return [field.attname for field in model._meta.concrete_fields]
+
+
+def _link_columns(model, name):
+    """Colonnes (objet, compétence) de la table intermédiaire d'une liaison"""
+    field = model._meta.get_field(name)
+    return field.m2m_field_name() + '_id', field.m2m_reverse_field_name() + '_id'
+
+
+def _tenant_of(model, values):
+    return values['id'] if model is Profile else values['profile_id']
+
+
+class MediaCopier:
+    """Copie parallèle de fichiers média, avec un nombre borné de copies en attente"""
+
+    def __init__(self, copy, workers=8):
+        self.copy = copy
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='portfolio-media')
+        self.limit = workers * 4
+        self.pending = set()
+        self.seen = set()
+        self.copied = 0
+        self.errors = []
+
+    def _collect(self, done):
+        for future in done:
+            try:
+                self.copied += future.result()
+            except OSError as e:
+                self.errors.append(str(e))
+        self.pending -= done
+
+    def submit(self, name):
+        if not name or name in self.seen:
+            return
+        self.seen.add(name)
+        if len(self.pending) >= self.limit:
+            self._collect(wait(self.pending, return_when=FIRST_COMPLETED).done)
+        self.pending.add(self.executor.submit(self.copy, name))
+
+    def close(self):
+        """Attend la fin des copies ; retourne le nombre de fichiers copiés"""
+        self._collect(wait(self.pending).done)
+        self.executor.shutdown()
+        return self.copied
+
+
+def export_media_to(directory):
+    """Copie d'un fichier du stockage vers `directory` (1 si copié, 0 si déjà présent)"""
+    def copy(name):
+        target = Path(directory) / name
+        if target.exists() and target.stat().st_size == default_storage.size(name):
+            return 0
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with default_storage.open(name, 'rb') as source, open(target, 'wb') as destination:
+            shutil.copyfileobj(source, destination)
+        return 1
+    return copy
+
+
+def import_media_from(directory):
+    """Copie d'un fichier de `directory` vers le stockage (1 si copié, 0 si déjà présent)"""
+    def copy(name):
+        if default_storage.exists(name):
+            return 0
+        with open(Path(directory) / name, 'rb') as source:
+            default_storage.save(name, File(source))
+        return 1
+    return copy
+
+
+def iter_export(portfolio=None, chunk_size=None, media=None):
+    """Enregistrements (type, valeurs) du contenu, type par type, par id croissant
+
+    `portfolio` restreint l'export à un profil ; `media` (MediaCopier) reçoit
+    les noms des fichiers référencés.
+    """
+    chunk_size = chunk_size or settings.ADMIN_BULK_CHUNK_SIZE
+    for type_name, spec in SPECS.items():
+        rows = spec.model._base_manager.order_by('pk').values(*_attnames(spec.model))
+        if portfolio is not None:
+            rows = rows.filter(pk=portfolio) if spec.model is Profile else rows.filter(profile_id=portfolio)
+        last_pk = None
+        while True:
+            window = rows if last_pk is None else rows.filter(pk__gt=last_pk)
+            chunk = list(window[:chunk_size])
+            if not chunk:
+                break
+            ids = [row['id'] for row in chunk]
+            links = {}
+            for name in spec.m2m:
+                source, target = _link_columns(spec.model, name)
+                links[name] = {}
+                through = getattr(spec.model, name).through
+                pairs = through.objects.filter(**{source + '__in': ids}).order_by('pk').values_list(source, target)
+                for pk, linked in pairs:
+                    links[name].setdefault(pk, []).append(linked)
+            for row in chunk:
+                for name in spec.m2m:
+                    row[name] = links[name].get(row['id'], [])
+                if media is not None:
+                    for field in spec.media:
+                        media.submit(row[field])
+                yield type_name, row
+            last_pk = ids[-1]
+            if len(chunk) < chunk_size:
+                break
+
+
+def _json_default(value):
+    """Dates avec leurs microsecondes (DjangoJSONEncoder les tronque), autres types délégués"""
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    return DjangoJSONEncoder().default(value)
+
+
+def write_jsonl(path, records):
+    """Écrit les enregistrements en JSON Lines (gzip si le nom finit par .gz) ; retourne leur nombre"""
+    count = 0
+    opener = gzip.open if str(path).endswith('.gz') else open
+    with opener(path, 'wt', encoding='utf-8') as f:
+        for type_name, row in records:
+            f.write(json.dumps({'type': type_name, **row}, default=_json_default, ensure_ascii=False) + '\n')
+            count += 1
+    return count
+
+
+def read_jsonl(path):
+    """Lit un export JSON Lines ligne à ligne"""
+    opener = gzip.open if str(path).endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                row = json.loads(line)
+                yield row.pop('type'), row
+
+
+def write_csv(directory, records):
+    """Écrit un fichier CSV par type dans `directory` (liaisons : ids séparés par des espaces)"""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    count = 0
+    current, f, writer = None, None, None
+    try:
+        for type_name, row in records:
+            if type_name != current:
+                if f is not None:
+                    f.close()
+                current = type_name
+                f = open(directory / f'{type_name}.csv', 'w', encoding='utf-8', newline='')
+                writer = csv.DictWriter(f, fieldnames=list(row))
+                writer.writeheader()
+            for name in SPECS[type_name].m2m:
+                row[name] = ' '.join(map(str, row[name]))
+            writer.writerow(row)
+            count += 1
+    finally:
+        if f is not None:
+            f.close()
+    return count
+
+
+def read_csv(directory):
+    """Lit les fichiers CSV d'un export, type par type (valeur vide d'un champ nullable : None)"""
+    for type_name, spec in SPECS.items():
+        path = Path(directory) / f'{type_name}.csv'
+        if not path.exists():
+            continue
+        nullable = {field.attname for field in spec.model._meta.concrete_fields if field.null}
+        with open(path, encoding='utf-8', newline='') as f:
+            for row in csv.DictReader(f):
+                for key in nullable & row.keys():
+                    if row[key] == '':
+                        row[key] = None
+                yield type_name, row
+
+
+def _insert_sql(table, columns):
+    qn = connection.ops.quote_name
+    return 'INSERT INTO %s (%s) VALUES (%s)' % (
+        qn(table), ', '.join(qn(column) for column in columns), ', '.join(['%s'] * len(columns)))
+
+
+def insert_rows(model, objects, fields):
+    """INSERT des objets en une requête préparée exécutée par lot (executemany)
+
+    Plus rapide que bulk_create et sans pre_save : les dates auto_now /
+    auto_now_add importées sont conservées (date courante si absentes).
+    """
+    if not objects:
+        return
+    db = connections[DEFAULT_DB_ALIAS]
+    now = timezone.now()
+    dates = {field.attname for field in fields
+             if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)}
+    params = []
+    for obj in objects:
+        row = []
+        for field in fields:
+            value = getattr(obj, field.attname)
+            if value is None and field.attname in dates:
+                value = now
+            row.append(field.get_db_prep_save(value, db))
+        params.append(row)
+    with db.cursor() as cursor:
+        cursor.executemany(_insert_sql(model._meta.db_table, [field.column for field in fields]), params)
+
+
+def update_rows(model, objects, fields):
+    """UPDATE par clé primaire, en une requête préparée exécutée par lot
+
+    bulk_update construit un CASE WHEN par objet et par champ, coûteux à
+    générer comme à exécuter sur de gros lots.
+    """
+    if not objects or not fields:
+        return
+    db = connections[DEFAULT_DB_ALIAS]
+    qn = db.ops.quote_name
+    pk = model._meta.pk
+    sql = 'UPDATE %s SET %s WHERE %s = %%s' % (
+        qn(model._meta.db_table), ', '.join('%s = %%s' % qn(field.column) for field in fields), qn(pk.column))
+    params = [[field.get_db_prep_save(getattr(obj, field.attname), db) for field in fields]
+              + [pk.get_db_prep_save(obj.pk, db)] for obj in objects]
+    with db.cursor() as cursor:
+        cursor.executemany(sql, params)
+
+
+class Importer:
+    """Import par lots, dans une seule transaction (tout ou rien)"""
+
+    def __init__(self, batch_size=None, media=None):
+        self.batch_size = batch_size or settings.ADMIN_BULK_CHUNK_SIZE
+        self.media = media
+        # type -> [créés, mis à jour]
+        self.counts = {type_name: [0, 0] for type_name in SPECS}
+        self.tenants = set()
+
+    def run(self, records):
+        with transaction.atomic():
+            current, batch = None, []
+            for type_name, row in records:
+                if type_name not in SPECS:
+                    raise ValueError(f"Type inconnu : {type_name}")
+                if type_name != current or len(batch) >= self.batch_size:
+                    self.flush(current, batch)
+                    current, batch = type_name, []
+                batch.append(row)
+            self.flush(current, batch)
+            self.finish()
+        return self.counts
+
+    def decode(self, spec, row):
+        """Instance du modèle à partir des valeurs lues, et ses liaisons"""
+        values = {}
+        for field in spec.model._meta.concrete_fields:
+            if field.attname in row:
+                value = row[field.attname]
+                values[field.attname] = None if value is None else field.to_python(value)
+        if values.get('id') is None:
+            raise ValueError(f"{spec.model._meta.model_name} sans id : {row}")
+        links = {}
+        for name in spec.m2m:
+            linked = row.get(name)
+            if isinstance(linked, str):
+                linked = linked.split()
+            links[name] = None if linked is None else [int(pk) for pk in linked]
+        return spec.model(**values), links
+
+    def flush(self, type_name, batch):
+        if not batch:
+            return
+        spec = SPECS[type_name]
+        model = spec.model
+        decoded = [self.decode(spec, row) for row in batch]
+        objects = [obj for obj, _ in decoded]
+        tenant_field = 'pk' if model is Profile else 'profile_id'
+        existing = dict(model._base_manager.filter(pk__in=[obj.pk for obj in objects if obj.pk is not None])
+                        .values_list('pk', tenant_field))
+        to_create = [obj for obj in objects if obj.pk not in existing]
+        to_update = [obj for obj in objects if obj.pk in existing]
+        # Portfolios d'origine des objets mis à jour (déplacés éventuellement)
+        self.tenants.update(existing.values())
+
+        # Mise à jour des seuls champs présents dans tout le lot (les autres gardent leur valeur)
+        insert_rows(model, to_create, model._meta.concrete_fields)
+        update_rows(model, to_update, [field for field in model._meta.concrete_fields
+                                       if not field.primary_key and all(field.attname in row for row in batch)])
+
+        for name in spec.m2m:
+            through = getattr(model, name).through
+            source, target = _link_columns(model, name)
+            # Liaisons remplacées pour les objets qui les fournissent
+            replaced = [obj.pk for obj, links in decoded if obj.pk in existing and links[name] is not None]
+            if replaced:
+                through.objects.filter(**{source + '__in': replaced}).delete()
+            pairs = [(obj.pk, linked) for obj, links in decoded if links[name] is not None
+                     for linked in dict.fromkeys(links[name])]
+            if pairs:
+                with connection.cursor() as cursor:
+                    cursor.executemany(_insert_sql(through._meta.db_table, [source, target]), pairs)
+
+        by_tenant = {}
+        for obj in objects:
+            by_tenant.setdefault(_tenant_of(model, obj.__dict__), []).append(obj.pk)
+            if self.media is not None:
+                for field in spec.media:
+                    self.media.submit(getattr(obj, field).name)
+        self.tenants.update(by_tenant)
+        if spec.modification is not None:
+            for tenant_id, ids in by_tenant.items():
+                record_changes(tenant_id, spec.modification, ids)
+        self.counts[type_name][0] += len(to_create)
+        self.counts[type_name][1] += len(to_update)
+
+    def finish(self):
+        """Séquences des clés primaires, compteurs et caches des portfolios importés"""
+        models = [spec.model for spec in SPECS.values()]
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), models):
+                cursor.execute(sql)
+        # Écritures sans signaux : recalcul explicite
+        reconcile_counters(tenant_ids=self.tenants)
+        refresh_durations(tenant_ids=self.tenants, en_cours=False)
+        for tenant_id in self.tenants:
+            bump_content_version(tenant_id)
+        if self.counts['profile'] != [0, 0]:
+            bump_version(TENANTS_VERSION_KEY)
@@ -8,6 +8,14 @@ urlpatterns = [
     
     # API endpoints
     path('api/portfolio/', views.api_portfolio_data, name='api_portfolio_data'),
+    path('api/portfolio/changes/', views.api_portfolio_changes, name='api_portfolio_changes'),
+    path('api/portfolio/sections/<slug:section>/', views.api_portfolio_section, name='api_portfolio_section'),
+    path('api/events/', views.api_events, name='api_events'),
     path('api/contact/', views.api_contact, name='api_contact'),
+    path('api/project/<int:project_id>/', views.api_project_detail, name='api_project_detail'),
     path('api/project/<int:project_id>/views/', views.increment_project_views, name='increment_project_views'),
+    path('api/skills/<int:skill_id>/related/', views.api_skill_related, name='api_skill_related'),
+    path('api/stats/', views.api_stats, name='api_stats'),
+    path('api/stats/portfolio/', views.api_portfolio_stats, name='api_portfolio_stats'),
+    path('api/stats/cache/', views.api_cache_stats, name='api_cache_stats'),
 ]
\ No newline at end of file
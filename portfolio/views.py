@@ -1,109 +1,72 @@
 # views.py
 from django.shortcuts import render
-from django.http import JsonResponse
+from django.conf import settings
+from django.db import transaction
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
-from .models import Profile, Competence, Projet, Experience, Contact
+from django.utils.functional import SimpleLazyObject
+from .models import Profile, Competence, Projet, Experience, Contact, VueProjet
+from .cache import get_content_version
+from .media import serve_media_file
+from .events import event_stream, get_broker
+from .encoding import ENCODERS, bytes_response, encode, encoded_response, negotiate_format
+from .payload import (SECTIONS, build_portfolio_changes, build_portfolio_data, build_portfolio_section,
+                      build_projet_detail, published_media, published_profile, section_cache_key)
+from .antispam import check_contact, record_contact
+from .analytics import TRONCATURES, get_view_stats
+from .counters import get_counters
+from .localcache import get_hot_cache
+from .querybudget import query_budget
+from .serializers import PortfolioStatsSerializer
+from .skillgraph import skill_graph
+from .tasks import notifier_contact
 import json
+import os
+from functools import partial
 
+@query_budget(6)
 def index(request):
     """Vue principale pour afficher la page d'accueil"""
-    return render(request, 'index.html')
+    # Le profil n'est chargé que si un fragment du template n'est pas en cache
+    context = {
+        'tenant_id': request.tenant_id,
+        'content_version': get_content_version(request.tenant_id),
+        'fragment_timeout': settings.TEMPLATE_FRAGMENT_TIMEOUT,
+        'profile': SimpleLazyObject(lambda: published_profile(request.tenant_id)),
+    }
+    return render(request, 'index.html', context)
 
+def cached_response(request, make_key, build):
+    """Réponse encodée dans le format négocié, servie par le cache à deux niveaux (en-tête X-Cache)
+    
+    `make_key(fmt)` : clé de la réponse encodée dans le cache.
+    """
+    fmt = negotiate_format(request)
+    if fmt is None:
+        return JsonResponse({
+            'success': False,
+            'error': 'Format de réponse non disponible',
+            'formats': list(ENCODERS),
+        }, status=406)
+    body, source = get_hot_cache().get_or_set(make_key(fmt), request.tenant_id, lambda: encode(build(), fmt))
+    response = bytes_response(body, fmt)
+    response['X-Cache'] = source
+    return response
+
+@query_budget(10)
 def api_portfolio_data(request):
-    """API pour récupérer toutes les données du portfolio"""
+    """API pour récupérer toutes les données du portfolio
+    
+    Formats : JSON (défaut) ou MessagePack (?format=msgpack ou Accept: application/msgpack).
+    ?forme=normalisee : projets et expériences référencent les compétences par id.
+    Réponse encodée servie par le cache à deux niveaux (en-tête X-Cache : local, shared ou miss).
+    """
     try:
-        # Récupérer le profil principal (le premier actif)
-        profile = Profile.objects.filter(actif=True).first()
-        
-        # Récupérer les compétences par catégorie
-        competences = Competence.objects.filter(actif=True).order_by('ordre', 'nom')
-        
-        # Récupérer les projets actifs, avec les featured en premier
-        projets = Projet.objects.filter(actif=True).order_by('-featured', 'ordre', '-date_debut')
-        
-        # Récupérer les expériences actives, les plus récentes en premier
-        experiences = Experience.objects.filter(actif=True).order_by('-date_debut')
-        
-        # Préparer les données pour JSON
-        data = {
-            'success': True,
-            'profile': None,
-            'competences': [],
-            'projets': [],
-            'experiences': []
-        }
-        
-        # Sérialiser le profil
-        if profile:
-            data['profile'] = {
-                'nom': profile.nom,
-                'titre': profile.titre,
-                'email': profile.email,
-                'telephone': profile.telephone,
-                'bio': profile.bio,
-                'description_longue': profile.description_longue,
-                'ville': profile.ville,
-                'pays': profile.pays,
-                'photo': profile.photo.url if profile.photo else None,
-                'cv': profile.cv.url if profile.cv else None,
-                'linkedin': profile.linkedin,
-                'github': profile.github,
-                'twitter': profile.twitter,
-                'website': profile.website,
-            }
-        
-        # Sérialiser les compétences
-        for competence in competences:
-            data['competences'].append({
-                'id': competence.id,
-                'nom': competence.nom,
-                'categorie': competence.categorie,
-                'categorie_display': competence.get_categorie_display(),
-                'niveau': competence.niveau,
-                'icone': competence.icone,
-                'couleur': competence.couleur,
-                'ordre': competence.ordre
-            })
-        
-        # Sérialiser les projets
-        for projet in projets:
-            data['projets'].append({
-                'id': projet.id,
-                'titre': projet.titre,
-                'description_courte': projet.description_courte,
-                'description_longue': projet.description_longue,
-                'image_principale': projet.image_principale.url if projet.image_principale else None,
-                'image_2': projet.image_2.url if projet.image_2 else None,
-                'image_3': projet.image_3.url if projet.image_3 else None,
-                'technologies': [{'nom': tech.nom, 'couleur': tech.couleur} for tech in projet.technologies.all()],
-                'url_demo': projet.url_demo,
-                'url_code': projet.url_code,
-                'url_case_study': projet.url_case_study,
-                'statut': projet.statut,
-                'statut_display': projet.get_statut_display(),
-                'date_debut': projet.date_debut.isoformat() if projet.date_debut else None,
-                'date_fin': projet.date_fin.isoformat() if projet.date_fin else None,
-                'featured': projet.featured,
-                'vues': projet.vues
-            })
-        
-        # Sérialiser les expériences
-        for experience in experiences:
-            data['experiences'].append({
-                'id': experience.id,
-                'type_experience': experience.type_experience,
-                'type_display': experience.get_type_experience_display(),
-                'titre': experience.titre,
-                'entreprise': experience.entreprise,
-                'lieu': experience.lieu,
-                'date_debut': experience.date_debut.isoformat() if experience.date_debut else None,
-                'date_fin': experience.date_fin.isoformat() if experience.date_fin else None,
-                'est_en_cours': experience.est_en_cours,
-                'description': experience.description,
-                'competences_acquises': [comp.nom for comp in experience.competences_acquises.all()]
-            })
-        
-        return JsonResponse(data)
+        forme = 'normalisee' if request.GET.get('forme') == 'normalisee' else 'imbriquee'
+        return cached_response(request, lambda fmt: 'portfolio:api:data:%s:%s:%s' % (
+            request.tenant_id, forme, fmt), lambda: build_portfolio_data(
+            request.tenant_id, normalized=forme == 'normalisee'))
         
     except Exception as e:
         return JsonResponse({
@@ -111,6 +74,69 @@ def api_portfolio_data(request):
             'error': f'Erreur lors du chargement des données: {str(e)}'
         }, status=500)
 
+@query_budget(6)
+def api_portfolio_section(request, section):
+    """API du portfolio par sections chargées à la demande
+    
+    'accueil' (profil et projets mis en avant) au premier affichage, puis 'competences',
+    'projets' (résumés) et 'experiences' au défilement. Chaque section est mise en cache
+    séparément ; mêmes formats que /api/portfolio/.
+    """
+    if section not in SECTIONS:
+        return JsonResponse({'success': False, 'error': 'Section inconnue', 'sections': list(SECTIONS)}, status=404)
+    return cached_response(request, lambda fmt: section_cache_key(request.tenant_id, section, fmt),
+                           lambda: build_portfolio_section(section, request.tenant_id))
+
+@query_budget(5)
+def api_project_detail(request, project_id):
+    """API du détail d'un projet (description longue, images), chargé à la demande"""
+    try:
+        return cached_response(request, lambda fmt: 'portfolio:api:projet:%s:%s:%s' % (
+            request.tenant_id, project_id, fmt), lambda: build_projet_detail(project_id, request.tenant_id))
+    except Projet.DoesNotExist:
+        return JsonResponse({'success': False, 'error': 'Projet non trouvé'}, status=404)
+
+@query_budget(15)
+def api_portfolio_changes(request):
+    """API de synchronisation différentielle : modifications depuis ?since=<version>"""
+    try:
+        since = int(request.GET['since'])
+        if since < 0:
+            raise ValueError
+    except (KeyError, ValueError):
+        return JsonResponse({'success': False, 'error': 'Paramètre since invalide'}, status=400)
+    fmt = negotiate_format(request)
+    if fmt is None:
+        return JsonResponse({
+            'success': False,
+            'error': 'Format de réponse non disponible',
+            'formats': list(ENCODERS),
+        }, status=406)
+    
+    changes = build_portfolio_changes(since, request.tenant_id)
+    if changes is None:
+        # Journal purgé au-delà de la version du client : rechargement complet
+        return JsonResponse({'success': False, 'error': 'Version trop ancienne'}, status=410)
+    return encoded_response(changes, fmt)
+
+async def api_events(request):
+    """Flux Server-Sent Events des modifications du contenu (serveur ASGI requis)"""
+    if not isinstance(request, ASGIRequest):
+        # Sous WSGI, un flux sans fin occuperait un worker
+        return JsonResponse({'success': False, 'error': 'Serveur ASGI requis'}, status=501)
+    broker = get_broker()
+    if len(broker) >= settings.EVENTS_MAX_CONNECTIONS:
+        response = JsonResponse({'success': False, 'error': 'Trop de connexions'}, status=503)
+        response['Retry-After'] = '30'
+        return response
+    
+    stream = event_stream(broker, request.tenant_id, resync='Last-Event-ID' in request.headers)
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Pas de mise en tampon par nginx
+    return response
+
+@query_budget(6)
 @csrf_exempt
 def api_contact(request):
     """API pour traiter les messages de contact"""
@@ -118,12 +144,34 @@ def api_contact(request):
         try:
             data = json.loads(request.body)
             
-            contact = Contact.objects.create(
-                nom=data.get('nom'),
-                email=data.get('email'),
-                sujet=data.get('sujet'),
-                message=data.get('message')
-            )
+            # Filtrage en mémoire avant toute écriture en base
+            verdict = check_contact(data.get('nom'), data.get('email'),
+                                    data.get('sujet'), data.get('message'), request.tenant_id)
+            if not verdict.accepte:
+                if verdict.raison == 'spam':
+                    return JsonResponse({
+                        'success': False,
+                        'error': 'Message refusé par le filtre anti-spam.'
+                    }, status=400)
+                # Doublon : le message a déjà été reçu, rien à enregistrer
+                return JsonResponse({
+                    'success': True,
+                    'message': 'Message déjà reçu, merci!'
+                })
+            
+            with transaction.atomic():
+                contact = Contact.objects.create(
+                    profile_id=request.tenant_id,
+                    nom=data.get('nom'),
+                    email=data.get('email'),
+                    sujet=data.get('sujet'),
+                    message=data.get('message')
+                )
+                if settings.CONTACT_NOTIFICATION:
+                    # Courriel envoyé par les processus de tâches, hors de la requête
+                    notifier_contact.enqueue(contact.pk)
+            # Mémorisé seulement une fois enregistré : un envoi en échec peut être renvoyé
+            record_contact(data.get('email'), data.get('sujet'), data.get('message'), request.tenant_id)
             
             return JsonResponse({
                 'success': True,
@@ -138,13 +186,92 @@ def api_contact(request):
     
     return JsonResponse({'error': 'Méthode non autorisée'}, status=405)
 
+@query_budget(5)
 def increment_project_views(request, project_id):
     """Incrémenter le nombre de vues d'un projet"""
     try:
-        projet = Projet.objects.get(id=project_id, actif=True)
-        projet.increment_views()
-        return JsonResponse({'success': True, 'views': projet.vues})
+        projet = Projet.objects.for_tenant(request.tenant_id).only('id', 'vues').get(id=project_id, actif=True)
+        projet.increment_views()  # Insertion dans le journal des vues
+        # Vues compactées, plus celles du journal (dont celle-ci) pas encore compactées
+        vues = projet.vues + VueProjet.objects.filter(projet_id=projet.pk).count()
+        return JsonResponse({'success': True, 'views': vues})
     except Projet.DoesNotExist:
         return JsonResponse({'error': 'Projet non trouvé'}, status=404)
     except Exception as e:
-        return JsonResponse({'error': str(e)}, status=500)
\ No newline at end of file
+        return JsonResponse({'error': str(e)}, status=500)
+
+@query_budget(7)
+def api_skill_related(request, skill_id):
+    """Projets et expériences utilisant une compétence, et compétences les plus souvent associées"""
+    try:
+        limite = min(max(int(request.GET.get('limite', 10)), 1), 50)
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'Paramètre invalide'}, status=400)
+    result = skill_graph.related(request.tenant_id, skill_id, limite)
+    if result is None:
+        return JsonResponse({'success': False, 'error': 'Compétence non trouvée'}, status=404)
+    ids, related = result
+    noms = dict((pk, (nom, couleur)) for pk, nom, couleur in Competence.objects.for_tenant(request.tenant_id).filter(
+        pk__in=[skill_id] + [pk for pk, _ in related]).values_list('id', 'nom', 'couleur'))
+    if skill_id not in noms:
+        return JsonResponse({'success': False, 'error': 'Compétence non trouvée'}, status=404)
+    return JsonResponse({
+        'success': True,
+        'competence': {'id': skill_id, 'nom': noms[skill_id][0], 'couleur': noms[skill_id][1]},
+        'projets': ids[Projet],
+        'experiences': ids[Experience],
+        'associees': [
+            {'id': pk, 'nom': noms[pk][0], 'couleur': noms[pk][1], 'nombre': nombre}
+            for pk, nombre in related if pk in noms
+        ],
+    })
+
+@query_budget(6)
+def api_stats(request):
+    """API des statistiques de vues des projets (agrégats horaires ou journaliers)"""
+    periode = request.GET.get('periode', 'jour')
+    if periode not in TRONCATURES:
+        return JsonResponse({'success': False, 'error': 'Période invalide'}, status=400)
+    try:
+        jours = min(max(int(request.GET.get('jours', 30)), 1), 366)
+        projet_id = int(request.GET['projet']) if request.GET.get('projet') else None
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'Paramètre invalide'}, status=400)
+    
+    return JsonResponse({
+        'success': True,
+        'periode': periode,
+        'jours': jours,
+        'projets': get_view_stats(request.tenant_id, periode, jours, projet_id),
+    })
+
+@query_budget(5)
+def api_portfolio_stats(request):
+    """API des statistiques générales, lues dans les compteurs maintenus par les signaux"""
+    return JsonResponse({
+        'success': True,
+        'stats': PortfolioStatsSerializer(get_counters(request.tenant_id)).data,
+    })
+
+@query_budget(3)
+def api_cache_stats(request):
+    """API des compteurs du cache local de ce processus (réservée à l'équipe)"""
+    if not request.user.is_staff:
+        return JsonResponse({'success': False, 'error': 'Accès réservé'}, status=403)
+    return JsonResponse({
+        'success': True,
+        'pid': os.getpid(),
+        'cache': get_hot_cache().local.stats(),
+    })
+
+@query_budget(5)
+def serve_media(request, path):
+    """Sert un fichier média (CV, images) avec support des Range et des requêtes conditionnelles"""
+    # Seuls les fichiers du contenu publié du portfolio sont servis (l'équipe voit tous les fichiers)
+    if path not in published_media(request.tenant_id) and not request.user.is_staff:
+        raise Http404("Fichier introuvable")
+    after_transfer = None
+    if path.startswith('documents/'):
+        # Le compteur n'est mis à jour qu'une fois le transfert terminé
+        after_transfer = partial(Profile.increment_cv_downloads, path)
+    return serve_media_file(request, path, after_transfer=after_transfer)
\ No newline at end of file
@@ -2,8 +2,10 @@
 # Configuration principale de Django pour le portfolio
 
 import os
+import sys
+import tempfile
 from pathlib import Path
-from decouple import config
+from decouple import config, Csv
 
 # Répertoire de base du projet
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -15,7 +17,8 @@ SECRET_KEY = config('SECRET_KEY', default='django-insecure-votre-cle-secrete-tem
 DEBUG = config('DEBUG', default=True, cast=bool)
 
 # Hosts autorisés - Ajouter votre domaine en production
-ALLOWED_HOSTS = ['localhost', '127.0.0.1', '0.0.0.0']
+# (multi-portfolio : '.exemple.com' pour les sous-domaines, plus les domaines personnalisés)
+ALLOWED_HOSTS = config('ALLOWED_HOSTS', default='localhost,127.0.0.1,0.0.0.0', cast=Csv())
 
 # Applications installées
 INSTALLED_APPS = [
@@ -37,25 +40,38 @@ INSTALLED_APPS = [
 
 # Middlewares - Traitent les requêtes/réponses
 MIDDLEWARE = [
+    'portfolio.profiling.ProfilingMiddleware',        # Profilage à la demande (retiré si désactivé)
     'corsheaders.middleware.CorsMiddleware',          # CORS pour React
     'django.middleware.security.SecurityMiddleware',  # Sécurité
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'portfolio.tenants.TenantMiddleware',             # Portfolio servi (hôte)
+    'portfolio.routers.ReplicaRoutingMiddleware',     # Base principale ou réplique (selon le portfolio)
     'django.middleware.csrf.CsrfViewMiddleware',      # Protection CSRF
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'portfolio.querybudget.QueryBudgetMiddleware',    # Budget de requêtes SQL par vue
 ]
 
 # Configuration des URLs principales
 ROOT_URLCONF = 'portfolio_project.urls'
 
 # Configuration des templates
+# En production, les templates sont compilés une seule fois puis gardés en mémoire
+TEMPLATE_CACHE = config('TEMPLATE_CACHE', default=not DEBUG, cast=bool)
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',      # Dossier templates/
+    'django.template.loaders.app_directories.Loader', # Templates des applications
+]
+if TEMPLATE_CACHE:
+    TEMPLATE_LOADERS = [('django.template.loaders.cached.Loader', TEMPLATE_LOADERS)]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],  # Dossier des templates HTML
-        'APP_DIRS': True,
+        'APP_DIRS': False,  # Remplacé par les loaders explicites ci-dessous
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -63,20 +79,65 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            'loaders': TEMPLATE_LOADERS,
         },
     },
 ]
 
 # Configuration WSGI pour le déploiement
 WSGI_APPLICATION = 'portfolio_project.wsgi.application'
+# Serveur ASGI (uvicorn, daphne...) requis pour les notifications temps réel
+ASGI_APPLICATION = 'portfolio_project.asgi.application'
 
-# Configuration de la base de données SQLite
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',  # Fichier de base de données
+# Configuration de la base de données : 'sqlite' (défaut) ou 'postgresql'
+# Les tests n'utilisent que la base principale : une réplique (connexion
+# distincte) ne verrait pas les données non validées des TestCase
+TESTING = sys.argv[1:2] == ['test']
+DATABASE_ENGINE = config('DATABASE_ENGINE', default='sqlite')
+
+if DATABASE_ENGINE == 'postgresql':
+    # Production : PostgreSQL (paquet psycopg requis), connexions persistantes
+    # réutilisées entre les requêtes, répliques en lecture optionnelles
+    POSTGRES = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': config('POSTGRES_DB', default='portfolio'),
+        'USER': config('POSTGRES_USER', default='portfolio'),
+        'PASSWORD': config('POSTGRES_PASSWORD', default=''),
+        'HOST': config('POSTGRES_HOST', default='localhost'),
+        'PORT': config('POSTGRES_PORT', default='5432'),
+        'CONN_MAX_AGE': config('POSTGRES_CONN_MAX_AGE', default=600, cast=int),  # secondes
+        'CONN_HEALTH_CHECKS': True,  # Connexion persistante vérifiée avant réutilisation
+        # Derrière PgBouncer en mode transaction, les curseurs serveur sont impossibles
+        'DISABLE_SERVER_SIDE_CURSORS': config('POSTGRES_PGBOUNCER', default=False, cast=bool),
+        'OPTIONS': {
+            'connect_timeout': 5,
+        },
     }
-}
+    DATABASES = {'default': POSTGRES}
+    REPLICA_HOSTS = config('POSTGRES_REPLICA_HOSTS', default='', cast=Csv())
+    for index, host in enumerate(REPLICA_HOSTS if not TESTING else []):
+        DATABASES[f'replica_{index}'] = {**POSTGRES, 'HOST': host}
+else:
+    # Configuration de la base de données SQLite
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',  # Fichier de base de données
+        }
+    }
+    # Réplique locale (second fichier SQLite, copié par la commande sync_replica)
+    REPLICA_SQLITE = config('DATABASE_REPLICA_SQLITE', default='')
+    if REPLICA_SQLITE and not TESTING:
+        DATABASES['replica'] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / REPLICA_SQLITE,
+        }
+
+# Lectures des pages publiques sur les répliques, écritures sur 'default'
+DATABASE_ROUTERS = ['portfolio.routers.PrimaryReplicaRouter']
+# Après une écriture, les lectures du client restent sur 'default' (retard de réplication),
+# de même que toutes les lectures d'un portfolio après une modification de son contenu
+REPLICA_STICKY_SECONDS = config('REPLICA_STICKY_SECONDS', default=10, cast=int)
 
 # Validation des mots de passe
 AUTH_PASSWORD_VALIDATORS = [
@@ -107,10 +168,153 @@ STATICFILES_DIRS = [
     BASE_DIR / 'static',  # Dossier des fichiers statiques de développement
 ]
 
+# En production, les fichiers statiques sont versionnés (nom avec empreinte)
+# après `collectstatic`, ce qui permet un cache navigateur illimité
+STATIC_MANIFEST = config('STATIC_MANIFEST', default=not DEBUG, cast=bool)
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': (
+            'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'
+            if STATIC_MANIFEST else
+            'django.contrib.staticfiles.storage.StaticFilesStorage'
+        ),
+    },
+}
+
+# Configuration du cache (fragments de templates, version du contenu)
+# Hors DEBUG, le cache doit être partagé entre les workers : avec un cache
+# local (LocMemCache), une modification n'invaliderait que le processus qui
+# l'a reçue. Cache fichier par défaut (Redis ou Memcached recommandés)
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default=(
+            'django.core.cache.backends.locmem.LocMemCache' if DEBUG else
+            'django.core.cache.backends.filebased.FileBasedCache'
+        )),
+        'LOCATION': config('CACHE_LOCATION', default='portfolio' if DEBUG else str(BASE_DIR / 'cache')),
+    }
+}
+# Durée de vie des fragments du template (secondes) : illimitée avec un cache
+# partagé (invalidés par la version du contenu), bornée avec un cache local
+TEMPLATE_FRAGMENT_TIMEOUT = config(
+    'TEMPLATE_FRAGMENT_TIMEOUT',
+    default='' if not CACHES['default']['BACKEND'].endswith('LocMemCache') else '60',
+    cast=lambda value: int(value) if value else None,
+)
+
+# Cache local des processus devant le cache partagé (réponses de /api/portfolio/)
+LOCAL_CACHE_MAX_BYTES = config('LOCAL_CACHE_MAX_BYTES', default=8 * 1024 * 1024, cast=int)  # 0 : désactivé
+LOCAL_CACHE_MAX_ENTRIES = config('LOCAL_CACHE_MAX_ENTRIES', default=256, cast=int)
+LOCAL_CACHE_TTL = config('LOCAL_CACHE_TTL', default=30, cast=int)  # secondes avant revalidation de la version
+SHARED_CACHE_TIMEOUT = config('SHARED_CACHE_TIMEOUT', default=24 * 3600, cast=int)  # secondes
+
+# API par sections (premier écran puis sections chargées au défilement) :
+# nombre de projets mis en avant renvoyés avec le profil
+ACCUEIL_PROJETS = config('ACCUEIL_PROJETS', default=3, cast=int)
+
+# Budget de requêtes SQL des vues (décorateur query_budget, listes d'administration)
+QUERY_BUDGET_ENABLED = config('QUERY_BUDGET_ENABLED', default=True, cast=bool)
+# Dépassement : exception en développement (DEBUG) et pendant les tests (voir
+# portfolio.testrunner), avertissement journalisé sinon
+QUERY_BUDGET_RAISE = config('QUERY_BUDGET_RAISE', default=DEBUG, cast=bool)
+# Exécutions maximales d'une même forme de requête dans une vue (signature d'un N+1)
+QUERY_BUDGET_MAX_REPEATS = config('QUERY_BUDGET_MAX_REPEATS', default=3, cast=int)
+
+# Profilage des requêtes à la demande (voir portfolio/profiling.py)
+PROFILING_ENABLED = config('PROFILING_ENABLED', default=False, cast=bool)
+# En-tête de déclenchement, valeur produite par `manage.py profiling_token`
+PROFILING_HEADER = config('PROFILING_HEADER', default='X-Profile')
+PROFILING_TOKEN_MAX_AGE = config('PROFILING_TOKEN_MAX_AGE', default=3600, cast=int)  # secondes
+# Proportion de requêtes profilées au hasard (0 : aucune), et mode utilisé pour celles-ci
+PROFILING_SAMPLE_RATE = config('PROFILING_SAMPLE_RATE', default=0.0, cast=float)
+PROFILING_SAMPLE_MODE = config('PROFILING_SAMPLE_MODE', default='echantillonnage')  # ou 'cprofile'
+PROFILING_SAMPLE_INTERVAL = config('PROFILING_SAMPLE_INTERVAL', default=0.002, cast=float)  # secondes
+PROFILING_KEEP = config('PROFILING_KEEP', default=100, cast=int)  # profils conservés
+
 # Configuration des fichiers média (uploads)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Délégation de l'envoi des fichiers média au serveur web frontal
+# '' : envoi par Django, 'nginx' : X-Accel-Redirect, 'sendfile' : X-Sendfile (Apache, lighttpd)
+MEDIA_ACCEL = config('MEDIA_ACCEL', default='')
+# Location nginx interne pointant sur MEDIA_ROOT (ex: location /protected-media/ { internal; alias .../media/; })
+MEDIA_ACCEL_PREFIX = config('MEDIA_ACCEL_PREFIX', default='/protected-media/')
+
+# Mode performance des listes d'administration (grandes tables) :
+# nombre de lignes estimé, pagination par curseur, pas de navigation par date
+ADMIN_PERFORMANCE_MODE = config('ADMIN_PERFORMANCE_MODE', default=False, cast=bool)
+
+# Taille des lots des actions d'administration en masse (une transaction par lot)
+ADMIN_BULK_CHUNK_SIZE = config('ADMIN_BULK_CHUNK_SIZE', default=1000, cast=int)
+
+# Messages de contact lus et répondus déplacés dans l'archive après ce délai (jours)
+CONTACT_ARCHIVE_DAYS = config('CONTACT_ARCHIVE_DAYS', default=180, cast=int)
+
+# Filtre anti-spam et anti-doublons des messages de contact (en mémoire)
+CONTACT_SPAM_FILTER = config('CONTACT_SPAM_FILTER', default=True, cast=bool)
+CONTACT_DEDUP_WINDOW = config('CONTACT_DEDUP_WINDOW', default=3600, cast=int)  # secondes
+CONTACT_SPAM_THRESHOLD = config('CONTACT_SPAM_THRESHOLD', default=5, cast=int)
+
+# Notification du propriétaire à chaque message de contact (tâche de fond)
+CONTACT_NOTIFICATION = config('CONTACT_NOTIFICATION', default=True, cast=bool)
+# Destinataire des messages reçus sans portfolio (sinon : email du profil)
+CONTACT_NOTIFICATION_EMAIL = config('CONTACT_NOTIFICATION_EMAIL', default='')
+
+# Envoi des courriels
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
+EMAIL_HOST = config('EMAIL_HOST', default='localhost')
+EMAIL_PORT = config('EMAIL_PORT', default=25, cast=int)
+EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
+EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
+EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=False, cast=bool)
+DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='portfolio@localhost')
+
+# Journal des modifications conservé (jours) par la maintenance quotidienne et prune_modifications
+MODIFICATIONS_KEEP_DAYS = config('MODIFICATIONS_KEEP_DAYS', default=90, cast=int)
+# Synchronisation différentielle : entrées du journal créées jusqu'à ce délai avant la
+# version du client relues à chaque demande (transactions validées en retard) ; doit
+# dépasser la durée des transactions d'écriture
+MODIFICATIONS_REREAD_WINDOW = config('MODIFICATIONS_REREAD_WINDOW', default=60, cast=int)  # secondes
+
+# Tâches de fond (voir portfolio/tasks.py), exécutées par `manage.py taskworker`
+TASKS_POLL_INTERVAL = config('TASKS_POLL_INTERVAL', default=1.0, cast=float)  # secondes entre deux lectures de la file vide
+TASKS_LOCK_TIMEOUT = config('TASKS_LOCK_TIMEOUT', default=600, cast=int)  # secondes avant reprise d'une tâche abandonnée
+TASKS_RETRY_DELAY = config('TASKS_RETRY_DELAY', default=30, cast=int)  # secondes, doublées à chaque échec
+TASKS_RETRY_MAX_DELAY = config('TASKS_RETRY_MAX_DELAY', default=3600, cast=int)
+TASKS_KEEP_DAYS = config('TASKS_KEEP_DAYS', default=7, cast=int)  # tâches terminées conservées
+# Construction du premier écran de l'API en tâche de fond après chaque modification
+TASKS_CACHE_WARMING = config('TASKS_CACHE_WARMING', default=False, cast=bool)
+
+# Notifications temps réel des modifications (Server-Sent Events, ASGI)
+# 'local' : diffusion dans le processus ; 'database' : lecture périodique du
+# journal des modifications, pour plusieurs processus sans broker externe
+EVENTS_BROKER = config('EVENTS_BROKER', default='local')
+EVENTS_POLL_INTERVAL = config('EVENTS_POLL_INTERVAL', default=2.0, cast=float)  # secondes
+EVENTS_MAX_CONNECTIONS = config('EVENTS_MAX_CONNECTIONS', default=5000, cast=int)  # par processus
+EVENTS_QUEUE_SIZE = config('EVENTS_QUEUE_SIZE', default=32, cast=int)  # notifications en attente par connexion
+EVENTS_HEARTBEAT = config('EVENTS_HEARTBEAT', default=15, cast=int)  # secondes
+EVENTS_MAX_DURATION = config('EVENTS_MAX_DURATION', default=300, cast=int)  # secondes, puis reconnexion
+
+# Hébergement de plusieurs portfolios : un profil est servi sur son domaine
+# personnalisé ou sur <identifiant>.TENANT_DOMAIN ; les autres hôtes servent
+# TENANT_DEFAULT (identifiant), ou à défaut le premier profil actif
+TENANT_DOMAIN = config('TENANT_DOMAIN', default='')
+TENANT_DEFAULT = config('TENANT_DEFAULT', default='')
+
+# Tests : base de test SQLite restaurée depuis un modèle enregistré dans ce
+# dossier ('' : migrations rejouées à chaque lancement), compatible --parallel
+TEST_RUNNER = 'portfolio.testrunner.PortfolioTestRunner'
+TEST_DB_TEMPLATE_DIR = config('TEST_DB_TEMPLATE_DIR',
+                              default=os.path.join(tempfile.gettempdir(), 'portfolio-test-db'))
+if TESTING:
+    # Fichiers envoyés gardés en mémoire, hachage rapide des mots de passe
+    STORAGES['default'] = {'BACKEND': 'django.core.files.storage.InMemoryStorage'}
+    PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
 # Type de champ de clé primaire par défaut
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -17,13 +17,15 @@ urlpatterns = [
     # Interface React - Page d'accueil
     path('', views.index, name='index'),
     
+    # Fichiers média (CV, images) : Range, cache HTTP, X-Accel-Redirect/X-Sendfile
+    re_path(r'^media/(?P<path>.+)$', views.serve_media, name='media'),
+    
     # Catch-all pour React Router (toutes les autres routes)
     re_path(r'^(?!admin|api|static|media).*/$', views.index, name='react-app'),
 ]
 
-# Configuration pour servir les fichiers média et statiques en développement
+# Configuration pour servir les fichiers statiques en développement
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
 
 # Personnalisation de l'interface admin
@@ -1,23 +1,167 @@
 // /static/js/app.jsx - Version compatible avec tes views.py
-const { useState, useEffect } = React;
+const { useState, useEffect, useRef } = React;
+
+// Copie locale des données (localStorage) tenue à jour par /api/portfolio/changes/
+const STORAGE_KEY = 'portfolio:data';
+
+// Sections chargées au défilement après le premier écran (/api/portfolio/sections/<nom>/) ;
+// la copie locale n'est enregistrée qu'une fois toutes chargées
+const SECTIONS = ['competences', 'projets'];
+
+// Même ordre d'affichage que l'API
+const SORTS = {
+    competences: (a, b) => (a.ordre - b.ordre) || a.nom.localeCompare(b.nom),
+    projets: (a, b) => (b.featured - a.featured) || (a.ordre - b.ordre)
+        || (b.date_debut || '').localeCompare(a.date_debut || ''),
+    experiences: (a, b) => (b.date_debut || '').localeCompare(a.date_debut || ''),
+};
+
+function readStoredData() {
+    try {
+        const data = JSON.parse(localStorage.getItem(STORAGE_KEY));
+        return data && data.version !== undefined ? data : null;
+    } catch (err) {
+        return null;
+    }
+}
+
+function storeData(data) {
+    try {
+        localStorage.setItem(STORAGE_KEY, JSON.stringify(data));
+    } catch (err) {
+        // Quota dépassé ou stockage désactivé : le prochain chargement sera complet
+    }
+}
+
+// Applique les ajouts / modifications / suppressions renvoyés par l'API
+function applyChanges(data, changes) {
+    const patched = { ...data, version: changes.version };
+    if ('profile' in changes.upserts) {
+        patched.profile = changes.upserts.profile;
+    }
+    Object.keys(SORTS).forEach(cle => {
+        const upserts = changes.upserts[cle] || [];
+        const remplaces = new Set([...(changes.suppressions[cle] || []), ...upserts.map(obj => obj.id)]);
+        if (remplaces.size && data[cle]) {
+            patched[cle] = data[cle].filter(obj => !remplaces.has(obj.id)).concat(upserts).sort(SORTS[cle]);
+        }
+    });
+    return patched;
+}
+
+// Contenu chargé quand l'emplacement de la section approche de la zone visible
+function SectionDifferee({ nom, chargee, onVisible, children }) {
+    const ref = useRef(null);
+
+    useEffect(() => {
+        if (chargee) {
+            return undefined;
+        }
+        if (!window.IntersectionObserver) {
+            onVisible(nom);
+            return undefined;
+        }
+        const observer = new IntersectionObserver(entries => {
+            if (entries.some(entry => entry.isIntersecting)) {
+                observer.disconnect();
+                onVisible(nom);
+            }
+        }, { rootMargin: '400px' });
+        observer.observe(ref.current);
+        return () => observer.disconnect();
+    }, [nom, chargee]);
+
+    if (chargee) {
+        return children || null;
+    }
+    return (
+        <div ref={ref} className="text-center py-5">
+            <div className="spinner-border text-primary" role="status">
+                <span className="visually-hidden">Chargement...</span>
+            </div>
+        </div>
+    );
+}
 
 function Portfolio() {
     const [data, setData] = useState(null);
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState(null);
+    // Filtre des projets par compétence : réponse de /api/skills/<id>/related/
+    const [filtre, setFiltre] = useState(null);
+    // Détail des projets (/api/project/<id>/), chargé à la demande
+    const [details, setDetails] = useState({});
+    const [projetOuvert, setProjetOuvert] = useState(null);
+    // Données courantes, lues par les rechargements déclenchés depuis les notifications
+    const dataRef = useRef(null);
+
+    useEffect(() => {
+        dataRef.current = data;
+    }, [data]);
 
     useEffect(() => {
         loadPortfolioData();
     }, []);
 
+    // Notifications temps réel : synchronisation différentielle à chaque modification
+    useEffect(() => {
+        if (!window.EventSource) {
+            return undefined;
+        }
+        let timer = null;
+        const source = new EventSource('/api/events/');
+        const sync = () => {
+            // Regroupe les rafales de notifications (enregistrement depuis l'admin)
+            clearTimeout(timer);
+            timer = setTimeout(loadPortfolioData, 500);
+        };
+        source.addEventListener('modification', sync);
+        source.addEventListener('resync', sync);
+        return () => {
+            clearTimeout(timer);
+            source.close();
+        };
+    }, []);
+
     const loadPortfolioData = async () => {
+        // Copie locale : affichage immédiat puis rattrapage des seules modifications
+        const stored = readStoredData();
+        if (stored) {
+            setData(stored);
+            setLoading(false);
+            try {
+                const response = await axios.get('/api/portfolio/changes/', { params: { since: stored.version } });
+                if (response.data.success) {
+                    const patched = applyChanges(stored, response.data);
+                    storeData(patched);
+                    setData(patched);
+                    setError(null);
+                    return;
+                }
+            } catch (err) {
+                // 410 : journal purgé, rechargement complet ; sinon on garde la copie locale
+                if (!err.response || err.response.status !== 410) {
+                    console.error('Erreur de synchronisation:', err);
+                    return;
+                }
+            }
+        }
+
+        // Rafraîchissement (notification) : pas d'écran de chargement, sections affichées conservées
+        const current = dataRef.current;
         try {
-            setLoading(true);
-            const response = await axios.get('/api/portfolio/');
+            if (!current) {
+                setLoading(true);
+            }
+            // Premier écran seulement : profil et projets mis en avant
+            const response = await axios.get('/api/portfolio/sections/accueil/');
             
             if (response.data.success) {
-                setData(response.data);
+                const { version, profile, projets } = response.data;
+                setData(previous => ({ ...previous, version, profile, a_la_une: projets }));
                 setError(null);
+                // Sections déjà chargées : relues à la nouvelle version
+                SECTIONS.filter(nom => current && current[nom] !== undefined).forEach(loadSection);
             } else {
                 setError(response.data.error || 'Erreur lors du chargement');
             }
@@ -29,6 +173,66 @@ function Portfolio() {
         }
     };
 
+    const loadSection = async (nom) => {
+        try {
+            const response = await axios.get(`/api/portfolio/sections/${nom}/`);
+            if (!response.data.success) {
+                return;
+            }
+            setData(current => {
+                const merged = {
+                    ...current,
+                    [nom]: response.data[nom],
+                    versions: { ...current.versions, [nom]: response.data.version },
+                };
+                // Copie locale cohérente : toutes les sections lues à la version du premier écran
+                if (SECTIONS.every(section => merged.versions[section] === merged.version)) {
+                    const { a_la_une, versions, ...complete } = merged;
+                    storeData(complete);
+                }
+                return merged;
+            });
+        } catch (err) {
+            console.error(`Erreur de chargement (${nom}):`, err);
+        }
+    };
+
+    const basculerProjet = async (projet) => {
+        if (projetOuvert === projet.id) {
+            setProjetOuvert(null);
+            return;
+        }
+        // Projets de la copie complète : détail déjà présent
+        if (!details[projet.id] && projet.description_longue === undefined) {
+            try {
+                const response = await axios.get(`/api/project/${projet.id}/`);
+                if (!response.data.success) {
+                    return;
+                }
+                setDetails(current => ({ ...current, [projet.id]: response.data.projet }));
+            } catch (err) {
+                console.error('Erreur de chargement du projet:', err);
+                return;
+            }
+        }
+        setProjetOuvert(projet.id);
+    };
+
+    const filtrerParCompetence = async (competenceId) => {
+        if (filtre && filtre.competence.id === competenceId) {
+            setFiltre(null);
+            return;
+        }
+        try {
+            const response = await axios.get(`/api/skills/${competenceId}/related/`);
+            if (response.data.success) {
+                setFiltre(response.data);
+            }
+        } catch (err) {
+            console.error('Erreur de filtrage:', err);
+        }
+    };
+
     if (loading) {
         return (
             <div className="d-flex justify-content-center align-items-center" style={{minHeight: '100vh'}}>
@@ -72,7 +276,12 @@ function Portfolio() {
         );
     }
 
-    const { profile, competences, projets, experiences } = data;
+    const { profile } = data;
+    const competences = data.competences || [];
+    // Projets mis en avant tant que la liste complète n'est pas chargée
+    const projets = data.projets || data.a_la_une || [];
+    const competenceParNom = new Map(competences.map(competence => [competence.nom, competence]));
+    const projetsAffiches = filtre ? projets.filter(projet => filtre.projets.includes(projet.id)) : projets;
 
     return (
         <div>
@@ -118,6 +327,7 @@ function Portfolio() {
             </header>
 
             {/* Compétences */}
+            <SectionDifferee nom="competences" chargee={data.competences !== undefined} onVisible={loadSection}>
             {competences.length > 0 && (
                 <section className="py-5">
                     <div className="container">
@@ -125,7 +335,8 @@ function Portfolio() {
                         <div className="row">
                             {competences.map(competence => (
                                 <div key={competence.id} className="col-md-6 col-lg-4 mb-4">
-                                    <div className="card h-100">
+                                    <div className={`card h-100${filtre && filtre.competence.id === competence.id ? ' border-primary' : ''}`}
+                                         role="button" onClick={() => filtrerParCompetence(competence.id)}>
                                         <div className="card-body">
                                             <div className="d-flex align-items-center mb-3">
                                                 {competence.icone && (
@@ -151,14 +362,34 @@ function Portfolio() {
                     </div>
                 </section>
             )}
+            </SectionDifferee>
 
             {/* Projets */}
-            {projets.length > 0 && (
+            {(projets.length > 0 || data.projets === undefined) && (
                 <section className="py-5 bg-light">
                     <div className="container">
                         <h2 className="text-center mb-5">Mes Projets</h2>
+                        {filtre && (
+                            <div className="text-center mb-4">
+                                <p className="mb-2">
+                                    Projets utilisant <strong>{filtre.competence.nom}</strong>
+                                    <button className="btn btn-link btn-sm" onClick={() => setFiltre(null)}>
+                                        <i className="fas fa-times me-1"></i>Tout afficher
+                                    </button>
+                                </p>
+                                {filtre.associees.map(associee => (
+                                    <span key={associee.id} className="badge me-1" role="button"
+                                          style={{backgroundColor: associee.couleur}}
+                                          onClick={() => filtrerParCompetence(associee.id)}>
+                                        {associee.nom} ({associee.nombre})
+                                    </span>
+                                ))}
+                            </div>
+                        )}
                         <div className="row">
-                            {projets.map(projet => (
+                            {projetsAffiches.map(projet => {
+                                const detail = details[projet.id] || (projet.description_longue !== undefined ? projet : null);
+                                return (
                                 <div key={projet.id} className="col-md-6 col-lg-4 mb-4">
                                     <div className="card h-100">
                                         {projet.image_principale && (
@@ -175,7 +406,9 @@ function Portfolio() {
                                             <div className="mb-3">
                                                 {projet.technologies.map((tech, index) => (
                                                     <span key={index} className="badge me-1" 
-                                                          style={{backgroundColor: tech.couleur}}>
+                                                          style={{backgroundColor: tech.couleur}}
+                                                          role={competenceParNom.has(tech.nom) ? 'button' : undefined}
+                                                          onClick={() => competenceParNom.has(tech.nom) && filtrerParCompetence(competenceParNom.get(tech.nom).id)}>
                                                         {tech.nom}
                                                     </span>
                                                 ))}
@@ -193,12 +426,36 @@ function Portfolio() {
                                                         <i className="fab fa-github me-1"></i>Code
                                                     </a>
                                                 )}
+                                                <button className="btn btn-link btn-sm" onClick={() => basculerProjet(projet)}>
+                                                    {projetOuvert === projet.id ? 'Masquer' : 'Détails'}
+                                                </button>
                                             </div>
+
+                                            {/* Détail chargé à la demande */}
+                                            {projetOuvert === projet.id && detail && (
+                                                <div className="mt-3">
+                                                    <p className="card-text">{detail.description_longue}</p>
+                                                    {[detail.image_2, detail.image_3].filter(Boolean).map(image => (
+                                                        <img key={image} src={image} className="img-fluid rounded mb-2"
+                                                             alt={detail.titre} loading="lazy" />
+                                                    ))}
+                                                    {detail.url_case_study && (
+                                                        <a href={detail.url_case_study} className="btn btn-outline-secondary btn-sm" target="_blank">
+                                                            <i className="fas fa-book me-1"></i>Étude de cas
+                                                        </a>
+                                                    )}
+                                                </div>
+                                            )}
                                         </div>
                                     </div>
                                 </div>
-                            ))}
+                                );
+                            })}
                         </div>
+                        {/* Liste complète chargée au défilement, après les projets mis en avant */}
+                        <SectionDifferee nom="projets" chargee={data.projets !== undefined} onVisible={loadSection}>
+                            {null}
+                        </SectionDifferee>
                     </div>
                 </section>
             )}
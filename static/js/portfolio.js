@@ -0,0 +1,534 @@
+// /static/js/portfolio.js - Animations et interactions de la page d'accueil
+// window.PORTFOLIO_CONFIG est défini dans templates/index.html
+
+// États de l'application
+let isWelcomeShown = false;
+let isPortfolioLoaded = false;
+let portfolioData = null;
+
+// ===== DIGITAL RAIN EFFECT =====
+class DigitalRain {
+    constructor(canvas) {
+        this.canvas = canvas;
+        this.ctx = canvas.getContext('2d');
+        this.canvas.width = window.innerWidth;
+        this.canvas.height = window.innerHeight;
+        
+        this.chars = '01010101010101010101010101010101010101JOSPIN0101010101010101NGRETIA0101010101HERITIER010101010101010101010101010101010101010101010101JOSPIN0101010101010101NGRETIA0101010101HERITIER01010101010123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ';
+        this.charArray = this.chars.split('');
+        this.fontSize = 14;
+        this.columns = this.canvas.width / this.fontSize;
+        this.drops = [];
+        
+        for(let x = 0; x < this.columns; x++) {
+            this.drops[x] = 1;
+        }
+    }
+    
+    draw() {
+        this.ctx.fillStyle = 'rgba(0, 0, 0, 0.04)';
+        this.ctx.fillRect(0, 0, this.canvas.width, this.canvas.height);
+        
+        this.ctx.fillStyle = '#00ff88';
+        this.ctx.font = this.fontSize + 'px monospace';
+        
+        for(let i = 0; i < this.drops.length; i++) {
+            const text = this.charArray[Math.floor(Math.random() * this.charArray.length)];
+            this.ctx.fillText(text, i * this.fontSize, this.drops[i] * this.fontSize);
+            
+            if(this.drops[i] * this.fontSize > this.canvas.height && Math.random() > 0.975) {
+                this.drops[i] = 0;
+            }
+            this.drops[i]++;
+        }
+    }
+    
+    start() {
+        const animate = () => {
+            this.draw();
+            requestAnimationFrame(animate);
+        };
+        animate();
+    }
+}
+
+// ===== PARTICLES CONFIGURATION =====
+const particlesConfig = {
+    particles: {
+        number: { value: 160, density: { enable: true, value_area: 800 } },
+        color: { value: ["#00f5ff", "#bf00ff", "#00ff88"] },
+        shape: {
+            type: "circle",
+            stroke: { width: 0, color: "#000000" },
+            polygon: { nb_sides: 5 }
+        },
+        opacity: {
+            value: 0.5,
+            random: false,
+            anim: { enable: true, speed: 1, opacity_min: 0.1, sync: false }
+        },
+        size: {
+            value: 3,
+            random: true,
+            anim: { enable: true, speed: 10, size_min: 0.1, sync: false }
+        },
+        line_linked: {
+            enable: true,
+            distance: 150,
+            color: "#00f5ff",
+            opacity: 0.4,
+            width: 1
+        },
+        move: {
+            enable: true,
+            speed: 6,
+            direction: "none",
+            random: false,
+            straight: false,
+            out_mode: "out",
+            bounce: false,
+            attract: { enable: false, rotateX: 600, rotateY: 1200 }
+        }
+    },
+    interactivity: {
+        detect_on: "canvas",
+        events: {
+            onhover: { enable: true, mode: "grab" },
+            onclick: { enable: true, mode: "push" },
+            resize: true
+        },
+        modes: {
+            grab: { distance: 140, line_linked: { opacity: 1 } },
+            bubble: { distance: 400, size: 40, duration: 2, opacity: 8, speed: 3 },
+            repulse: { distance: 200, duration: 0.4 },
+            push: { particles_nb: 4 },
+            remove: { particles_nb: 2 }
+        }
+    },
+    retina_detect: true
+};
+
+// ===== TYPING ANIMATION =====
+class TypeWriter {
+    constructor(txtElement, words, wait = 3000) {
+        this.txtElement = txtElement;
+        this.words = words;
+        this.txt = '';
+        this.wordIndex = 0;
+        this.wait = parseInt(wait, 10);
+        this.type();
+        this.isDeleting = false;
+    }
+    
+    type() {
+        const current = this.wordIndex % this.words.length;
+        const fullTxt = this.words[current];
+        
+        if(this.isDeleting) {
+            this.txt = fullTxt.substring(0, this.txt.length - 1);
+        } else {
+            this.txt = fullTxt.substring(0, this.txt.length + 1);
+        }
+        
+        this.txtElement.innerHTML = this.txt;
+        
+        let typeSpeed = 150;
+        if(this.isDeleting) typeSpeed /= 2;
+        
+        if(!this.isDeleting && this.txt === fullTxt) {
+            typeSpeed = this.wait;
+            this.isDeleting = true;
+        } else if(this.isDeleting && this.txt === '') {
+            this.isDeleting = false;
+            this.wordIndex++;
+            typeSpeed = 500;
+        }
+        
+        setTimeout(() => this.type(), typeSpeed);
+    }
+}
+
+// ===== GESTION DU SÉQUENÇAGE D'ANIMATIONS =====
+
+// Étape 1: Chargement initial Django
+window.addEventListener('load', function() {
+    // Initialisation d'AOS pour le contenu portfolio
+    if (typeof AOS !== 'undefined') {
+        AOS.init({
+            duration: 800,
+            easing: 'ease-in-out',
+            once: true,
+            offset: 100
+        });
+    }
+    
+    // Simuler le chargement des données Django/React
+    setTimeout(() => {
+        hideInitialLoader();
+    }, 2000); // 2 secondes pour le loader initial
+});
+
+// Étape 2: Masquer le loader initial et afficher l'animation
+function hideInitialLoader() {
+    const loader = document.getElementById('page-loader');
+    const welcomeScreen = document.getElementById('spectacular-welcome');
+    
+    // Masquer le loader avec transition
+    gsap.to(loader, {
+        opacity: 0,
+        duration: 0.5,
+        onComplete: () => {
+            loader.style.display = 'none';
+            showWelcomeAnimation();
+        }
+    });
+}
+
+// Étape 3: Afficher l'animation spectaculaire
+function showWelcomeAnimation() {
+    const welcomeScreen = document.getElementById('spectacular-welcome');
+    welcomeScreen.classList.add('show');
+    
+    // Démarrer Digital Rain
+    const rainCanvas = document.getElementById('digital-rain');
+    const digitalRain = new DigitalRain(rainCanvas);
+    digitalRain.start();
+    
+    // Démarrer Particles
+    particlesJS('particles-js', particlesConfig);
+    
+    // Animation du titre héro
+    gsap.fromTo('#hero-title', 
+        { y: 100, opacity: 0, scale: 0.5 },
+        { y: 0, opacity: 1, scale: 1, duration: 1.5, ease: "elastic.out(1, 0.3)", delay: 0.5 }
+    );
+    
+    // Animation des boutons
+    gsap.fromTo('.glow-button', 
+        { y: 50, opacity: 0 },
+        { y: 0, opacity: 1, duration: 1, stagger: 0.2, delay: 1.5, ease: "back.out(1.7)" }
+    );
+    
+    // Démarrer l'animation de typing
+    setTimeout(() => {
+        const txtElement = document.getElementById('typing-text');
+        const words = ['Développeur Full Stack', 'Expert en IA', 'Designer UI/UX', 'Créateur Digital'];
+        new TypeWriter(txtElement, words, 2000);
+    }, 1000);
+    
+    isWelcomeShown = true;
+}
+
+// ===== EFFETS MAGNÉTIQUES =====
+document.addEventListener('mousemove', (e) => {
+    if (!isWelcomeShown) return;
+    
+    const magneticElements = document.querySelectorAll('.magnetic-effect');
+    
+    magneticElements.forEach(element => {
+        const rect = element.getBoundingClientRect();
+        const x = e.clientX - rect.left - rect.width / 2;
+        const y = e.clientY - rect.top - rect.height / 2;
+        const distance = Math.sqrt(x * x + y * y);
+        
+        if (distance < 100) {
+            const strength = (100 - distance) / 100;
+            gsap.to(element, {
+                x: x * strength * 0.3,
+                y: y * strength * 0.3,
+                duration: 0.3,
+                ease: "power2.out"
+            });
+        } else {
+            gsap.to(element, {
+                x: 0,
+                y: 0,
+                duration: 0.5,
+                ease: "power2.out"
+            });
+        }
+    });
+});
+
+// ===== FONCTIONS PRINCIPALES =====
+
+// Fonction pour démarrer le portfolio principal - CORRIGÉE
+function startPortfolio() {
+    const welcomeScreen = document.getElementById('spectacular-welcome');
+    const portfolioContent = document.getElementById('portfolio-content');
+    
+    // Animation de sortie de l'écran d'accueil
+    gsap.to(welcomeScreen, {
+        opacity: 0,
+        scale: 0.9,
+        duration: 0.8,
+        ease: "power2.inOut",
+        onComplete: () => {
+            welcomeScreen.classList.remove('show');
+            welcomeScreen.style.display = 'none';
+            
+            // Afficher le contenu portfolio
+            portfolioContent.style.display = 'block';
+            portfolioContent.classList.add('loaded');
+            
+            // Charger le contenu React/Django si pas encore fait
+            if (!isPortfolioLoaded) {
+                loadPortfolioContent();
+            }
+        }
+    });
+}
+
+// Fonction pour charger le contenu du portfolio - CORRIGÉE
+function loadPortfolioContent() {
+    try {
+        // Charger les données depuis l'API Django
+        loadDjangoData();
+        isPortfolioLoaded = true;
+        
+    } catch (error) {
+        console.error('Erreur lors du chargement du portfolio:', error);
+        showErrorScreen('Erreur lors du chargement du contenu du portfolio.');
+    }
+}
+
+// Fonction pour charger les données Django - CORRIGÉE
+async function loadDjangoData() {
+    try {
+        // Appel à l'API selon votre app.jsx
+        const response = await axios.get('/api/portfolio/');
+        
+        if (response.data.success) {
+            portfolioData = response.data;
+            displayPortfolioData(response.data);
+        } else {
+            throw new Error(response.data.error || 'Erreur lors du chargement');
+        }
+        
+    } catch (error) {
+        console.error('Erreur lors du chargement des données:', error);
+        // Utiliser React pour afficher l'erreur ou le contenu de fallback
+        displayReactContent();
+    }
+}
+
+// Fonction pour afficher le contenu React - NOUVELLE
+function displayReactContent() {
+    const root = document.getElementById('root');
+    
+    // Le composant React sera rendu ici automatiquement
+    // par le script app.jsx qui est chargé à la fin
+    
+    // Réinitialiser AOS
+    if (typeof AOS !== 'undefined') {
+        setTimeout(() => {
+            AOS.refresh();
+        }, 100);
+    }
+}
+
+// Fonction pour afficher les données réelles du portfolio - SIMPLIFIÉE  
+function displayPortfolioData(data) {
+    // Cette fonction est maintenant gérée par React
+    // Les données sont stockées dans portfolioData et utilisées par React
+    displayReactContent();
+}
+
+// ===== FONCTIONS DE CONTACT =====
+
+function contactMe() {
+    const modal = document.getElementById('contact-modal');
+    modal.classList.add('show');
+    
+    // Animation d'apparition du modal
+    gsap.fromTo('.contact-content', 
+        { scale: 0.5, opacity: 0, y: -50 },
+        { scale: 1, opacity: 1, y: 0, duration: 0.5, ease: "back.out(1.7)" }
+    );
+    
+    // Mettre à jour les liens de contact
+    updateContactLinks();
+}
+
+function closeContactModal() {
+    const modal = document.getElementById('contact-modal');
+    
+    gsap.to('.contact-content', {
+        scale: 0.5,
+        opacity: 0,
+        y: -50,
+        duration: 0.3,
+        ease: "power2.inOut",
+        onComplete: () => {
+            modal.classList.remove('show');
+        }
+    });
+}
+
+function updateContactLinks() {
+    const config = window.PORTFOLIO_CONFIG.CONTACT_LINKS;
+    
+    // Si on a des données réelles, les utiliser
+    if (portfolioData && portfolioData.profile) {
+        const profile = portfolioData.profile;
+        config.email = profile.email;
+        config.linkedin = profile.linkedin || '';
+        config.github = profile.github || '';
+        config.phone = profile.telephone || '';
+        config.whatsapp = profile.telephone ? `https://wa.me/${profile.telephone.replace(/\D/g, '')}` : '';
+    }
+    
+    const contactLinks = document.querySelectorAll('.contact-link');
+    
+    contactLinks.forEach(link => {
+        const icon = link.querySelector('i');
+        if (icon.classList.contains('fa-envelope')) {
+            link.href = `mailto:${config.email}`;
+        } else if (icon.classList.contains('fa-linkedin')) {
+            link.href = config.linkedin;
+            if (!config.linkedin) link.style.display = 'none';
+        } else if (icon.classList.contains('fa-github')) {
+            link.href = config.github;
+            if (!config.github) link.style.display = 'none';
+        } else if (icon.classList.contains('fa-phone')) {
+            link.href = `tel:${config.phone}`;
+            if (!config.phone) link.style.display = 'none';
+        } else if (icon.classList.contains('fa-whatsapp')) {
+            link.href = config.whatsapp;
+            if (!config.whatsapp) link.style.display = 'none';
+        }
+    });
+}
+
+// ===== GESTION DES ERREURS =====
+
+function showErrorScreen(message) {
+    const loader = document.getElementById('page-loader');
+    const welcomeScreen = document.getElementById('spectacular-welcome');
+    const errorContainer = document.getElementById('error-container');
+    const portfolioContent = document.getElementById('portfolio-content');
+    
+    // Masquer tous les autres écrans
+    if (loader) loader.style.display = 'none';
+    if (welcomeScreen) welcomeScreen.style.display = 'none';
+    if (portfolioContent) portfolioContent.style.display = 'none';
+    
+    // Afficher l'écran d'erreur
+    if (errorContainer) {
+        errorContainer.style.display = 'flex';
+        const errorMessage = errorContainer.querySelector('.error-message');
+        if (errorMessage && message) {
+            errorMessage.textContent = message;
+        }
+    }
+}
+
+// ===== GESTION DES ÉVÉNEMENTS =====
+
+// Fermer le modal en cliquant à l'extérieur
+document.addEventListener('click', (e) => {
+    const modal = document.getElementById('contact-modal');
+    if (e.target === modal) {
+        closeContactModal();
+    }
+});
+
+// Fermer le modal avec la touche Escape
+document.addEventListener('keydown', (e) => {
+    if (e.key === 'Escape') {
+        const modal = document.getElementById('contact-modal');
+        if (modal.classList.contains('show')) {
+            closeContactModal();
+        }
+    }
+});
+
+// Gestion du redimensionnement
+window.addEventListener('resize', () => {
+    const rainCanvas = document.getElementById('digital-rain');
+    if (rainCanvas) {
+        rainCanvas.width = window.innerWidth;
+        rainCanvas.height = window.innerHeight;
+    }
+});
+
+// ===== CONFIGURATION AXIOS =====
+if (typeof axios !== 'undefined') {
+    axios.defaults.baseURL = window.PORTFOLIO_CONFIG.API_BASE_URL;
+    axios.defaults.timeout = 10000;
+    
+    // Intercepteur pour les erreurs
+    axios.interceptors.response.use(
+        response => response,
+        error => {
+            if (error.response) {
+                console.error('Erreur API:', error.response.status, error.response.data);
+            } else if (error.request) {
+                console.error('Erreur réseau:', error.message);
+            } else {
+                console.error('Erreur:', error.message);
+            }
+            return Promise.reject(error);
+        }
+    );
+}
+
+// ===== GESTION DES ERREURS GLOBALES =====
+window.addEventListener('error', function(e) {
+    console.error('Erreur JavaScript:', e.error);
+    if (window.PORTFOLIO_CONFIG.DEBUG) {
+        console.log('Stack trace:', e.error.stack);
+    }
+});
+
+window.addEventListener('unhandledrejection', function(e) {
+    console.error('Promesse rejetée non gérée:', e.reason);
+});
+
+// ===== FONCTIONS UTILITAIRES =====
+
+function isMobile() {
+    return window.innerWidth <= 768;
+}
+
+function adjustAnimationsForDevice() {
+    if (isMobile()) {
+        gsap.globalTimeline.timeScale(0.7);
+    }
+}
+
+// ===== OPTIMISATIONS DE PERFORMANCE =====
+
+// Préchargement des ressources
+function preloadResources() {
+    const resources = [
+        // Ajoutez ici les URLs de vos images
+    ];
+    
+    resources.forEach(src => {
+        const img = new Image();
+        img.src = src;
+    });
+}
+
+// Démarrer le préchargement
+preloadResources();
+
+// ===== INITIALISATIONS FINALES =====
+
+// Ajuster les animations selon l'appareil
+document.addEventListener('DOMContentLoaded', adjustAnimationsForDevice);
+window.addEventListener('resize', adjustAnimationsForDevice);
+
+// Service Worker pour le cache (optionnel)
+if ('serviceWorker' in navigator && !window.PORTFOLIO_CONFIG.DEBUG) {
+    window.addEventListener('load', function() {
+        navigator.serviceWorker.register('/static/js/sw.js')
+            .then(registration => {
+                console.log('Service Worker enregistré:', registration);
+            })
+            .catch(error => {
+                console.log('Erreur Service Worker:', error);
+            });
+    });
+}